@@ -0,0 +1,246 @@
+"""
+Test de charge de l'API SyntheticData.
+
+Crée N utilisateurs, puis envoie un mélange configurable d'appels generate /
+schemas / history avec une concurrence cible (asyncio et le client HTTP
+asynchrone httpx : pip install httpx). Affiche par endpoint les latences p50/p95/p99, le débit et les
+taux d'erreurs et de 429, et peut enregistrer les résultats en JSON pour les
+comparer d'une exécution à l'autre.
+
+Exemples :
+    python config/load_test.py --users 20 --concurrency 50 --duration 60
+    python config/load_test.py --mix generate=0.2,schemas=0.4,history=0.4 --output run1.json
+    python config/load_test.py --output run2.json --compare run1.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+import uuid
+
+try:
+    import httpx
+except ImportError:
+    sys.exit("Le test de charge nécessite httpx : pip install httpx")
+
+
+DEFAULT_MIX = 'generate=0.5,schemas=0.25,history=0.25'
+
+GENERATE_SCHEMA = {
+    "nom": "name",
+    "email": "email",
+    "telephone": "phone_number",
+    "pays": "country",
+    "entreprise": "company",
+}
+
+
+# --- Scénario ---
+
+class LoadTest:
+    def __init__(self, options):
+        self.options = options
+        self.mix = parse_mix(options.mix)
+        self.tokens = []
+        # endpoint -> liste de (status, latence en secondes)
+        self.samples = {endpoint: [] for endpoint in self.mix}
+
+    def client(self):
+        """
+        Client HTTP partagé par les workers : une connexion par requête
+        simultanée, gardée ouverte entre deux requêtes avec --keep-alive.
+        """
+        concurrency = self.options.concurrency
+        return httpx.AsyncClient(
+            base_url=self.options.base_url.rstrip('/') + '/',
+            limits=httpx.Limits(
+                max_connections=concurrency,
+                max_keepalive_connections=concurrency if self.options.keep_alive else 0,
+            ),
+            timeout=httpx.Timeout(self.options.timeout),
+        )
+
+    async def register_users(self, client):
+        """Crée les utilisateurs de test (un identifiant unique par exécution)."""
+        run_id = uuid.uuid4().hex[:8]
+        for index in range(self.options.users):
+            response = await client.post('auth/register/', json={
+                'username': f'loadtest_{run_id}_{index}',
+                'email': f'loadtest_{run_id}_{index}@example.com',
+                'password': 'LoadTest123!',
+                'password2': 'LoadTest123!',
+            })
+            if response.status_code != 201:
+                raise SystemExit(f"Inscription impossible ({response.status_code}) : {response.content[:200]!r}")
+            self.tokens.append(response.json()['access'])
+
+    def build_request(self, endpoint, rng):
+        if endpoint == 'generate':
+            return 'POST', 'generate/', {
+                'schema': GENERATE_SCHEMA,
+                'rows': self.options.rows,
+                'format': rng.choice(self.options.formats),
+            }
+        if endpoint == 'schemas':
+            return 'GET', 'schemas/', None
+        return 'GET', 'history/', None
+
+    async def worker(self, client, index, deadline, remaining):
+        rng = random.Random(self.options.seed + index)
+        endpoints, weights = zip(*self.mix.items())
+        while time.monotonic() < deadline:
+            if remaining is not None:
+                if remaining[0] <= 0:
+                    break
+                remaining[0] -= 1
+
+            endpoint = rng.choices(endpoints, weights)[0]
+            token = self.tokens[rng.randrange(len(self.tokens))]
+            method, path, body = self.build_request(endpoint, rng)
+
+            started_at = time.perf_counter()
+            try:
+                # Le corps est lu en entier : la latence inclut le téléchargement
+                response = await client.request(method, path, json=body, headers={'Authorization': f'Bearer {token}'})
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0  # erreur réseau ou délai dépassé
+            self.samples[endpoint].append((status, time.perf_counter() - started_at))
+
+    async def run(self):
+        async with self.client() as client:
+            await self.register_users(client)
+
+            workers = range(self.options.concurrency)
+            if self.options.warmup:
+                # Les résultats de la phase de chauffe sont ignorés
+                deadline = time.monotonic() + self.options.warmup
+                await asyncio.gather(*(self.worker(client, i, deadline, None) for i in workers))
+                self.samples = {endpoint: [] for endpoint in self.mix}
+
+            remaining = [self.options.requests] if self.options.requests else None
+            started_at = time.monotonic()
+            deadline = started_at + self.options.duration
+            await asyncio.gather(*(self.worker(client, i, deadline, remaining) for i in workers))
+            return summarize(self.samples, time.monotonic() - started_at)
+
+
+# --- Résultats ---
+
+def parse_mix(value):
+    mix = {}
+    for item in value.split(','):
+        endpoint, _, weight = item.partition('=')
+        endpoint = endpoint.strip()
+        if endpoint not in ('generate', 'schemas', 'history'):
+            raise SystemExit(f"Endpoint inconnu dans --mix : {endpoint}")
+        mix[endpoint] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values, percent):
+    """Percentile par rang le plus proche (valeurs triées)."""
+    if not sorted_values:
+        return None
+    rank = max(int(round(percent / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(samples, elapsed):
+    endpoints = {}
+    for endpoint, values in list(samples.items()) + [('total', [v for values in samples.values() for v in values])]:
+        latencies = sorted(latency for _, latency in values)
+        count = len(values)
+        throttled = sum(1 for status, _ in values if status == 429)
+        errors = sum(1 for status, _ in values if status == 0 or (status >= 400 and status != 429))
+        endpoints[endpoint] = {
+            'requests': count,
+            'throughput': count / elapsed if elapsed else 0,
+            'p50_ms': _ms(percentile(latencies, 50)),
+            'p95_ms': _ms(percentile(latencies, 95)),
+            'p99_ms': _ms(percentile(latencies, 99)),
+            'max_ms': _ms(latencies[-1] if latencies else None),
+            'error_rate': errors / count if count else 0,
+            'throttled_rate': throttled / count if count else 0,
+        }
+    return {'elapsed': elapsed, 'endpoints': endpoints}
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+def print_report(results, baseline=None):
+    columns = ['requests', 'throughput', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'error_rate', 'throttled_rate']
+    print(f"\nDurée mesurée : {results['elapsed']:.1f}s")
+    print(f"{'endpoint':<10}" + ''.join(f'{column:>16}' for column in columns))
+    for endpoint, stats in results['endpoints'].items():
+        print(f'{endpoint:<10}' + ''.join(f'{_format(stats[column]):>16}' for column in columns))
+        reference = (baseline or {}).get('endpoints', {}).get(endpoint)
+        if reference:
+            deltas = ''.join(f'{_delta(stats[column], reference.get(column)):>16}' for column in columns)
+            print(f"{'  vs ref':<10}" + deltas)
+
+
+def _format(value):
+    if value is None:
+        return '-'
+    if isinstance(value, float):
+        return f'{value:.3f}' if value < 1 else f'{value:.1f}'
+    return str(value)
+
+
+def _delta(value, reference):
+    if value is None or not reference:
+        return '-'
+    return f'{(value - reference) / reference:+.1%}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test de charge de l'API SyntheticData.")
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000/api', help="URL racine de l'API.")
+    parser.add_argument('--users', type=int, default=10, help="Nombre d'utilisateurs créés.")
+    parser.add_argument('--concurrency', type=int, default=20, help="Requêtes simultanées.")
+    parser.add_argument('--duration', type=float, default=30, help="Durée de la mesure (secondes).")
+    parser.add_argument('--requests', type=int, default=0, help="Arrête après ce nombre de requêtes (0 = illimité).")
+    parser.add_argument('--warmup', type=float, default=0, help="Durée de chauffe non mesurée (secondes).")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="Poids des endpoints, ex. generate=0.5,schemas=0.25,history=0.25.")
+    parser.add_argument('--rows', type=int, default=100, help="Lignes par génération.")
+    parser.add_argument('--formats', default='json,csv', help="Formats tirés pour les générations.")
+    # runserver répond ~40 ms plus tard sur une connexion réutilisée : à activer
+    # pour gunicorn/uvicorn uniquement
+    parser.add_argument('--keep-alive', action='store_true', help="Réutilise les connexions HTTP.")
+    parser.add_argument('--timeout', type=float, default=60, help="Délai maximal d'une requête (secondes).")
+    parser.add_argument('--seed', type=int, default=0, help="Graine du tirage des requêtes (reproductible).")
+    parser.add_argument('--output', help="Enregistre les résultats dans ce fichier JSON.")
+    parser.add_argument('--compare', help="Compare les résultats à ceux d'une exécution précédente (JSON).")
+    options = parser.parse_args(argv)
+    options.formats = [value for value in options.formats.split(',') if value]
+
+    print(f"🚀 {options.users} utilisateurs, concurrence {options.concurrency}, mix {options.mix}")
+    results = asyncio.run(LoadTest(options).run())
+    results['config'] = {
+        key: value for key, value in vars(options).items() if key not in ('output', 'compare')
+    }
+    results['python'] = platform.python_version()
+
+    baseline = None
+    if options.compare:
+        with open(options.compare) as file:
+            baseline = json.load(file)
+        if baseline.get('config', {}) != results['config']:
+            print("⚠️ Configuration différente de l'exécution de référence : comparaison indicative.")
+    print_report(results, baseline)
+
+    if options.output:
+        with open(options.output, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f"\nRésultats enregistrés dans {options.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -54,6 +54,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Request latency/status metrics (generator.metrics), outermost to see every response
+    'generator.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -62,6 +64,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Per-phase timing (Server-Timing header + JSON logs), see REQUEST_TIMING_ENABLED
+    'generator.timing.RequestTimingMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -136,6 +140,17 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Media files (stored generation outputs, profiles)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Seconds between two stack samples when an admin profiles a generation
+# (POST /api/generate/?profile=1), see generator.services.profiler
+PROFILING_SAMPLE_INTERVAL = 0.005
+# A profile still running after this many seconds (e.g. a stream never closed)
+# is stopped, so that the next profile can start
+PROFILING_MAX_SECONDS = 600
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -147,13 +162,55 @@ AUTH_USER_MODEL = 'users.User'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWT authentication resolving users from a short-lived local cache
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # Requests/sec limit of the user's plan (see subscriptions.PlanLimit)
+    'DEFAULT_THROTTLE_CLASSES': (
+        'generator.throttling.PlanRateThrottle',
+    ),
 }
 
+# Quotas & throttling (generator.services.quota_manager)
+# Write-through is the default: every reservation is one conditional UPDATE (exact
+# across worker processes), its only query. With QUOTA_WRITEBACK_INTERVAL > 0, usage is tracked in process
+# memory and written back in batches while a user stays under
+# QUOTA_WRITEBACK_LOCAL_RATIO of their limit; each process can then reserve up to
+# that fraction before the database is checked again.
+QUOTA_WRITEBACK_INTERVAL = 0  # seconds between two writebacks (0 = write-through)
+QUOTA_WRITEBACK_MAX_PENDING = 50000  # pending rows (all users) forcing an early writeback
+QUOTA_WRITEBACK_LOCAL_RATIO = 0.5  # fraction of the daily limit reserved without the database
+QUOTA_STATE_TTL = 30  # seconds before a user's quota state is re-read from the database
+PLAN_LIMITS_CACHE_TTL = 60  # seconds before the PlanLimit table is re-read
+# The daily quota is charged in units weighted by the measured cost of each
+# field type (FieldTypeCost, `manage.py calibrate_costs`): a row costs the sum of
+# its field weights / QUOTA_WEIGHT_PER_UNIT. Set QUOTA_COST_WEIGHTED to False to
+# charge one unit per row.
+QUOTA_COST_WEIGHTED = True
+QUOTA_WEIGHT_PER_UNIT = 5  # weight of a one-unit row ('name' weighs 1)
+FIELD_COSTS_CACHE_TTL = 60  # seconds before the FieldTypeCost table is re-read
+
+# Admission control (generator.services.cost_model): the output size, memory and
+# CPU time of a generation are estimated before it starts. Requests over the
+# memory budget are streamed (json, csv, sql, xml) or rejected (xlsx, batches).
+GENERATION_MEMORY_BUDGET = 256 * 1024 * 1024  # bytes a request may build in memory
+GENERATION_STREAMING_MAX_BYTES = 1024 * 1024 * 1024  # largest streamed file
+GENERATION_MAX_CPU_SECONDS = 300  # estimated CPU time above which a request is rejected
+
+# Schema preview (/api/preview/): rows are generated by pooled Faker instances
+# (generator.services.generator_pool) and cached per schema, locale, seed and row count
+GENERATOR_POOL_SIZE = 4  # idle generators kept per locale and per process
+PREVIEW_CACHE_TTL = 30  # seconds a preview stays in the cache
+PREVIEW_MAX_BYTES = 1024 * 1024  # estimated output above which a (free) preview is rejected
+
+# Schemas learned from a sample file (/api/schemas/learn/): the upload is read
+# chunk by chunk (generator.services.sample_profiler), in bounded memory per column
+LEARN_MAX_UPLOAD_BYTES = 100 * 1024 * 1024  # largest accepted sample file
+LEARN_MAX_ROWS = 1000000  # rows profiled at most, the rest of the file is ignored
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=5),
@@ -164,6 +221,35 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Request timing (generator.timing): Server-Timing header and one JSON log line
+# per request on the 'generator.timing' logger
+REQUEST_TIMING_ENABLED = os.getenv('REQUEST_TIMING_ENABLED', 'False') == 'True'
+
+# Metrics (generator.metrics), exposed on /api/metrics/ to staff users and to
+# scrapers sending "Authorization: Bearer <METRICS_TOKEN>". With several worker
+# processes, METRICS_MULTIPROCESS_DIR must point to a directory shared by all of
+# them (emptied when the application is deployed).
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_MULTIPROCESS_DIR = os.getenv('METRICS_MULTIPROCESS_DIR') or None
+METRICS_SYNC_INTERVAL = 1  # seconds between two snapshots of a worker's metrics
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'raw': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'timing': {'class': 'logging.StreamHandler', 'formatter': 'raw'},
+    },
+    'loggers': {
+        'generator.timing': {'handlers': ['timing'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+# Seconds a user resolved from a JWT stays in the local authentication cache
+USER_CACHE_TTL = 30
+
 # CORS
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
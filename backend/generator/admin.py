@@ -1,5 +1,11 @@
+import os
+
 from django.contrib import admin
-from .models import Schema, GeneratedDataset
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404
+from django.urls import path, reverse
+from django.utils.html import format_html
+from .models import Schema, SchemaDefinition, GeneratedDataset, DailyUsage, FieldTypeCost
 
 @admin.register(Schema)
 class SchemaAdmin(admin.ModelAdmin):
@@ -24,17 +30,34 @@ class SchemaAdmin(admin.ModelAdmin):
             'description': 'Définition du schéma au format JSON'
         }),
         ('Métadonnées', {
-            'fields': ('date_created',)
+            'fields': ('fingerprint', 'date_created')
         }),
     )
     
     # Champs en lecture seule
-    readonly_fields = ['date_created']
+    readonly_fields = ['fingerprint', 'date_created']
     
     # Ordre par défaut
     ordering = ['-date_created']
 
 
+@admin.register(SchemaDefinition)
+class SchemaDefinitionAdmin(admin.ModelAdmin):
+    """Configuration de l'admin pour les définitions de schémas dédupliquées"""
+    
+    # Colonnes affichées
+    list_display = ['id', 'fingerprint', 'created_at']
+    
+    # Recherche
+    search_fields = ['fingerprint']
+    
+    # Contenu adressé par son empreinte : non modifiable
+    readonly_fields = ['fingerprint', 'schema_json', 'created_at']
+    
+    # Ordre par défaut
+    ordering = ['-created_at']
+
+
 @admin.register(GeneratedDataset)
 class GeneratedDatasetAdmin(admin.ModelAdmin):
     """Configuration de l'admin pour les Datasets générés"""
@@ -54,18 +77,100 @@ class GeneratedDatasetAdmin(admin.ModelAdmin):
             'fields': ('user',)
         }),
         ('Configuration', {
-            'fields': ('schema', 'schema_json', 'nb_rows', 'file_format')
+            'fields': ('schema', 'definition', 'nb_rows', 'file_format')
         }),
         ('Fichier', {
             'fields': ('file_path',)
         }),
+        ('Reproduction', {
+            'fields': ('seed', 'locale', 'field_order', 'generator_version', 'generated_at'),
+            'description': 'Paramètres de régénération à l\'identique (GET /api/history/<id>/download/)'
+        }),
+        ('Profilage', {
+            'fields': ('profile_links',),
+            'description': 'Profil de la requête (POST /api/generate/?profile=1 par un administrateur)'
+        }),
         ('Métadonnées', {
             'fields': ('created_at',)
         }),
     )
     
     # Champs en lecture seule
-    readonly_fields = ['created_at']
+    readonly_fields = [
+        'definition', 'profile_links', 'seed', 'locale', 'field_order', 'generator_version', 'generated_at', 'created_at'
+    ]
+    
+    # Ordre par défaut
+    ordering = ['-created_at']
+    
+    # Fichiers de profil téléchargeables
+    PROFILE_FILES = {
+        'pstats': 'profile_path',
+        'collapsed': 'profile_stacks_path',
+    }
+    
+    def get_urls(self):
+        return [
+            path(
+                '<int:pk>/profile/<str:kind>/',
+                self.admin_site.admin_view(self.download_profile),
+                name='generator_generateddataset_profile',
+            ),
+        ] + super().get_urls()
+    
+    @admin.display(description='Profils')
+    def profile_links(self, obj):
+        if not obj.pk or not obj.profile_path:
+            return '-'
+        return format_html(
+            '<a href="{}">pstats (cProfile)</a> &middot; <a href="{}">piles agrégées (flame graph)</a>',
+            reverse('admin:generator_generateddataset_profile', args=[obj.pk, 'pstats']),
+            reverse('admin:generator_generateddataset_profile', args=[obj.pk, 'collapsed']),
+        )
+    
+    def download_profile(self, request, pk, kind):
+        """Sert un fichier de profil (réservé aux administrateurs)."""
+        dataset = self.get_object(request, pk)
+        if dataset is None or kind not in self.PROFILE_FILES or not self.has_view_permission(request, dataset):
+            raise Http404
+        file_path = getattr(dataset, self.PROFILE_FILES[kind])
+        if not file_path or not default_storage.exists(file_path):
+            raise Http404
+        return FileResponse(default_storage.open(file_path, 'rb'), as_attachment=True, filename=os.path.basename(file_path))
+
+
+@admin.register(DailyUsage)
+class DailyUsageAdmin(admin.ModelAdmin):
+    """Configuration de l'admin pour l'agrégat d'utilisation journalière"""
+    
+    # Colonnes affichées
+    list_display = ['day', 'user', 'file_format', 'datasets_count', 'rows']
+    
+    # Filtres
+    list_filter = ['file_format', 'day', 'user__plan']
+    
+    # Recherche
+    search_fields = ['user__email', 'user__username']
+    
+    # Navigation par date
+    date_hierarchy = 'day'
+    
+    # Le registre est alimenté automatiquement
+    readonly_fields = ['user', 'day', 'file_format', 'datasets_count', 'rows']
+    
+    # Ordre par défaut
+    ordering = ['-day']
+
+
+@admin.register(FieldTypeCost)
+class FieldTypeCostAdmin(admin.ModelAdmin):
+    """Configuration de l'admin pour les coûts par type de champ (python manage.py calibrate_costs)"""
+    
+    # Colonnes affichées
+    list_display = ['field_type', 'weight', 'us_per_value', 'avg_bytes', 'calibrated_at']
+    
+    # Recherche
+    search_fields = ['field_type']
     
     # Ordre par défaut
-    ordering = ['-created_at']
\ No newline at end of file
+    ordering = ['-weight']
@@ -0,0 +1,75 @@
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+from .models import Schema, GeneratedDataset
+
+
+def conditional_get(etag_func=None, last_modified_func=None):
+    """
+    Decorator adding ETag/Last-Modified validation to the get() method of a 
+    DRF view.
+    
+    The validator functions receive the (authenticated) request and the URL 
+    kwargs and must be cheap: when they match the client's If-None-Match / 
+    If-Modified-Since headers, a 304 is returned before the view fetches or 
+    serializes anything. Responses are marked `private, no-cache` so browsers 
+    keep them and revalidate on every use.
+    """
+    def decorator(method):
+        conditional_method = method_decorator(
+            condition(etag_func=etag_func, last_modified_func=last_modified_func)
+        )(method)
+
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            response = conditional_method(self, request, *args, **kwargs)
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ['Accept', 'Authorization'])
+            return response
+        return wrapper
+    return decorator
+
+
+def make_etag(request, *parts):
+    """
+    Builds an ETag from validator values. The full path (pagination cursor, 
+    query parameters) and the Accept header are included, since each 
+    combination is a different representation.
+    """
+    key = ':'.join(str(part) for part in (request.get_full_path(), request.META.get('HTTP_ACCEPT', ''), *parts))
+    return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+
+# --- Validators (one aggregate query each, no row fetch) ---
+
+def schema_list_etag(request, *args, **kwargs):
+    # A count plus the latest update changes on every create, update and delete
+    stats = Schema.objects.filter(user=request.user).aggregate(count=Count('id'), updated=Max('date_updated'))
+    return make_etag(request, request.user.pk, stats['count'], stats['updated'])
+
+
+def schema_detail_last_modified(request, pk, *args, **kwargs):
+    # Read once per request: used by both the Last-Modified and the ETag validators
+    if not hasattr(request, '_schema_date_updated'):
+        request._schema_date_updated = Schema.objects.filter(
+            user=request.user, pk=pk
+        ).values_list('date_updated', flat=True).first()
+    return request._schema_date_updated
+
+
+def schema_detail_etag(request, pk, *args, **kwargs):
+    updated = schema_detail_last_modified(request, pk)
+    if updated is None:
+        return None
+    return make_etag(request, request.user.pk, pk, updated)
+
+
+def history_etag(request, *args, **kwargs):
+    # History rows are never modified: a count plus the latest id is enough
+    stats = GeneratedDataset.objects.filter(user=request.user).aggregate(count=Count('id'), last_id=Max('id'))
+    return make_etag(request, request.user.pk, stats['count'], stats['last_id'])
@@ -0,0 +1,111 @@
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from generator.models import GeneratedDataset, DailyUsage
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the DailyUsage rollup table from the GeneratedDataset history.
+
+    The history is aggregated in primary-key batches (keyset iteration), so no
+    single query scans the whole table. The ledger rows of every (user, day, 
+    format) found are then written day by day, each day in its own short 
+    transaction that only locks that day's ledger rows. Run it once after 
+    deploying the ledger; new generations are recorded incrementally.
+
+    The ledger also counts usage that has no history row (row ranges of 
+    /api/generate/range/) or whose history was pruned, so a ledger row is 
+    only ever raised to the history totals, never lowered. The current day is 
+    left alone: it is still being recorded by the views.
+    """
+    help = "Rebuilds the DailyUsage rollup table from the generation history, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000, help="History rows aggregated per query.")
+        parser.add_argument('--dry-run', action='store_true', help="Aggregate only, do not write the ledger.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        started_at = time.monotonic()
+
+        # Rows logged after this point are recorded incrementally by the views
+        max_id = GeneratedDataset.objects.aggregate(max_id=Max('id'))['max_id']
+        if max_id is None:
+            self.stdout.write("Aucun historique à traiter.")
+            return
+
+        today = timezone.localdate()
+        totals = defaultdict(lambda: [0, 0])
+        last_id, processed = 0, 0
+        while last_id < max_id:
+            upper_id = min(last_id + batch_size, max_id)
+            batch = GeneratedDataset.objects.filter(id__gt=last_id, id__lte=upper_id).order_by().annotate(
+                day=TruncDate('created_at')
+            ).values('user_id', 'day', 'file_format').annotate(
+                datasets_count=Count('id'), rows=Sum('nb_rows')
+            )
+            for entry in batch:
+                if entry['day'] >= today:
+                    continue
+                key = (entry['user_id'], entry['day'], entry['file_format'])
+                totals[key][0] += entry['datasets_count']
+                totals[key][1] += entry['rows']
+                processed += entry['datasets_count']
+            last_id = upper_id
+
+        self.stdout.write(f"{processed} entrées d'historique agrégées en {len(totals)} lignes d'utilisation.")
+        if options['dry_run']:
+            return
+
+        days = defaultdict(dict)
+        for (user_id, day, file_format), counts in totals.items():
+            days[day][(user_id, file_format)] = counts
+
+        created_count, updated_count = 0, 0
+        for day in sorted(days):
+            created, updated = self.write_day(day, days[day], batch_size)
+            created_count += created
+            updated_count += updated
+        self.stdout.write(f"{created_count} lignes créées, {updated_count} relevées au niveau de l'historique.")
+
+        elapsed = time.monotonic() - started_at
+        self.stdout.write(self.style.SUCCESS(
+            f"Registre d'utilisation reconstruit en {elapsed:.1f}s ({processed / max(elapsed, 1e-6):.0f} entrées/s)."
+        ))
+
+    @staticmethod
+    def write_day(day, totals, batch_size):
+        """
+        Raises the ledger rows of one day to the history totals, in one transaction.
+
+        Args:
+            day (date): The usage day.
+            totals (dict): (user_id, file_format) -> [datasets_count, rows] from the history.
+
+        Returns:
+            tuple: The number of ledger rows created and updated.
+        """
+        with transaction.atomic():
+            existing = {
+                (row.user_id, row.file_format): row
+                for row in DailyUsage.objects.select_for_update().filter(day=day)
+            }
+            created, updated = [], []
+            for (user_id, file_format), (count, rows) in totals.items():
+                row = existing.get((user_id, file_format))
+                if row is None:
+                    created.append(DailyUsage(user_id=user_id, day=day, file_format=file_format, datasets_count=count, rows=rows))
+                elif row.datasets_count < count or row.rows < rows:
+                    row.datasets_count = max(row.datasets_count, count)
+                    row.rows = max(row.rows, rows)
+                    updated.append(row)
+            DailyUsage.objects.bulk_create(created, batch_size=batch_size)
+            DailyUsage.objects.bulk_update(updated, ['datasets_count', 'rows'], batch_size=batch_size)
+        return len(created), len(updated)
@@ -0,0 +1,97 @@
+import json
+import platform
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from generator.services.benchmark import GeneratorBenchmark
+
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'
+
+
+class Command(BaseCommand):
+    """
+    Runs the generation benchmarks offline (no server, no database writes):
+    per-field-type cost, the column-wise types (distributions, patterns,
+    learned models) and correlated groups, generate_dataset at several row
+    counts, and the time and peak memory of every export format.
+
+    Results are written as JSON and compared against a stored baseline
+    (--baseline); the command fails (non-zero exit status) when a metric
+    regresses beyond the threshold.
+    """
+    help = "Benchmarks DataGenerator and FileExporter and compares the results to a baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,50000,500000', help="Row counts for generate_dataset.")
+        parser.add_argument('--export-rows', type=int, default=10000, help="Rows of the dataset given to the exporters.")
+        parser.add_argument('--repeat', type=int, default=3, help="Runs per measurement (the best one is kept).")
+        parser.add_argument('--column-rows', type=int, default=50000, help="Rows generated per column type.")
+        parser.add_argument('--only', choices=['field_types', 'columns', 'datasets', 'exporters'], action='append',
+                            help="Run only these benchmark groups (repeatable).")
+        parser.add_argument('--output', help="Write the results to this JSON file.")
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help="Baseline JSON file to compare against.")
+        parser.add_argument('--save-baseline', action='store_true', help="Store the results as the new baseline.")
+        parser.add_argument('--threshold', type=float, default=0.25, help="Allowed relative slowdown (0.25 = +25%%).")
+
+    def handle(self, *args, **options):
+        benchmark = GeneratorBenchmark(repeat=options['repeat'])
+        groups = options['only'] or ['field_types', 'columns', 'datasets', 'exporters']
+
+        metrics = {}
+        if 'field_types' in groups:
+            self.stdout.write("Coût par type de champ...")
+            metrics.update(benchmark.field_types())
+        if 'columns' in groups:
+            self.stdout.write(f"Colonnes vectorisées et groupes ({options['column_rows']} lignes)...")
+            metrics.update(benchmark.columns(rows=options['column_rows']))
+        if 'datasets' in groups:
+            sizes = [int(size) for size in options['sizes'].split(',') if size]
+            self.stdout.write(f"generate_dataset ({', '.join(map(str, sizes))} lignes)...")
+            metrics.update(benchmark.datasets(sizes=sizes))
+        if 'exporters' in groups:
+            self.stdout.write(f"Exporteurs ({options['export_rows']} lignes)...")
+            metrics.update(benchmark.exporters(rows=options['export_rows']))
+
+        for metric, value in sorted(metrics.items()):
+            self.stdout.write(f"  {metric:<55} {value:>12.3f}")
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'metrics': metrics,
+        }
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2))
+
+        baseline_path = Path(options['baseline'])
+        if options['save_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(report, indent=2))
+            self.stdout.write(self.style.SUCCESS(f"Baseline enregistrée dans {baseline_path}."))
+            return
+
+        if not baseline_path.exists():
+            self.stdout.write(self.style.WARNING(
+                f"Aucune baseline trouvée ({baseline_path}). Utilisez --save-baseline pour en créer une."
+            ))
+            return
+
+        baseline = json.loads(baseline_path.read_text())['metrics']
+        missing = sorted(set(metrics) - set(baseline))
+        if missing:
+            self.stdout.write(self.style.WARNING(
+                f"{len(missing)} mesure(s) absente(s) de la baseline, non comparée(s) : {', '.join(missing)}."
+            ))
+        regressions = GeneratorBenchmark.compare(metrics, baseline, options['threshold'])
+        for metric, reference, value, ratio in regressions:
+            self.stdout.write(self.style.ERROR(
+                f"  Régression {metric}: {reference:.3f} -> {value:.3f} (x{ratio:.2f})"
+            ))
+        if regressions:
+            raise CommandError(f"{len(regressions)} régression(s) au-delà de {options['threshold']:.0%}.")
+        self.stdout.write(self.style.SUCCESS("Aucune régression par rapport à la baseline."))
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from generator.models import FieldTypeCost
+from generator.services.benchmark import GeneratorBenchmark
+from generator.services.cost_model import COST_REFERENCE_TYPE
+
+
+class Command(BaseCommand):
+    """
+    Measures the size and generation time of every field type against
+    DataGenerator and stores them in FieldTypeCost, with each type's weight
+    relative to COST_REFERENCE_TYPE. The weights drive the cost-weighted
+    daily quota and the output size estimates (generator.services.cost_model).
+
+    Weights are ratios between types, so a calibration on a faster or slower
+    machine gives the same quota charges.
+    """
+    help = "Calibrates the per-field-type cost weights used by the quota and the cost model."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--values', type=int, default=5000, help="Values generated per field type.")
+        parser.add_argument('--repeat', type=int, default=3, help="Runs per measurement (the best one is kept).")
+        parser.add_argument('--dry-run', action='store_true', help="Print the measured costs without saving them.")
+
+    def handle(self, *args, **options):
+        costs = GeneratorBenchmark(repeat=options['repeat']).field_type_costs(values=options['values'])
+        reference_us = costs[COST_REFERENCE_TYPE][1]
+        if reference_us <= 0:
+            raise CommandError(f"Temps de référence ({COST_REFERENCE_TYPE}) invalide.")
+
+        now = timezone.now()
+        self.stdout.write(f"{'type':<24}{'octets':>10}{'µs':>10}{'poids':>10}")
+        for field_type, (avg_bytes, us_per_value) in sorted(costs.items(), key=lambda item: -item[1][1]):
+            weight = round(us_per_value / reference_us, 3)
+            self.stdout.write(f"{field_type:<24}{avg_bytes:>10.1f}{us_per_value:>10.1f}{weight:>10.3f}")
+            if not options['dry_run']:
+                FieldTypeCost.objects.update_or_create(field_type=field_type, defaults={
+                    'avg_bytes': round(avg_bytes, 1),
+                    'us_per_value': round(us_per_value, 2),
+                    'weight': weight,
+                    'calibrated_at': now,
+                })
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING("[dry-run] Aucun coût enregistré."))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"{len(costs)} coûts enregistrés (poids relatifs à {COST_REFERENCE_TYPE})."
+            ))
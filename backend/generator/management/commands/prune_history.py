@@ -0,0 +1,179 @@
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, ProtectedError
+from django.utils import timezone
+
+from generator.models import GeneratedDataset, SchemaDefinition
+from generator.services.quota_manager import QuotaManager
+from subscriptions.models import PlanLimit
+from users.models import User
+
+
+# Fallback size of a history row when the database cannot report it
+ESTIMATED_ROW_BYTES = 200
+
+
+class Command(BaseCommand):
+    """
+    Deletes the generation history older than the retention period of each
+    user's effective plan (PlanLimit.history_retention_days, see
+    QuotaManager.get_effective_plan: a paid plan whose subscription lapsed
+    keeps the free retention), along with the stored output files.
+
+    Users are visited one by one; their rows are selected by keyset iteration
+    on the primary key and deleted in bounded batches, so each statement only
+    locks a small set of rows.
+    """
+    help = "Deletes generation history past each plan's retention period, in bounded batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows deleted per statement.")
+        parser.add_argument('--plan', help="Only prune the history of this plan.")
+        parser.add_argument('--sleep', type=float, default=0, help="Pause (seconds) between two batches.")
+        parser.add_argument('--dry-run', action='store_true', help="Only estimate the rows and bytes to reclaim.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+        started_at = time.monotonic()
+
+        retention = dict(
+            PlanLimit.objects.filter(history_retention_days__isnull=False).values_list('plan', 'history_retention_days')
+        )
+        if options['plan']:
+            retention = {plan: days for plan, days in retention.items() if plan == options['plan']}
+        if not retention:
+            self.stdout.write("Aucune durée de rétention à appliquer.")
+            return
+
+        now = timezone.now()
+        cutoffs = {plan: now - timedelta(days=days) for plan, days in retention.items()}
+        # Only the users with history older than the shortest retention are visited
+        candidates = User.objects.filter(Exists(GeneratedDataset.objects.filter(
+            user=OuterRef('pk'), created_at__lt=max(cutoffs.values())
+        ))).order_by('pk').only('pk', 'plan')
+
+        stats = defaultdict(lambda: [0, 0, 0])
+        for user in candidates.iterator():
+            plan = QuotaManager.get_effective_plan(user)
+            if plan not in cutoffs:
+                continue
+            expired = GeneratedDataset.objects.filter(user=user, created_at__lt=cutoffs[plan])
+            rows, files, file_bytes = self._prune(expired, batch_size, dry_run, options['sleep'])
+            stats[plan][0] += rows
+            stats[plan][1] += files
+            stats[plan][2] += file_bytes
+
+        total_rows, total_files, total_file_bytes = 0, 0, 0
+        for plan, (rows, files, file_bytes) in sorted(stats.items()):
+            self.stdout.write(
+                f"Plan {plan} (rétention {retention[plan]} j) : "
+                f"{rows} lignes, {files} fichiers, {file_bytes / 1024 / 1024:.1f} Mo de fichiers."
+            )
+            total_rows += rows
+            total_files += files
+            total_file_bytes += file_bytes
+
+        row_bytes = total_rows * self._row_size()
+        elapsed = time.monotonic() - started_at
+        if dry_run:
+            self.stdout.write(self.style.WARNING(
+                f"[dry-run] {total_rows} lignes et {total_files} fichiers seraient supprimés "
+                f"(~{(row_bytes + total_file_bytes) / 1024 / 1024:.1f} Mo récupérés)."
+            ))
+            return
+
+        definitions = self._prune_definitions(batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f"{total_rows} lignes, {total_files} fichiers et {definitions} définitions de schémas supprimés "
+            f"en {elapsed:.1f}s ({total_rows / max(elapsed, 1e-6):.0f} lignes/s, "
+            f"~{(row_bytes + total_file_bytes) / 1024 / 1024:.1f} Mo récupérés)."
+        ))
+
+    def _prune(self, expired, batch_size, dry_run, sleep):
+        """
+        Deletes the given history rows and their files in batches.
+
+        Returns:
+            tuple: The rows, files and file bytes deleted (or to delete in a dry run).
+        """
+        rows, files, file_bytes = 0, 0, 0
+        last_id = 0
+        while True:
+            batch = list(
+                expired.filter(id__gt=last_id).order_by('id').values_list(
+                    'id', 'file_path', 'profile_path', 'profile_stacks_path'
+                )[:batch_size]
+            )
+            if not batch:
+                return rows, files, file_bytes
+            last_id = batch[-1][0]
+
+            paths = [path for _, *row_paths in batch for path in row_paths if path]
+            if dry_run:
+                file_bytes += sum(self._file_size(path) for path in paths)
+            else:
+                # Database rows first: a leftover file is harmless, a dangling row is not
+                GeneratedDataset.objects.filter(id__in=[pk for pk, *_ in batch]).delete()
+                file_bytes += sum(self._delete_file(path) for path in paths)
+                if sleep:
+                    time.sleep(sleep)
+            rows += len(batch)
+            files += len(paths)
+
+    @staticmethod
+    def _file_size(path):
+        try:
+            return default_storage.size(path)
+        except (OSError, NotImplementedError):
+            return 0
+
+    def _delete_file(self, path):
+        size = self._file_size(path)
+        try:
+            default_storage.delete(path)
+        except (OSError, NotImplementedError):
+            return 0
+        return size
+
+    @staticmethod
+    def _row_size():
+        """Average on-disk size of a history row, read from PostgreSQL when available."""
+        if connection.vendor != 'postgresql':
+            return ESTIMATED_ROW_BYTES
+        table = GeneratedDataset._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_total_relation_size(%s::regclass), reltuples FROM pg_class WHERE oid = %s::regclass",
+                [table, table]
+            )
+            total_bytes, tuples = cursor.fetchone()
+        return total_bytes / tuples if tuples and tuples > 0 else ESTIMATED_ROW_BYTES
+
+    @staticmethod
+    def _prune_definitions(batch_size):
+        """Deletes the schema definitions no history row references anymore, in batches."""
+        # Recent definitions are skipped: a generation may be about to reference them
+        unreferenced = SchemaDefinition.objects.filter(
+            created_at__lt=timezone.now() - timedelta(days=1)
+        ).exclude(Exists(GeneratedDataset.objects.filter(definition=OuterRef('pk'))))
+
+        deleted, last_id = 0, 0
+        while True:
+            ids = list(unreferenced.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            last_id = ids[-1]
+            try:
+                # Checked again in the DELETE itself: a definition referenced since
+                # the batch was selected is kept, and the rest of the batch deleted
+                with transaction.atomic():
+                    deleted += unreferenced.filter(id__in=ids).delete()[0]
+            except ProtectedError:
+                # Referenced by a generation not yet committed: kept for now
+                pass
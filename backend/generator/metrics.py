@@ -0,0 +1,429 @@
+import atexit
+import glob
+import hmac
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, math.inf)
+BYTES_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8, math.inf)
+
+
+class Metric:
+    """
+    Base class of the metrics: one value per combination of label values.
+
+    The API mirrors prometheus_client (labels(), inc(), observe(), ...) so the
+    registry can be swapped for it without touching the call sites.
+    """
+    kind = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def labels(self, **labels):
+        return BoundMetric(self, tuple(str(labels[name]) for name in self.labelnames))
+
+    def _initial(self):
+        return 0
+
+    def _update(self, key, func):
+        with self.registry.lock:
+            self.values[key] = func(self.values.get(key, self._initial()))
+
+    def snapshot(self):
+        return {
+            'type': self.kind,
+            'help': self.documentation,
+            'labelnames': list(self.labelnames),
+            'samples': [[list(key), value] for key, value in self.values.items()],
+        }
+
+
+class BoundMetric:
+    """A metric with its label values applied."""
+    __slots__ = ('metric', 'key')
+
+    def __init__(self, metric, key):
+        self.metric = metric
+        self.key = key
+
+    def inc(self, amount=1):
+        self.metric._update(self.key, lambda value: value + amount)
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def observe(self, value):
+        self.metric._observe(self.key, value)
+
+    @contextmanager
+    def time(self):
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at)
+
+    @contextmanager
+    def track_inprogress(self):
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _initial(self):
+        # [count per bucket (not cumulative), sum, count]
+        return [[0] * len(self.buckets), 0, 0]
+
+    def _observe(self, key, value):
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self.registry.lock:
+            counts, total, count = self.values.get(key) or self._initial()
+            counts = list(counts)
+            counts[index] += 1
+            self.values[key] = [counts, total + value, count + 1]
+
+    def snapshot(self):
+        data = super().snapshot()
+        data['buckets'] = [bound if bound != math.inf else None for bound in self.buckets]
+        return data
+
+
+class MetricsRegistry:
+    """
+    The in-process metrics registry.
+
+    With METRICS_MULTIPROCESS_DIR set, every worker process writes a snapshot
+    of its metrics to its own file in that directory (at most every
+    METRICS_SYNC_INTERVAL seconds, and at exit), and the metrics endpoint sums
+    the snapshots of all processes: counters and histograms of exited workers
+    are kept, gauges only count live processes.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.pid = os.getpid()
+        self.started_at = time.time_ns()
+        self._synced_at = 0
+
+    def _register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def snapshot(self):
+        with self.lock:
+            return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    # --- Multi-process aggregation ---
+
+    @staticmethod
+    def _directory():
+        return getattr(settings, 'METRICS_MULTIPROCESS_DIR', None)
+
+    def _file_name(self):
+        # The start time keeps the file of a reused pid apart from its predecessor
+        return os.path.join(self._directory(), f'metrics_{self.pid}_{self.started_at}.json')
+
+    def sync(self, force=False):
+        """Writes this process' snapshot to the shared directory (atomically)."""
+        directory = self._directory()
+        if not directory:
+            return
+        if os.getpid() != self.pid:
+            # Forked worker: start a file of its own, without the parent's values
+            self.pid, self.started_at, self._synced_at = os.getpid(), time.time_ns(), 0
+            with self.lock:
+                for metric in self.metrics.values():
+                    metric.values = {}
+        now = time.monotonic()
+        if not force and now - self._synced_at < getattr(settings, 'METRICS_SYNC_INTERVAL', 1):
+            return
+        self._synced_at = now
+        os.makedirs(directory, exist_ok=True)
+        path = self._file_name()
+        with open(f'{path}.tmp', 'w') as file:
+            json.dump({'pid': self.pid, 'metrics': self.snapshot()}, file)
+        os.replace(f'{path}.tmp', path)
+
+    def collect(self):
+        """Returns the merged snapshots of every process (or of this one only)."""
+        snapshots = [self.snapshot()]
+        directory = self._directory()
+        if directory:
+            own_file = self._file_name()
+            for path in glob.glob(os.path.join(directory, 'metrics_*.json')):
+                if path == own_file:
+                    continue
+                try:
+                    with open(path) as file:
+                        data = json.load(file)
+                except (OSError, ValueError):
+                    continue
+                alive = _pid_alive(data['pid'])
+                snapshots.append({
+                    name: metric for name, metric in data['metrics'].items()
+                    if alive or metric['type'] != 'gauge'
+                })
+        return merge_snapshots(snapshots)
+
+    def render(self):
+        """Renders the metrics in the Prometheus text exposition format."""
+        return render_text(self.collect())
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_snapshots(snapshots):
+    """Sums the samples of several snapshots, metric by metric and label by label."""
+    merged = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {**metric, 'samples': {}})
+            for labels, value in metric['samples']:
+                key = tuple(labels)
+                current = target['samples'].get(key)
+                if current is None:
+                    target['samples'][key] = value
+                elif metric['type'] == 'histogram':
+                    target['samples'][key] = [
+                        [a + b for a, b in zip(current[0], value[0])], current[1] + value[1], current[2] + value[2]
+                    ]
+                else:
+                    target['samples'][key] = current + value
+    return merged
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = [(name, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for name, value in pairs]
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value))
+
+
+def render_text(metrics):
+    lines = []
+    for name, metric in sorted(metrics.items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        names = metric['labelnames']
+        for labels, value in sorted(metric['samples'].items()):
+            if metric['type'] != 'histogram':
+                lines.append(f'{name}{_format_labels(names, labels)} {_format_value(value)}')
+                continue
+            counts, total, count = value
+            cumulative = 0
+            for bound, bucket_count in zip(metric['buckets'], counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound is None else _format_value(bound)
+                lines.append(f"{name}_bucket{_format_labels(names, labels, ('le', le))} {_format_value(cumulative)}")
+            lines.append(f'{name}_sum{_format_labels(names, labels)} {_format_value(total)}')
+            lines.append(f'{name}_count{_format_labels(names, labels)} {_format_value(count)}')
+    return '\n'.join(lines) + '\n'
+
+
+# --- Application metrics ---
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_DURATION = REGISTRY.histogram(
+    'http_request_duration_seconds', 'API request latency.', ['endpoint', 'method']
+)
+REQUESTS = REGISTRY.counter(
+    'http_requests_total', 'API requests by response status.', ['endpoint', 'method', 'status']
+)
+QUOTA_REJECTIONS = REGISTRY.counter(
+    'quota_rejections_total', 'Requests rejected with 429 (rate limit or daily quota).', ['endpoint']
+)
+GENERATION_DURATION = REGISTRY.histogram(
+    'generation_duration_seconds', 'Time to generate and export one dataset.', ['format']
+)
+EXPORT_DURATION = REGISTRY.histogram(
+    'export_duration_seconds', 'Time spent in the exporter.', ['format']
+)
+EXPORT_SIZE = REGISTRY.histogram(
+    'export_size_bytes', 'Size of the exported files.', ['format'], buckets=BYTES_BUCKETS
+)
+ROWS_GENERATED = REGISTRY.counter(
+    'rows_generated_total', 'Rows generated.', ['format']
+)
+BYTES_EXPORTED = REGISTRY.counter(
+    'bytes_exported_total', 'Bytes of exported files.', ['format']
+)
+GENERATIONS_IN_FLIGHT = REGISTRY.gauge(
+    'generations_in_flight', 'Generation requests being processed.', ['endpoint']
+)
+
+
+def record_export(file_format, rows, size, seconds):
+    """Records the rows, bytes and exporter time of one exported file."""
+    ROWS_GENERATED.labels(format=file_format).inc(rows)
+    BYTES_EXPORTED.labels(format=file_format).inc(size)
+    EXPORT_SIZE.labels(format=file_format).observe(size)
+    EXPORT_DURATION.labels(format=file_format).observe(seconds)
+
+
+class ClosingStream:
+    """
+    Streamed content calling `on_close` once, when it is exhausted or closed
+    (StreamingHttpResponse closes its content when the client goes away).
+    """
+    def __init__(self, chunks, on_close):
+        self.chunks = chunks
+        self.on_close = on_close
+        self._closed = False
+
+    def __iter__(self):
+        try:
+            yield from self.chunks
+        finally:
+            self.close()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            close = getattr(self.chunks, 'close', None)
+            if close is not None:
+                close()
+        finally:
+            self.on_close()
+
+
+def on_response_sent(response, callback):
+    """
+    Calls `callback` once the response is sent: right away, or for a streaming
+    response once its content has been streamed (or the stream was closed).
+    """
+    if getattr(response, 'streaming', False):
+        response.streaming_content = ClosingStream(response.streaming_content, callback)
+    else:
+        callback()
+    return response
+
+
+def track_in_flight(endpoint):
+    """
+    View method decorator counting the requests being processed in
+    GENERATIONS_IN_FLIGHT. A streamed generation stays in flight until its
+    stream ends.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            in_flight = GENERATIONS_IN_FLIGHT.labels(endpoint=endpoint)
+            in_flight.inc()
+            try:
+                response = method(*args, **kwargs)
+            except BaseException:
+                in_flight.dec()
+                raise
+            return on_response_sent(response, in_flight.dec)
+        return wrapper
+    return decorator
+
+
+class MetricsMiddleware:
+    """
+    Records the latency and status of every request, labelled by URL name. The
+    latency of a streaming response runs until its last chunk is sent.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started_at = time.perf_counter()
+        response = self.get_response(request)
+        match = request.resolver_match
+        # The URL name (not the path) keeps the number of label values bounded
+        endpoint = match.view_name if match else 'unmatched'
+        REQUESTS.labels(endpoint=endpoint, method=request.method, status=response.status_code).inc()
+        if response.status_code == 429:
+            QUOTA_REJECTIONS.labels(endpoint=endpoint).inc()
+
+        def observe_duration():
+            REQUEST_DURATION.labels(endpoint=endpoint, method=request.method).observe(time.perf_counter() - started_at)
+            REGISTRY.sync()
+        return on_response_sent(response, observe_duration)
+
+
+def metrics_view(request):
+    """
+    Exposes the metrics in the Prometheus text format.
+    Endpoint: GET /api/metrics/
+
+    Allowed for staff users (admin session) and for scrapers sending
+    `Authorization: Bearer <METRICS_TOKEN>`.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    authorization = request.headers.get('Authorization', '')
+    allowed = request.user.is_staff or (token and hmac.compare_digest(authorization, f'Bearer {token}'))
+    if not allowed:
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def _sync_at_exit():
+    # The last values of an exiting worker stay in the aggregated counters
+    try:
+        REGISTRY.sync(force=True)
+    except Exception:
+        pass
+
+
+atexit.register(_sync_at_exit)
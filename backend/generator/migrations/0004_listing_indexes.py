@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('generator', '0003_dailyusage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='generateddataset',
+            index=models.Index(fields=['user', '-created_at'], name='dataset_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schema',
+            index=models.Index(fields=['user', '-date_created'], name='schema_user_date_idx'),
+        ),
+    ]
@@ -0,0 +1,119 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:05
+
+import hashlib
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+BATCH_SIZE = 2000
+
+
+def fingerprint(schema):
+    # Frozen copy of generator.services.fingerprint.schema_fingerprint
+    canonical = json.dumps(schema, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def dedupe_schemas(apps, schema_editor):
+    """
+    Moves the schema JSON of every history row to SchemaDefinition, storing each
+    distinct schema once. Rows are processed in primary-key batches.
+    """
+    GeneratedDataset = apps.get_model('generator', 'GeneratedDataset')
+    SchemaDefinition = apps.get_model('generator', 'SchemaDefinition')
+    Schema = apps.get_model('generator', 'Schema')
+
+    last_id = 0
+    while True:
+        batch = list(
+            GeneratedDataset.objects.filter(id__gt=last_id).order_by('id').only('id', 'schema_json')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+
+        schemas = {}
+        for dataset in batch:
+            dataset.fingerprint = fingerprint(dataset.schema_json)
+            schemas.setdefault(dataset.fingerprint, dataset.schema_json)
+
+        SchemaDefinition.objects.bulk_create(
+            [SchemaDefinition(fingerprint=key, schema_json=value) for key, value in schemas.items()],
+            ignore_conflicts=True,
+        )
+        ids = dict(SchemaDefinition.objects.filter(fingerprint__in=schemas).values_list('fingerprint', 'id'))
+        for dataset in batch:
+            dataset.definition_id = ids[dataset.fingerprint]
+        GeneratedDataset.objects.bulk_update(batch, ['definition'])
+        last_id = batch[-1].id
+
+    last_id = 0
+    while True:
+        batch = list(Schema.objects.filter(id__gt=last_id).order_by('id').only('id', 'schema_json')[:BATCH_SIZE])
+        if not batch:
+            break
+        for schema in batch:
+            schema.fingerprint = fingerprint(schema.schema_json)
+        Schema.objects.bulk_update(batch, ['fingerprint'])
+        last_id = batch[-1].id
+
+
+def restore_schemas(apps, schema_editor):
+    GeneratedDataset = apps.get_model('generator', 'GeneratedDataset')
+
+    last_id = 0
+    while True:
+        batch = list(
+            GeneratedDataset.objects.filter(id__gt=last_id).order_by('id').select_related('definition')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for dataset in batch:
+            dataset.schema_json = dataset.definition.schema_json
+        GeneratedDataset.objects.bulk_update(batch, ['schema_json'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('generator', '0004_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchemaDefinition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=64, unique=True)),
+                ('schema_json', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='schema',
+            name='fingerprint',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='generateddataset',
+            name='definition',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='datasets', to='generator.schemadefinition'),
+        ),
+        migrations.AlterField(
+            model_name='generateddataset',
+            name='schema_json',
+            field=models.JSONField(null=True),
+        ),
+        migrations.RunPython(dedupe_schemas, restore_schemas),
+        migrations.RemoveField(
+            model_name='generateddataset',
+            name='schema_json',
+        ),
+        migrations.AlterField(
+            model_name='generateddataset',
+            name='definition',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='datasets', to='generator.schemadefinition'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def copy_date_created(apps, schema_editor):
+    Schema = apps.get_model('generator', 'Schema')
+    Schema.objects.update(date_updated=models.F('date_created'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('generator', '0005_schema_definitions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schema',
+            name='date_updated',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_date_created, migrations.RunPython.noop),
+    ]
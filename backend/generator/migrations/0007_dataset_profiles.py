@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('generator', '0006_schema_date_updated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generateddataset',
+            name='profile_path',
+            field=models.CharField(blank=True, default='', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='generateddataset',
+            name='profile_stacks_path',
+            field=models.CharField(blank=True, default='', max_length=500),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('generator', '0007_dataset_profiles'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FieldTypeCost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field_type', models.CharField(max_length=50, unique=True)),
+                ('avg_bytes', models.FloatField()),
+                ('us_per_value', models.FloatField()),
+                ('weight', models.FloatField()),
+                ('calibrated_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['field_type'],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('generator', '0009_dataset_reproduction'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='generateddataset',
+            name='dataset_user_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='schema',
+            name='schema_user_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='generateddataset',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='dataset_user_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schema',
+            index=models.Index(fields=['user', '-date_created', '-id'], name='schema_user_date_id_idx'),
+        ),
+    ]
@@ -1,6 +1,39 @@
 from django.db import models
 # Assuming 'users' app is where the custom User model is defined
 from users.models import User
+from .services.fingerprint import schema_fingerprint
+
+
+## SchemaDefinition Model
+class SchemaDefinitionManager(models.Manager):
+    """
+    Manager storing each distinct schema content only once.
+    """
+    def intern(self, schema):
+        """
+        Returns the SchemaDefinition of the given schema content, creating it if needed.
+        """
+        definition, _ = self.get_or_create(
+            fingerprint=schema_fingerprint(schema),
+            defaults={'schema_json': schema}
+        )
+        return definition
+
+
+class SchemaDefinition(models.Model):
+    """
+    Content-addressed storage of schema JSON: one row per distinct schema, keyed 
+    by the SHA-256 of its canonical JSON. History rows reference it instead of 
+    keeping their own copy of the schema.
+    """
+    fingerprint = models.CharField(max_length=64, unique=True)
+    schema_json = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = SchemaDefinitionManager()
+
+    def __str__(self):
+        return self.fingerprint[:12]
 
 ## Schema Model
 class Schema(models.Model):
@@ -19,16 +52,33 @@ class Schema(models.Model):
     # Example: {"first_name": "name", "customer_email": "email"}
     schema_json = models.JSONField()
 
+    # Content fingerprint of schema_json (see SchemaDefinition), kept in sync on save.
+    fingerprint = models.CharField(max_length=64, blank=True, db_index=True, editable=False)
+
     # Automatically records the date and time when the schema was first created.
     date_created = models.DateTimeField(auto_now_add=True)
+
+    # Updated on every save; used as the validator for conditional GET requests.
+    date_updated = models.DateTimeField(auto_now=True)
     
     class Meta:
         # Orders query results by the most recently created schemas first.
         ordering = ['-date_created']
+        # Serves the per-user listing (cursor pagination on date_created).
+        indexes = [
+            models.Index(fields=['user', '-date_created', '-id'], name='schema_user_date_id_idx'),
+        ]
     
     def __str__(self):
         """String representation used in the Django admin site."""
         return f"{self.user.email} - {self.name}"
+    
+    def save(self, *args, **kwargs):
+        self.fingerprint = schema_fingerprint(self.schema_json)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'schema_json' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'fingerprint'}
+        super().save(*args, **kwargs)
 
 
 ## GeneratedDataset Model
@@ -53,8 +103,8 @@ class GeneratedDataset(models.Model):
     # the dataset record remains, but the foreign key is set to NULL.
     schema = models.ForeignKey(Schema, on_delete=models.SET_NULL, null=True, blank=True)
 
-    # Stores a copy of the schema JSON at the time of generation for historical integrity.
-    schema_json = models.JSONField()
+    # The schema content at the time of generation, stored once per distinct schema.
+    definition = models.ForeignKey(SchemaDefinition, on_delete=models.PROTECT, related_name='datasets')
     nb_rows = models.IntegerField() # The number of data rows generated in this dataset.
 
     # The format in which the file was saved (e.g., 'csv', 'json').
@@ -62,10 +112,91 @@ class GeneratedDataset(models.Model):
 
     # Path or URL where the generated file is stored (e.g., S3 or local path).
     file_path = models.CharField(max_length=500, blank=True, null=True)
+
+    # Storage paths of the profile of the request, when an admin asked for one
+    # (cProfile statistics and collapsed stacks for flame graphs).
+    profile_path = models.CharField(max_length=500, blank=True, default='')
+    profile_stacks_path = models.CharField(max_length=500, blank=True, default='')
+
+    # Everything needed to regenerate the file identically (GET /api/history/<id>/download/):
+    # the seed of the random generators, the locale(s) of the rows, the order of the
+    # fields (the schema definition is shared by every field order), the generator 
+    # version and the reference date of the generated dates. Datasets generated 
+    # before seeds were recorded have no seed and cannot be regenerated.
+    seed = models.BigIntegerField(null=True, blank=True)
+    locale = models.JSONField(default=dict, blank=True)
+    field_order = models.JSONField(default=list, blank=True)
+    generator_version = models.CharField(max_length=100, blank=True, default='')
+    generated_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['-created_at']
+        # Serves the per-user history listing (cursor pagination on created_at).
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='dataset_user_created_id_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.user.email} - {self.nb_rows} rows - {self.file_format}"
\ No newline at end of file
+        return f"{self.user.email} - {self.nb_rows} rows - {self.file_format}"
+    
+    def ordered_schema(self):
+        """The schema of the dataset, with its fields in the order they were generated."""
+        schema = self.definition.schema_json
+        if not self.field_order:
+            return schema
+        return {field_name: schema[field_name] for field_name in self.field_order}
+
+## DailyUsage Model
+class DailyUsage(models.Model):
+    """
+    Aggregated usage ledger: one row per (user, day, format), incremented every 
+    time a generation is logged. Usage reports and billing queries read this 
+    table instead of scanning GeneratedDataset.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_usage')
+    day = models.DateField()
+    file_format = models.CharField(max_length=10, choices=GeneratedDataset.FORMAT_CHOICES)
+
+    # Number of datasets generated and total number of rows exported that day.
+    datasets_count = models.PositiveIntegerField(default=0)
+    rows = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'day', 'file_format'], name='unique_daily_usage'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='daily_usage_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.email} - {self.day} - {self.file_format}: {self.rows} rows"
+
+
+## FieldTypeCost Model
+class FieldTypeCost(models.Model):
+    """
+    Measured cost of one value of a field type, calibrated by the
+    `calibrate_costs` command against DataGenerator. Used to estimate the
+    output size of a request and to charge the daily quota in weighted units
+    (see generator.services.cost_model).
+    """
+    field_type = models.CharField(max_length=50, unique=True)
+
+    # Average size of a value (UTF-8 bytes) and time to generate it (microseconds).
+    avg_bytes = models.FloatField()
+    us_per_value = models.FloatField()
+
+    # Cost relative to the reference type (COST_REFERENCE_TYPE, weight 1).
+    weight = models.FloatField()
+
+    # Date of the benchmark run the values come from (empty for the built-in defaults).
+    calibrated_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['field_type']
+
+    def __str__(self):
+        return f"{self.field_type} (x{self.weight:.2f})"
@@ -0,0 +1,25 @@
+from rest_framework.pagination import CursorPagination
+
+
+class HistoryCursorPagination(CursorPagination):
+    """
+    Cursor pagination of the dataset history, newest first.
+    Backed by the (user, -created_at, -id) index of GeneratedDataset: the id 
+    breaks ties between the entries of a batch, logged with the same timestamp, 
+    so that no entry is skipped or repeated at a page boundary.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class SchemaCursorPagination(CursorPagination):
+    """
+    Cursor pagination of the saved schemas, newest first.
+    Backed by the (user, -date_created, -id) index of Schema (the id breaks ties).
+    """
+    ordering = ('-date_created', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
@@ -1,5 +1,45 @@
 from rest_framework import serializers
 from .models import Schema, GeneratedDataset
+from .services.column_models import compile_model
+from .services.data_generator import validate_field_type
+from .services.field_spec import parse_field_spec
+from .services.locales import DEFAULT_LOCALE, parse_locales
+
+
+def validate_field_types(schema):
+    """
+    Rejects the schema values that are neither a type nor a valid field object 
+    (injection rates, locales), the unknown types, the custom_text, distribution 
+    and pattern types whose parameters are invalid (e.g. 'normal(50)'), as well 
+    as malformed learned models. Every accepted type is costed by CostModel as 
+    it is generated.
+    """
+    errors = []
+    for field_name, value in (schema.items() if isinstance(schema, dict) else ()):
+        try:
+            spec = parse_field_spec(value)
+            validate_field_type(spec.type)
+            if spec.model is not None:
+                compile_model(spec.model)
+        except ValueError as e:
+            errors.append(f"{field_name}: {e}")
+    if errors:
+        raise serializers.ValidationError(errors)
+    return schema
+
+
+def validate_locale(value):
+    """Normalizes the locale option into {locale: probability}."""
+    try:
+        return parse_locales(value)
+    except ValueError as e:
+        raise serializers.ValidationError(str(e))
+
+
+LOCALE_HELP_TEXT = (
+    "Locale of the rows ('de_DE'), or weighted locales drawn per row "
+    "({'fr_FR': 0.6, 'de_DE': 0.3, 'en_US': 0.1})."
+)
 
 class SchemaSerializer(serializers.ModelSerializer):
     """
@@ -16,6 +56,44 @@ class SchemaSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'date_created']
 
 
+class SchemaListSerializer(serializers.ModelSerializer):
+    """
+    Lightweight representation of a saved schema used by the list endpoint. 
+    The schema JSON itself is only returned on demand (?include_schema=true).
+    """
+    class Meta:
+        model = Schema
+        fields = ['id', 'name', 'date_created']
+        read_only_fields = fields
+
+
+class SchemaLearnSerializer(serializers.Serializer):
+    """
+    Validates the upload of the /api/schemas/learn/ endpoint: a sample file 
+    (CSV with a header line, or NDJSON) whose columns are learned into a schema.
+    """
+    file = serializers.FileField(help_text="Sample file: CSV with a header line, or NDJSON (one JSON object per line).")
+    name = serializers.CharField(required=False, max_length=255, help_text="Name of the saved schema (file name if omitted).")
+    format = serializers.ChoiceField(
+        choices=['csv', 'ndjson'], required=False,
+        help_text="Format of the file (guessed from its extension if omitted)."
+    )
+
+    def validate(self, data):
+        upload = data['file']
+        if 'format' not in data:
+            extension = upload.name.rsplit('.', 1)[-1].lower() if '.' in upload.name else ''
+            if extension == 'csv':
+                data['format'] = 'csv'
+            elif extension in ('ndjson', 'jsonl'):
+                data['format'] = 'ndjson'
+            else:
+                raise serializers.ValidationError({'format': "Format introuvable : précisez 'csv' ou 'ndjson'."})
+        if not data.get('name'):
+            data['name'] = upload.name.rsplit('.', 1)[0][:255] or 'Schéma appris'
+        return data
+
+
 class GenerateDataSerializer(serializers.Serializer):
     """
     Custom serializer used to validate incoming POST request data for the 
@@ -33,6 +111,74 @@ class GenerateDataSerializer(serializers.Serializer):
     )
     save_schema = serializers.BooleanField(default=False, help_text="Set to true to save the schema blueprint to the user's account.")
     schema_name = serializers.CharField(required=False, allow_blank=True, help_text="Name for the schema (required if save_schema is True).")
+    locale = serializers.JSONField(default=DEFAULT_LOCALE, help_text=LOCALE_HELP_TEXT)
+    seed = serializers.IntegerField(
+        min_value=0, max_value=2**32 - 1, required=False,
+        help_text="Seed of the generated values (drawn at random if omitted, and recorded in the history)."
+    )
+
+    def validate_schema(self, value):
+        return validate_field_types(value)
+
+    def validate_locale(self, value):
+        return validate_locale(value)
+
+
+class GenerateRangeSerializer(serializers.Serializer):
+    """
+    Validates the POST data of the /api/generate/range/ endpoint: the rows 
+    offset.. offset + limit of the dataset of `rows` rows drawn from `seed`.
+    """
+    schema = serializers.JSONField(help_text="JSON schema defining the fields to generate (e.g., {'name': 'name'}).")
+    rows = serializers.IntegerField(min_value=1, max_value=10**9, help_text="The number of rows of the whole dataset")
+    offset = serializers.IntegerField(min_value=0, default=0, help_text="Index of the first row to return")
+    limit = serializers.IntegerField(min_value=1, max_value=100000, help_text="The number of rows to return")
+    seed = serializers.IntegerField(min_value=0, max_value=2**32 - 1, help_text="Seed of the dataset (the same for every range).")
+    reference_time = serializers.DateTimeField(
+        required=False,
+        help_text="Latest date of the 'date' and 'datetime' fields (start of the current UTC day if omitted)."
+    )
+    format = serializers.ChoiceField(
+        choices=['json', 'csv', 'sql', 'xml'],
+        default='json',
+        help_text="The desired output format for the range."
+    )
+    locale = serializers.JSONField(default=DEFAULT_LOCALE, help_text=LOCALE_HELP_TEXT)
+
+    def validate_schema(self, value):
+        return validate_field_types(value)
+
+    def validate_locale(self, value):
+        return validate_locale(value)
+
+    def validate(self, data):
+        if data['offset'] >= data['rows']:
+            raise serializers.ValidationError({'offset': "L'offset doit être inférieur au nombre de lignes du dataset."})
+        return data
+
+
+class PreviewSerializer(serializers.Serializer):
+    """
+    Validates the POST data of the /api/preview/ endpoint: a few rows of a 
+    schema being edited, reproducible with the same seed.
+    """
+    schema = serializers.JSONField(help_text="JSON schema defining the fields to generate (e.g., {'name': 'name'}).")
+    rows = serializers.IntegerField(min_value=1, max_value=50, default=10, help_text="The number of rows to preview")
+    seed = serializers.IntegerField(
+        min_value=0, max_value=2**32 - 1, required=False,
+        help_text="Seed of the generated values (drawn at random if omitted, and returned)."
+    )
+    locale = serializers.JSONField(default=DEFAULT_LOCALE, help_text=LOCALE_HELP_TEXT)
+
+    def validate_schema(self, value):
+        if not isinstance(value, dict) or not value:
+            raise serializers.ValidationError("Le schéma doit être un objet non vide {champ: type}.")
+        if len(value) > 100:
+            raise serializers.ValidationError("Un aperçu ne peut pas contenir plus de 100 champs.")
+        return validate_field_types(value)
+
+    def validate_locale(self, value):
+        return validate_locale(value)
 
 
 class GeneratedDatasetSerializer(serializers.ModelSerializer):
@@ -43,9 +189,69 @@ class GeneratedDatasetSerializer(serializers.ModelSerializer):
     # Custom read-only field to display the email of the generating user, 
     # fetched via the foreign key relationship.
     user_email = serializers.EmailField(source='user.email', read_only=True)
+    # The schema content is stored once per distinct schema (SchemaDefinition).
+    schema_json = serializers.JSONField(source='definition.schema_json', read_only=True)
     
     class Meta:
         model = GeneratedDataset
         # Fields exposed to the user in the history view.
-        fields = ['id', 'user_email', 'schema_json', 'nb_rows', 'file_format', 'file_path', 'created_at']
-        read_only_fields = ['id', 'user_email', 'created_at']
\ No newline at end of file
+        fields = [
+            'id', 'user_email', 'schema_json', 'nb_rows', 'file_format', 'file_path',
+            'seed', 'locale', 'generator_version', 'created_at'
+        ]
+        read_only_fields = ['id', 'user_email', 'schema_json', 'seed', 'locale', 'generator_version', 'created_at']
+
+
+class GeneratedDatasetListSerializer(GeneratedDatasetSerializer):
+    """
+    Lightweight representation of a history entry used by the list endpoint. 
+    The schema JSON is only returned on demand (?include_schema=true).
+    """
+    class Meta(GeneratedDatasetSerializer.Meta):
+        fields = [
+            'id', 'user_email', 'nb_rows', 'file_format', 'file_path', 'seed', 'locale', 'generator_version', 'created_at'
+        ]
+
+class BatchDatasetSerializer(serializers.Serializer):
+    """
+    Describes one dataset of a batch request: the schema is generated once and 
+    then exported to every requested format.
+    """
+    schema = serializers.JSONField(help_text="JSON schema defining the fields to generate (e.g., {'name': 'name'}).")
+    rows = serializers.IntegerField(min_value=1, max_value=50000, help_text="The number of data rows to generate")
+    formats = serializers.ListField(
+        child=serializers.ChoiceField(choices=['json', 'csv', 'xlsx', 'sql', 'xml']),
+        min_length=1,
+        help_text="The output formats to export this dataset to."
+    )
+    name = serializers.CharField(required=False, allow_blank=True, max_length=100, help_text="Base file name used inside the zip archive.")
+    locale = serializers.JSONField(default=DEFAULT_LOCALE, help_text=LOCALE_HELP_TEXT)
+    seed = serializers.IntegerField(
+        min_value=0, max_value=2**32 - 1, required=False,
+        help_text="Seed of the generated values (drawn at random if omitted, and recorded in the history)."
+    )
+
+    def validate_schema(self, value):
+        return validate_field_types(value)
+
+    def validate_locale(self, value):
+        return validate_locale(value)
+
+    def validate_formats(self, value):
+        # Each format is exported only once per dataset
+        return list(dict.fromkeys(value))
+
+
+class BatchGenerateSerializer(serializers.Serializer):
+    """
+    Custom serializer used to validate incoming POST request data for the 
+    /api/generate/batch/ endpoint.
+    """
+    datasets = BatchDatasetSerializer(many=True, help_text="The list of datasets to generate in a single call.")
+
+    def validate_datasets(self, value):
+        if not value:
+            raise serializers.ValidationError("Au moins un dataset est requis.")
+        if len(value) > 50:
+            raise serializers.ValidationError("Un batch ne peut pas contenir plus de 50 datasets.")
+        return value
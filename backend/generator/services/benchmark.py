@@ -0,0 +1,204 @@
+import gc
+import time
+import tracemalloc
+
+from .column_models import LEARNED_TYPE
+from .data_generator import DataGenerator
+from .distributions import EXAMPLES as DISTRIBUTION_EXAMPLES
+from .field_groups import GROUP_FIELD_TYPES, GROUP_PARTS
+from .file_exporter import FileExporter
+
+
+# Representative schema used for the dataset and exporter benchmarks
+BENCHMARK_SCHEMA = {
+    "nom": "name",
+    "email": "email",
+    "telephone": "phone_number",
+    "ville": "city",
+    "pays": "country",
+    "entreprise": "company",
+    "date_inscription": "date",
+    "commentaire": "text",
+}
+
+# Column-wise field types (distributions, patterns, learned models) and the
+# correlated groups, each measured inside generate_dataset: one schema per entry
+COLUMN_BENCHMARKS = {
+    **{f'distribution.{name}': {'valeur': field_type} for name, field_type in DISTRIBUTION_EXAMPLES.items()},
+    'pattern.random': {'code': 'pattern(ORD-####-??)'},
+    'pattern.seq': {'code': 'pattern(ID-{seq:6})'},
+    **{
+        f'group.{group}': {part: f'{group}.{part}' for part in parts}
+        for group, parts in GROUP_PARTS.items()
+    },
+    'learned.category': {'valeur': {'type': LEARNED_TYPE, 'model': {
+        'kind': 'category', 'values': ['a', 'b', 'c', 'd'], 'weights': [40, 30, 20, 10],
+    }}},
+    'learned.number': {'valeur': {'type': LEARNED_TYPE, 'model': {
+        'kind': 'number', 'edges': [0, 10, 20, 50, 100], 'counts': [5, 10, 3, 1], 'integer': False, 'decimals': 2,
+    }}},
+    'learned.string': {'valeur': {'type': LEARNED_TYPE, 'model': {
+        'kind': 'string', 'lengths': [4, 8, 12], 'weights': [1, 2, 1],
+        'chars': 'abcdefghij', 'char_weights': [1] * 10,
+    }}},
+    'nulls': {'valeur': {'type': 'normal(50,10)', 'null_rate': 0.2}},
+}
+
+
+class GeneratorBenchmark:
+    """
+    A service class measuring the performance of DataGenerator and FileExporter.
+
+    Results are flat dictionaries of metric name -> value (lower is better),
+    so two runs can be compared metric by metric.
+    """
+    def __init__(self, locale='fr_FR', seed=0, repeat=3):
+        self.locale = locale
+        self.seed = seed
+        self.repeat = repeat
+
+    def _generator(self):
+        generator = DataGenerator(locale=self.locale)
+        generator.fake.seed_instance(self.seed)
+        return generator
+
+    def _best_time(self, func, repeat=None):
+        """Best wall time of `repeat` runs, with the garbage collector disabled."""
+        timings = []
+        for _ in range(repeat or self.repeat):
+            gc.collect()
+            gc.disable()
+            try:
+                started_at = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - started_at)
+            finally:
+                gc.enable()
+        return min(timings)
+
+    @staticmethod
+    def _peak_memory(func):
+        """Peak memory (in MB) allocated by Python while running `func`."""
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return peak / 1024 / 1024
+
+    def field_types(self, field_types=None, values=2000):
+        """
+        Cost of generating one value of each field type.
+
+        Returns:
+            dict: {'field_types.<type>.us_per_value': microseconds}
+        """
+        generator = self._generator()
+        field_types = field_types or [*generator.generators, 'custom_text(50)']
+        results = {}
+        for field_type in field_types:
+            field_generator = generator.get_field_generator(field_type)
+
+            def run():
+                for _ in range(values):
+                    field_generator()
+            results[f'field_types.{field_type}.us_per_value'] = self._best_time(run) / values * 1e6
+        return results
+
+    def field_type_costs(self, values=2000):
+        """
+        Average size and generation time of one value of each built-in field type
+        (group fields measured alone), as used by CostModel (see the
+        calibrate_costs command).
+
+        Returns:
+            dict: {field_type: (avg_bytes, us_per_value)}
+        """
+        generator = self._generator()
+        field_types = [*generator.generators, *GROUP_FIELD_TYPES]
+        timings = self.field_types(field_types, values)
+        costs = {}
+        for field_type in field_types:
+            field_generator = generator.get_field_generator(field_type)
+            size = sum(len(str(field_generator()).encode('utf-8')) for _ in range(values))
+            costs[field_type] = (size / values, timings[f'field_types.{field_type}.us_per_value'])
+        return costs
+
+    def datasets(self, sizes=(1000, 50000, 500000), schema=None):
+        """
+        Wall time of DataGenerator.generate_dataset for each row count.
+
+        Returns:
+            dict: {'datasets.<rows>.seconds': seconds, 'datasets.<rows>.us_per_row': microseconds}
+        """
+        schema = schema or BENCHMARK_SCHEMA
+        generator = self._generator()
+        results = {}
+        for rows in sizes:
+            # Large sizes are measured once: they are long enough to be stable
+            seconds = self._best_time(
+                lambda: generator.generate_dataset(schema, rows),
+                repeat=1 if rows > 50000 else None
+            )
+            results[f'datasets.{rows}.seconds'] = seconds
+            results[f'datasets.{rows}.us_per_row'] = seconds / rows * 1e6
+        return results
+
+    def columns(self, rows=50000, benchmarks=None):
+        """
+        Cost of the column-wise field types and of the correlated groups, per
+        value of generate_dataset (a group counts one value per row).
+
+        Returns:
+            dict: {'columns.<name>.us_per_value': microseconds}
+        """
+        generator = self._generator()
+        results = {}
+        for name, schema in (benchmarks or COLUMN_BENCHMARKS).items():
+            seconds = self._best_time(lambda: generator.generate_dataset(schema, rows))
+            values = rows * (1 if name.startswith('group.') else len(schema))
+            results[f'columns.{name}.us_per_value'] = seconds / values * 1e6
+        return results
+
+    def exporters(self, rows=10000, formats=None, schema=None):
+        """
+        Wall time and peak memory of each FileExporter format on the same dataset.
+
+        Returns:
+            dict: {'exporters.<format>.seconds': seconds, 'exporters.<format>.peak_mb': MB}
+        """
+        data = self._generator().generate_dataset(schema or BENCHMARK_SCHEMA, rows)
+        results = {}
+        for file_format in formats or FileExporter.EXPORT_FORMATS:
+            results[f'exporters.{file_format}.seconds'] = self._best_time(
+                lambda: FileExporter.export(data, file_format)
+            )
+            results[f'exporters.{file_format}.peak_mb'] = self._peak_memory(
+                lambda: FileExporter.export(data, file_format)
+            )
+        return results
+
+    @staticmethod
+    def compare(results, baseline, threshold=0.25):
+        """
+        Compares results against a baseline.
+
+        Args:
+            results (dict): The metrics of the current run.
+            baseline (dict): The metrics of the reference run.
+            threshold (float): Allowed relative slowdown (0.25 = +25%).
+
+        Returns:
+            list: (metric, baseline_value, current_value, ratio) of every regression.
+        """
+        regressions = []
+        for metric, value in results.items():
+            reference = baseline.get(metric)
+            if not reference:
+                continue
+            ratio = value / reference
+            if ratio > 1 + threshold:
+                regressions.append((metric, reference, value, ratio))
+        return regressions
@@ -0,0 +1,121 @@
+import numpy as np
+
+
+# Field type of the columns learned from a sample file (see sample_profiler):
+# {"type": "learned", "null_rate": 0.1, "model": {"kind": "category", ...}}
+LEARNED_TYPE = 'learned'
+
+# Kinds of column models:
+# - category: {"values": [...], "weights": [...]}, values drawn by frequency
+# - number:   {"edges": [...], "counts": [...], "integer": bool, "decimals": int},
+#             a histogram bin drawn by count, then a uniform value in the bin
+# - date / datetime: same histogram over days / seconds since 1970-01-01
+# - string:   {"lengths": [...], "weights": [...], "chars": "...", "char_weights": [...]},
+#             a length drawn by frequency, then characters drawn by frequency
+MODEL_KINDS = ('category', 'number', 'date', 'datetime', 'string')
+
+# Bounds of a model, the same as those of the sample profiler: models are also
+# accepted in any schema, and a string column takes n x max(lengths) code points
+MAX_CATEGORIES = 1000
+MAX_HISTOGRAM_BINS = 1000
+MAX_STRING_LENGTH = 1000
+MAX_CHARS = 200
+
+
+def _array(values, dtype, name):
+    try:
+        array = np.asarray(values, dtype=dtype)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"modèle : {name} invalides.")
+    if array.ndim != 1:
+        raise ValueError(f"modèle : {name} invalides.")
+    return array
+
+
+def _probabilities(weights, size, name):
+    weights = _array(weights, float, name)
+    if len(weights) != size or size == 0 or (weights < 0).any() or not np.isfinite(weights).all() or weights.sum() <= 0:
+        raise ValueError(f"modèle : {name} invalides.")
+    return weights / weights.sum()
+
+
+def _histogram(model):
+    edges = _array(model.get('edges', []), float, "bornes d'histogramme")
+    if not 2 <= len(edges) <= MAX_HISTOGRAM_BINS + 1 or not np.isfinite(edges).all() or (np.diff(edges) < 0).any():
+        raise ValueError(f"modèle : bornes d'histogramme invalides (au plus {MAX_HISTOGRAM_BINS} classes).")
+    return edges, _probabilities(model.get('counts', []), len(edges) - 1, 'effectifs')
+
+
+def _sample_histogram(rng, n, edges, probabilities):
+    bins = rng.choice(len(probabilities), n, p=probabilities)
+    low, high = edges[bins], edges[bins + 1]
+    return low + rng.random(n) * (high - low)
+
+
+def compile_model(model):
+    """
+    Compiles a column model into a column sampler.
+
+    Returns:
+        callable: sample(rng, n) -> list of n values, drawn with a few NumPy calls.
+
+    Raises:
+        ValueError: If the model is malformed.
+    """
+    kind = model.get('kind') if isinstance(model, dict) else None
+    if kind not in MODEL_KINDS:
+        raise ValueError(f"modèle : type attendu parmi {', '.join(MODEL_KINDS)}.")
+
+    if kind == 'category':
+        values = model.get('values')
+        if not isinstance(values, list) or len(values) > MAX_CATEGORIES:
+            raise ValueError(f"modèle : valeurs invalides (au plus {MAX_CATEGORIES}).")
+        probabilities = _probabilities(model.get('weights', []), len(values), 'poids')
+        choices = np.empty(len(values), dtype=object)
+        choices[:] = values
+        return lambda rng, n: choices[rng.choice(len(choices), n, p=probabilities)].tolist()
+
+    if kind == 'number':
+        edges, probabilities = _histogram(model)
+        if model.get('integer'):
+            def sample(rng, n):
+                values = np.floor(_sample_histogram(rng, n, edges, probabilities))
+                return np.minimum(values, edges[-1]).astype(np.int64).tolist()
+            return sample
+        decimals = model.get('decimals', 6)
+        if isinstance(decimals, bool) or not isinstance(decimals, int) or decimals < 0:
+            raise ValueError("modèle : decimals invalide.")
+        decimals = min(decimals, 12)
+        return lambda rng, n: np.round(_sample_histogram(rng, n, edges, probabilities), decimals).tolist()
+
+    if kind in ('date', 'datetime'):
+        edges, probabilities = _histogram(model)
+        unit = 'D' if kind == 'date' else 's'
+
+        def sample(rng, n):
+            values = np.floor(_sample_histogram(rng, n, edges, probabilities)).astype(np.int64)
+            return values.astype(f'datetime64[{unit}]').astype(str).tolist()
+        return sample
+
+    # string
+    lengths = _array(model.get('lengths', []), np.int64, 'longueurs')
+    if len(lengths) > MAX_STRING_LENGTH + 1 or (lengths < 0).any() or (lengths > MAX_STRING_LENGTH).any():
+        raise ValueError(f"modèle : longueurs invalides (entre 0 et {MAX_STRING_LENGTH}).")
+    length_probabilities = _probabilities(model.get('weights', []), len(lengths), 'poids')
+    chars = model.get('chars', '')
+    if not isinstance(chars, str) or not chars or len(chars) > MAX_CHARS or '\0' in chars:
+        raise ValueError(f"modèle : caractères invalides (de 1 à {MAX_CHARS}).")
+    char_codes = np.array([ord(char) for char in chars], dtype=np.uint32)
+    char_probabilities = _probabilities(model.get('char_weights', []), len(chars), 'fréquences')
+    max_length = int(lengths.max())
+
+    def sample(rng, n):
+        value_lengths = lengths[rng.choice(len(lengths), n, p=length_probabilities)]
+        if max_length == 0:
+            return [''] * n
+        # Code points of every value in one array, padded with NUL (dropped by NumPy)
+        codes = np.zeros((n, max_length), dtype=np.uint32)
+        mask = np.arange(max_length) < value_lengths[:, None]
+        codes[mask] = char_codes[rng.choice(len(char_codes), int(value_lengths.sum()), p=char_probabilities)]
+        return codes.view(np.dtype(('U', max_length))).ravel().tolist()
+    return sample
@@ -0,0 +1,319 @@
+import math
+import time
+from collections import namedtuple
+
+from django.conf import settings
+
+from .column_models import LEARNED_TYPE
+from .custom_text import parse_custom_text
+from .distributions import DISTRIBUTION_RE
+from .field_spec import field_type_of
+from .patterns import PATTERN_RE, parse_pattern
+from .file_exporter import FileExporter
+
+
+# Average size (UTF-8 bytes) and generation time (microseconds) of one value
+# of a field type, and its cost relative to the reference type
+FieldCost = namedtuple('FieldCost', ['avg_bytes', 'us_per_value', 'weight'])
+
+# Weights are relative to this type, so they do not depend on the speed of
+# the machine the calibration ran on
+COST_REFERENCE_TYPE = 'name'
+
+# Used when a type has no FieldTypeCost row (measured with `manage.py benchmark`, fr_FR)
+DEFAULT_MEASUREMENTS = {
+    'name': (17.4, 17.6),
+    'first_name': (7.0, 4.7),
+    'last_name': (6.5, 3.9),
+    'email': (22.7, 23.0),
+    'phone_number': (15.2, 24.7),
+    'address': (38.2, 54.2),
+    'country': (10.6, 6.2),
+    'city': (11.3, 16.6),
+    'date': (10.0, 11.6),
+    'datetime': (26.0, 10.0),
+    'company': (11.4, 11.9),
+    'job': (25.1, 6.4),
+    'iban': (27.0, 42.7),
+    'credit_card': (15.3, 35.4),
+    'license_plate': (9.5, 22.8),
+    'text': (147.3, 134.8),
+    'paragraph': (102.7, 52.5),
+    'url': (20.5, 38.7),
+    'ipv4': (13.2, 73.4),
+    'user_agent': (91.8, 56.6),
+    # Group fields, measured alone (a group drawn once for several fields costs less)
+    'person.first_name': (7.1, 6.0),
+    'person.last_name': (6.4, 7.3),
+    'person.name': (14.5, 7.5),
+    'person.email': (24.6, 11.7),
+    'person.username': (9.3, 15.9),
+    'location.street': (19.8, 20.5),
+    'location.postcode': (5.0, 13.7),
+    'location.city': (11.6, 14.2),
+    'location.country': (6.0, 0.2),
+    'location.address': (39.3, 40.5),
+    'location.phone_number': (15.3, 23.4),
+}
+REFERENCE_US = DEFAULT_MEASUREMENTS[COST_REFERENCE_TYPE][1]
+
+DEFAULT_FIELD_COSTS = {
+    field_type: FieldCost(avg_bytes, us_per_value, round(us_per_value / REFERENCE_US, 3))
+    for field_type, (avg_bytes, us_per_value) in DEFAULT_MEASUREMENTS.items()
+}
+
+# custom_text(N) (parsed by custom_text.parse_custom_text, as in the generator):
+# values average ~75% of N characters, at ~1.1 µs per character
+CUSTOM_TEXT_BYTES_RATIO = 0.75
+CUSTOM_TEXT_US_PER_CHAR = 1.1
+
+# Distribution columns (normal(...), poisson(...), ...) are drawn in batches by NumPy:
+# ~17 bytes per float, 1 to 3 per count or choice
+DISTRIBUTION_COST = FieldCost(10, 0.3, round(0.3 / REFERENCE_US, 3))
+
+# Learned columns (sampled from a column model in batches): ~0.5 µs per value.
+# Strings and category values are costed by their longest value (see learned_cost):
+# a string column is drawn as an array of max(lengths) code points per value
+LEARNED_COST = FieldCost(12, 0.5, round(0.5 / REFERENCE_US, 3))
+LEARNED_US_PER_CHAR = 0.03
+
+# Lowest weight of a field in the quota: every field is charged, so a row
+# never costs nothing whatever its types
+MIN_FIELD_WEIGHT = 0.01
+
+# Types the generator does not know: a constant string
+UNKNOWN_COST = FieldCost(20, 0.3, round(0.3 / REFERENCE_US, 3))
+
+# pattern(...) columns are rendered in batches by NumPy: ~0.05 µs per character
+PATTERN_US_PER_CHAR = 0.05
+
+# Shape of each export format:
+# - field_bytes / name_bytes: bytes added per value, and per character of the field name
+# - row_bytes: bytes added per row
+# - size_ratio: output size relative to the raw values (compressed formats)
+# - peak_ratio: peak memory of the exporter relative to the output size
+# - us_per_value: exporter time per value
+FormatCost = namedtuple('FormatCost', ['field_bytes', 'name_bytes', 'row_bytes', 'size_ratio', 'peak_ratio', 'us_per_value'])
+
+FORMAT_COSTS = {
+    'json': FormatCost(13, 1, 10, 1.0, 4.6, 9.2),
+    'csv': FormatCost(1.3, 0, 2, 1.0, 2.5, 2.6),
+    'xlsx': FormatCost(0, 0, 0, 0.61, 34.0, 205.0),
+    'sql': FormatCost(4, 1, 42, 1.0, 2.2, 2.8),
+    'xml': FormatCost(10, 2, 18, 1.0, 14.4, 74.3),
+}
+
+# Memory taken by the generated rows themselves (Python dict and str objects)
+ROW_MEMORY_BYTES = 180
+VALUE_MEMORY_BYTES = 55
+
+CostEstimate = namedtuple('CostEstimate', ['output_bytes', 'memory_bytes', 'cpu_seconds'])
+Admission = namedtuple('Admission', ['action', 'reason'])
+
+ADMIT = 'admit'
+STREAM = 'stream'
+REJECT = 'reject'
+
+
+class CostModel:
+    """
+    A service class estimating, before any work starts, the output size, the
+    peak memory and the CPU time of a generation from the average size and
+    generation time of each field type, the row count and the export format.
+
+    The estimate decides how a request is served (see admit()):
+    - in memory, as today, when it fits GENERATION_MEMORY_BUDGET;
+    - streamed (rows generated and exported chunk by chunk) when it does not,
+      for the formats FileExporter can stream, up to GENERATION_STREAMING_MAX_BYTES;
+    - rejected otherwise, or when it exceeds GENERATION_MAX_CPU_SECONDS.
+
+    The same per-type costs weight the daily quota (see quota_units()). They
+    are read from the FieldTypeCost table, calibrated by `manage.py
+    calibrate_costs`, and cached for FIELD_COSTS_CACHE_TTL seconds.
+    """
+    _field_costs = {}
+    _field_costs_loaded_at = None
+
+    @classmethod
+    def field_cost(cls, field_type):
+        """Returns the FieldCost of a field type."""
+        cost = cls.get_field_costs().get(field_type)
+        if cost is not None:
+            return cost
+        try:
+            length = parse_custom_text(field_type)
+        except ValueError:
+            length = None
+        if length:
+            us_per_value = length * CUSTOM_TEXT_US_PER_CHAR
+            return FieldCost(length * CUSTOM_TEXT_BYTES_RATIO, us_per_value, us_per_value / REFERENCE_US)
+        if DISTRIBUTION_RE.match(field_type):
+            return DISTRIBUTION_COST
+        if field_type == LEARNED_TYPE:
+            return LEARNED_COST
+        if PATTERN_RE.match(field_type):
+            try:
+                length = parse_pattern(field_type).value_length()
+            except ValueError:
+                length = 0
+            us_per_value = 0.2 + length * PATTERN_US_PER_CHAR
+            return FieldCost(length, us_per_value, us_per_value / REFERENCE_US)
+        # Unknown types (rejected by the API) produce the constant "Unknown type: <type>",
+        # still charged like the cheapest types
+        return UNKNOWN_COST._replace(avg_bytes=len(field_type) + 14)
+
+    @classmethod
+    def value_cost(cls, value):
+        """Returns the FieldCost of a schema value (a learned field is costed by its model)."""
+        field_type = field_type_of(value)
+        if field_type == LEARNED_TYPE and isinstance(value, dict):
+            return learned_cost(value.get('model'))
+        return cls.field_cost(field_type)
+
+    @classmethod
+    def get_field_costs(cls):
+        """Returns the FieldCost of every known type: calibrated values over the defaults."""
+        ttl = getattr(settings, 'FIELD_COSTS_CACHE_TTL', 60)
+        loaded_at = cls._field_costs_loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > ttl:
+            from ..models import FieldTypeCost
+            cls._field_costs = {
+                **DEFAULT_FIELD_COSTS,
+                **{
+                    row.field_type: FieldCost(row.avg_bytes, row.us_per_value, row.weight)
+                    for row in FieldTypeCost.objects.all()
+                },
+            }
+            cls._field_costs_loaded_at = time.monotonic()
+        return cls._field_costs
+
+    @classmethod
+    def quota_units(cls, schema, rows):
+        """
+        Quota units charged for generating `rows` rows of `schema`.
+
+        With QUOTA_COST_WEIGHTED, a row costs the sum of the weights of its
+        fields divided by QUOTA_WEIGHT_PER_UNIT (by default, a row of five
+        `name`-like fields is one unit), each field weighing at least
+        MIN_FIELD_WEIGHT; otherwise one unit per row.
+        """
+        if not getattr(settings, 'QUOTA_COST_WEIGHTED', True):
+            return rows
+        row_weight = sum(max(cls.value_cost(value).weight, MIN_FIELD_WEIGHT) for value in schema.values())
+        return max(math.ceil(rows * row_weight / getattr(settings, 'QUOTA_WEIGHT_PER_UNIT', 5)), 1)
+
+    @classmethod
+    def estimate(cls, schema, rows, file_format):
+        """
+        Estimates the cost of generating `rows` rows of `schema` exported to `file_format`.
+
+        Returns:
+            CostEstimate: output_bytes, memory_bytes (buffered path) and cpu_seconds.
+        """
+        format_cost = FORMAT_COSTS[file_format]
+        costs = [(name, cls.value_cost(value)) for name, value in schema.items()]
+
+        value_bytes = sum(cost.avg_bytes for _, cost in costs)
+        markup_bytes = sum(
+            format_cost.field_bytes + format_cost.name_bytes * len(name.encode('utf-8')) for name, _ in costs
+        ) + format_cost.row_bytes
+        output_bytes = rows * (value_bytes * format_cost.size_ratio + markup_bytes)
+
+        rows_memory = rows * (ROW_MEMORY_BYTES + len(costs) * VALUE_MEMORY_BYTES + value_bytes)
+        memory_bytes = rows_memory + output_bytes * format_cost.peak_ratio
+
+        export_seconds = rows * len(costs) * format_cost.us_per_value / 1e6
+        return CostEstimate(
+            int(output_bytes), int(memory_bytes), cls.generation_seconds(schema, rows) + export_seconds
+        )
+
+    @classmethod
+    def generation_seconds(cls, schema, rows):
+        """Estimated CPU time of generating the rows (without export)."""
+        return rows * sum(cls.value_cost(value).us_per_value for value in schema.values()) / 1e6
+
+    @classmethod
+    def estimate_batch(cls, datasets):
+        """
+        Estimates a batch request: each dataset is generated once then exported
+        to each of its formats, and every file is kept in the zip archive.
+
+        Args:
+            datasets (list): Dictionaries with 'schema', 'rows' and 'formats'.
+
+        Returns:
+            CostEstimate
+        """
+        output_bytes, peak_bytes, cpu_seconds = 0, 0, 0
+        for item in datasets:
+            generation = cls.generation_seconds(item['schema'], item['rows'])
+            estimates = [cls.estimate(item['schema'], item['rows'], file_format) for file_format in item['formats']]
+            output_bytes += sum(estimate.output_bytes for estimate in estimates)
+            peak_bytes = max([peak_bytes] + [estimate.memory_bytes for estimate in estimates])
+            cpu_seconds += generation + sum(estimate.cpu_seconds - generation for estimate in estimates)
+        return CostEstimate(output_bytes, peak_bytes + output_bytes, cpu_seconds)
+
+    @staticmethod
+    def admit(estimate, file_format, streamable=True):
+        """
+        Decides how a generation is served.
+
+        Args:
+            estimate (CostEstimate): The estimated cost of the generation.
+            file_format (str): The export format.
+            streamable (bool): Whether the endpoint can stream this request.
+
+        Returns:
+            Admission: (ADMIT | STREAM | REJECT, reason of a rejection)
+        """
+        max_cpu = getattr(settings, 'GENERATION_MAX_CPU_SECONDS', 300)
+        if estimate.cpu_seconds > max_cpu:
+            return Admission(REJECT, (
+                f"Génération estimée à {estimate.cpu_seconds:.0f}s de calcul, au-delà de la limite de {max_cpu}s. "
+                f"Réduisez le nombre de lignes ou de champs longs (text, paragraph)."
+            ))
+
+        memory_budget = getattr(settings, 'GENERATION_MEMORY_BUDGET', 256 * 1024 * 1024)
+        if estimate.memory_bytes <= memory_budget:
+            return Admission(ADMIT, '')
+
+        max_stream = getattr(settings, 'GENERATION_STREAMING_MAX_BYTES', 1024 * 1024 * 1024)
+        if streamable and file_format in FileExporter.STREAMING_FORMATS and estimate.output_bytes <= max_stream:
+            return Admission(STREAM, '')
+
+        if streamable and file_format in FileExporter.STREAMING_FORMATS:
+            return Admission(REJECT, (
+                f"Fichier estimé à {_mb(estimate.output_bytes)} Mo, au-delà de la limite de {_mb(max_stream)} Mo. "
+                f"Réduisez le nombre de lignes."
+            ))
+        return Admission(REJECT, (
+            f"Export {file_format} estimé à {_mb(estimate.memory_bytes)} Mo de mémoire, au-delà de la limite de "
+            f"{_mb(memory_budget)} Mo. Réduisez le nombre de lignes ou choisissez un format diffusé en continu "
+            f"({', '.join(FileExporter.STREAMING_FORMATS)}) sur /api/generate/."
+        ))
+
+
+def learned_cost(model):
+    """
+    FieldCost of a learned column: strings cost max(lengths) characters (the
+    width of the array they are drawn in), categories their longest value.
+    """
+    if not isinstance(model, dict):
+        return LEARNED_COST
+    length = 0
+    if model.get('kind') == 'string':
+        lengths = model.get('lengths')
+        if isinstance(lengths, list):
+            length = max((value for value in lengths if isinstance(value, int)), default=0)
+    elif model.get('kind') == 'category':
+        values = model.get('values')
+        if isinstance(values, list):
+            length = max((len(str(value)) for value in values), default=0)
+    if length <= LEARNED_COST.avg_bytes:
+        return LEARNED_COST
+    us_per_value = LEARNED_COST.us_per_value + length * LEARNED_US_PER_CHAR
+    return FieldCost(length, us_per_value, us_per_value / REFERENCE_US)
+
+
+def _mb(size):
+    return f'{size / 1024 / 1024:.0f}'
@@ -0,0 +1,35 @@
+import re
+
+
+# custom_text(N): a Faker text of at most N characters; "custom_text" alone is N = 100
+CUSTOM_TEXT_RE = re.compile(r'^custom_text(?:\(\s*(\d+)\s*\))?$')
+
+DEFAULT_CUSTOM_TEXT_LENGTH = 100
+# Faker cannot write a text shorter than 5 characters
+MIN_CUSTOM_TEXT_LENGTH = 5
+MAX_CUSTOM_TEXT_LENGTH = 10000
+
+
+def parse_custom_text(field_type):
+    """
+    Parses a custom_text type, for the generator and the cost model alike.
+
+    Returns:
+        int: The maximum length of the values, or None if `field_type` is not a
+             custom_text type.
+
+    Raises:
+        ValueError: If the type starts with 'custom_text' but is malformed
+                    (e.g. 'custom_text_(50)'), or its length is out of bounds.
+    """
+    if not field_type.startswith('custom_text'):
+        return None
+    match = CUSTOM_TEXT_RE.match(field_type)
+    if not match:
+        raise ValueError("custom_text : format attendu custom_text(N).")
+    length = int(match.group(1)) if match.group(1) else DEFAULT_CUSTOM_TEXT_LENGTH
+    if not MIN_CUSTOM_TEXT_LENGTH <= length <= MAX_CUSTOM_TEXT_LENGTH:
+        raise ValueError(
+            f"custom_text : longueur entre {MIN_CUSTOM_TEXT_LENGTH} et {MAX_CUSTOM_TEXT_LENGTH} caractères."
+        )
+    return length
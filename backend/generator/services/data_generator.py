@@ -1,5 +1,63 @@
+import faker
+import numpy as np
 from faker import Faker
 
+from .column_models import LEARNED_TYPE, compile_model
+from .custom_text import parse_custom_text
+from .distributions import parse_distribution
+from .field_groups import GROUP_DRAWERS, parse_group_field
+from .field_spec import (
+    InjectedField, draw_codes, has_injection, inject_column, inject_generator, parse_field_spec
+)
+from .fingerprint import plan_fingerprint
+from .locales import interleave, locale_seed, single_locale, split_rows
+from .patterns import parse_pattern
+
+# Compiled plans kept per instance (pooled generators live as long as the process)
+MAX_CACHED_PLANS = 256
+
+# Rows per batch (block) of a dataset: the values of the vectorized columns of a 
+# batch are drawn at once, and each batch has its own seed (see block_seed)
+BATCH_ROWS = 10000
+
+# A seed gives the same rows only with the same generation code and libraries: 
+# bump GENERATOR_REVISION whenever a change alters the values drawn for a seed.
+# Recorded with every generated dataset (see GeneratedDataset.generator_version).
+GENERATOR_REVISION = 2
+GENERATOR_VERSION = f'{GENERATOR_REVISION}/faker-{faker.VERSION}/numpy-{np.__version__}'
+
+
+# Field types generated by a Faker method (see DataGenerator.generators)
+FAKER_FIELD_TYPES = frozenset({
+    'name', 'first_name', 'last_name', 'email', 'phone_number', 'address', 'country', 'city',
+    'date', 'datetime', 'company', 'job', 'iban', 'credit_card', 'license_plate', 'text',
+    'paragraph', 'url', 'ipv4', 'user_agent',
+})
+
+
+def validate_field_type(field_type):
+    """
+    Checks that the generator knows a field type: a Faker type, a group field,
+    custom_text(N), a distribution, a pattern or a learned field.
+
+    Raises:
+        ValueError: If the type is unknown, or its parameters are invalid.
+    """
+    if field_type in FAKER_FIELD_TYPES or field_type == LEARNED_TYPE or parse_group_field(field_type):
+        return
+    if parse_custom_text(field_type) or parse_distribution(field_type) or parse_pattern(field_type):
+        return
+    raise ValueError(f"type inconnu : {field_type}.")
+
+
+def block_seed(seed, block):
+    """
+    Seed of the block `block` (rows block * BATCH_ROWS onwards) of the dataset 
+    of `seed` (a 32-bit seed): the seed and the block index side by side.
+    """
+    return seed << 32 | block
+
+
 class DataGenerator:
     """
     A service class responsible for initializing the Faker library and 
@@ -13,22 +71,16 @@ class DataGenerator:
             locale (str): The localization code to use for data generation
                           (e.g., 'en_US', 'fr_FR'). Defaults to 'fr_FR'.
         """
+        self.locale = locale
         self.fake = Faker(locale)
-    
-    def generate_field(self, field_type):
-        """
-        Generates a single data value based on the requested field type.
+        # NumPy generator of the vectorized (distribution, pattern) columns
+        self.rng = np.random.default_rng()
+        # Latest date of the generated dates (Faker's default is the current time)
+        self.now = None
         
-        It uses a dictionary mapping to call the appropriate Faker provider method.
-        
-        Args:
-            field_type (str): The type of data to generate (e.g., 'name', 'email', 'custom_text(50)').
-
-        Returns:
-            str: The generated fake data value.
-        """
-        # Dictionary mapping field type strings to their respective Faker methods (using lambda for lazy execution)
-        generators = {
+        # Dictionary mapping field type strings to their respective Faker methods (using lambda for lazy execution).
+        # Built once per instance rather than on every generated value. Keys: FAKER_FIELD_TYPES.
+        self.generators = {
             'name': lambda: self.fake.name(),
             'first_name': lambda: self.fake.first_name(),
             'last_name': lambda: self.fake.last_name(),
@@ -37,8 +89,8 @@ class DataGenerator:
             'address': lambda: self.fake.address(),
             'country': lambda: self.fake.country(),
             'city': lambda: self.fake.city(),
-            'date': lambda: self.fake.date(),
-            'datetime': lambda: self.fake.date_time().isoformat(),
+            'date': lambda: self.fake.date(end_datetime=self.now),
+            'datetime': lambda: self.fake.date_time(end_datetime=self.now).isoformat(),
             'company': lambda: self.fake.company(),
             'job': lambda: self.fake.job(),
             'iban': lambda: self.fake.iban(),
@@ -51,42 +103,339 @@ class DataGenerator:
             'user_agent': lambda: self.fake.user_agent(),
         }
         
+        # Compiled generation plans, keyed by schema fingerprint
+        self._plans = {}
+        
+        # Generators of the other locales used by this one (locale mixes, per-column 
+        # locales), created on first use and kept with it
+        self._children = {}
+        self._seed = None
+        # Seed of the current block (see _reseed)
+        self._state = None
+    
+    def seed(self, seed, now=None):
+        """
+        Seeds the Faker instance and the NumPy generator: the same seed, 
+        reference date and schema give the same rows.
+        
+        Args:
+            seed (int): The seed of the random generators.
+            now (datetime): Latest date of the generated dates (the current 
+                            time if not given, so dates differ from day to day).
+        """
+        self._seed = seed
+        self.now = now
+        for locale, child in self._children.items():
+            child.seed(locale_seed(seed, locale), now)
+        self._reseed(block_seed(seed, 0))
+    
+    def _reseed(self, state):
+        """
+        Reseeds the Faker instance, the NumPy generator and the child generators 
+        for one block (the seed of the dataset is unchanged).
+        """
+        self._state = state
+        self.fake.seed_instance(state)
+        self.rng = np.random.default_rng(state)
+        for locale, child in self._children.items():
+            child._reseed(locale_seed(state, locale))
+    
+    def for_locale(self, locale):
+        """
+        Returns the generator of `locale`: this one, or a child generator seeded 
+        from this generator's seed.
+        """
+        if locale == self.locale:
+            return self
+        child = self._children.get(locale)
+        if child is None:
+            child = self._children[locale] = DataGenerator(locale)
+            if self._seed is not None:
+                child.seed(locale_seed(self._seed, locale), self.now)
+                # Same state as a child that existed when the current block was seeded
+                child._reseed(locale_seed(self._state, locale))
+        return child
+    
+    def get_field_generator(self, field_type):
+        """
+        Resolves a field type to a zero-argument callable producing its values.
+        
+        Args:
+            field_type (str): The type of data to generate (e.g., 'name', 'email', 'custom_text(50)').
+
+        Returns:
+            callable: A function returning one generated value per call.
+        """
         # --- Custom Text Length Handling ---
-        # Checks if the type is a custom text request (e.g., "custom_text(50)")
-        if field_type.startswith('custom_text'):
-            try:
-                # Extracts the desired length from the string using simple parsing
-                length = int(field_type.split('(')[1].split(')')[0])
-                return self.fake.text(max_nb_chars=length)
-            except:
-                # Fallback to a default text length if parsing fails
-                return self.fake.text(max_nb_chars=100)
+        # e.g. "custom_text(50)", parsed as by the cost model. Malformed ones are 
+        # rejected by the API, and produced here as unknown types
+        try:
+            length = parse_custom_text(field_type)
+        except ValueError:
+            length = None
+        if length:
+            return lambda: self.fake.text(max_nb_chars=length)
+        
+        # --- Distribution Columns ---
+        # e.g. "normal(50,10)": values are drawn for a whole batch of rows in one 
+        # NumPy call (the `column` attribute, called with the row count and the 
+        # index of the first row); calling the generator draws one value
+        sample = parse_distribution(field_type)
+        if sample:
+            column = lambda n, start=0: sample(self.rng, n)
+            generator = lambda: column(1)[0]
+            generator.column = column
+            return generator
+        
+        # --- Pattern Columns ---
+        # e.g. "pattern(ORD-{seq:6}-??)": compiled once, rendered column-wise. A 
+        # pattern with a counter is `positional`: its values depend on the row index
+        pattern = parse_pattern(field_type)
+        if pattern:
+            column = lambda n, start=0: pattern(self.rng, n, start)
+            generator = lambda: column(1)[0]
+            generator.column = column
+            generator.positional = pattern.sequential
+            return generator
+        
+        # --- Correlated Group Fields ---
+        # A group field on its own (e.g. "person.email") draws its group for every value
+        group_part = parse_group_field(field_type)
+        if group_part:
+            group, part = group_part
+            draw = GROUP_DRAWERS[group](self.fake, [part])
+            return lambda: draw()[part]
         
         # Retrieves the generator function from the dictionary
-        generator = generators.get(field_type)
+        generator = self.generators.get(field_type)
         if generator:
-            return generator()
+            return generator
         else:
-            return f"Unknown type: {field_type}"
+            unknown = f"Unknown type: {field_type}"
+            return lambda: unknown
     
-    def generate_dataset(self, schema, num_rows):
+    def generate_field(self, field_type):
+        """
+        Generates a single data value based on the requested field type.
+        
+        Args:
+            field_type (str): The type of data to generate (e.g., 'name', 'email', 'custom_text(50)').
+
+        Returns:
+            str: The generated fake data value.
+        """
+        return self.get_field_generator(field_type)()
+    
+    def compile_schema(self, schema, fingerprint=None):
+        """
+        Compiles a schema into a generation plan: the list of (field_name, generator) 
+        pairs, resolved once instead of once per generated value.
+        
+        Fields of the same group (e.g. "person.name" and "person.email") share 
+        one draw per row: the first of them in the plan draws the group, the 
+        others read their part of that draw.
+        
+        Plans are cached on the instance by schema fingerprint (at most 
+        MAX_CACHED_PLANS, the oldest plan being dropped first).
+        
+        Args:
+            schema (dict): The dictionary defining the field_name: field_type structure.
+            fingerprint (str): The plan fingerprint of the schema, computed if not given.
+
+        Returns:
+            list: The compiled plan.
+        """
+        key = fingerprint or plan_fingerprint(schema)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._build_plan(schema)
+            if len(self._plans) >= MAX_CACHED_PLANS:
+                del self._plans[next(iter(self._plans))]
+            self._plans[key] = plan
+        return plan
+    
+    def _build_plan(self, schema):
+        specs = [(field_name, parse_field_spec(value)) for field_name, value in schema.items()]
+        
+        # Groups are keyed by (group, locale): one draw per row and per locale
+        group_parts = {}
+        for _, spec in specs:
+            group_part = parse_group_field(spec.type)
+            if group_part:
+                group_parts.setdefault((group_part[0], self._field_locale(spec)), []).append(group_part[1])
+        
+        # One draw function per group, with the parts it has to produce
+        draws = {
+            (group, locale): GROUP_DRAWERS[group](self.for_locale(locale).fake, parts)
+            for (group, locale), parts in group_parts.items()
+        }
+        current = {}
+        
+        def draw_group(key, part):
+            values = current[key] = draws[key]()
+            return values[part]
+        
+        plan = []
+        for field_name, spec in specs:
+            group_part = parse_group_field(spec.type)
+            if group_part is None:
+                generator = self._field_generator(spec)
+            elif (key := (group_part[0], self._field_locale(spec))) in current:
+                generator = lambda key=key, part=group_part[1]: current[key][part]
+            else:
+                # First field of its group in the plan: draws the group for the row
+                current[key] = None
+                generator = lambda key=key, part=group_part[1]: draw_group(key, part)
+            # Nulls, blanks and malformed values are injected batch by batch
+            plan.append((field_name, InjectedField(generator, spec) if has_injection(spec) else generator))
+        return plan
+    
+    def _field_locale(self, spec):
+        return single_locale(spec.locales) if spec.locales else self.locale
+    
+    def _field_generator(self, spec):
+        """The generator of a field, in the locale(s) of its spec."""
+        if spec.type == LEARNED_TYPE:
+            # Learned from a sample file: the model is sampled column-wise, like distributions
+            sample = compile_model(spec.model)
+            column = lambda n, start=0: sample(self.rng, n)
+            generator = lambda: column(1)[0]
+            generator.column = column
+            return generator
+        
+        if not spec.locales or len(spec.locales) == 1:
+            return self.for_locale(self._field_locale(spec)).get_field_generator(spec.type)
+        
+        generator = self.get_field_generator(spec.type)
+        if hasattr(generator, 'column'):
+            # Vectorized columns do not depend on the locale
+            return generator
+        
+        # Locale mix of one column: the locale of each value of a batch is drawn at 
+        # once, and the values of each locale are generated in bulk
+        locales = spec.locales
+        generators = [self.for_locale(locale).get_field_generator(spec.type) for locale in locales]
+        
+        def column(n, start=0):
+            indexes, counts = split_rows(self.rng, locales, n)
+            return interleave(indexes, [
+                [generator() for _ in range(count)] for generator, count in zip(generators, counts)
+            ])
+        
+        generator = lambda: column(1)[0]
+        generator.column = column
+        return generator
+    
+    def generate_dataset(self, schema, num_rows, fingerprint=None, locales=None, offset=0, limit=None):
         """
         Generates a complete list of records (dataset) based on the schema and row count.
         
+        A seeded dataset is generated in blocks of BATCH_ROWS rows, each drawn 
+        from its own seed (see block_seed): any range of rows of the dataset can 
+        be generated on its own, at the cost of its rows (and at most one block 
+        more), with the same values as in the whole dataset.
+        
         Args:
             schema (dict): The dictionary defining the field_name: field_type structure.
                            Example: {"name": "name", "email": "email", "country": "country"}
-            num_rows (int): The number of records to generate.
+            num_rows (int): The number of records of the dataset.
+            fingerprint (str): Optional plan fingerprint of the schema, used as the plan cache key.
+            locales (dict): Optional {locale: probability} of each row (see locales.parse_locales); 
+                            rows are generated in this generator's locale if not given.
+            offset (int): Index of the first row to return.
+            limit (int): Number of rows to return (up to the end of the dataset if not given).
 
         Returns:
             list: A list of dictionaries, where each dictionary is a generated row.
         """
-        dataset = []
-        # Loop for the specified number of rows
-        for _ in range(num_rows):
-            row = {}
-            # Iterate through the schema to generate data for each field
-            for field_name, field_type in schema.items():
-                row[field_name] = self.generate_field(field_type)
-            dataset.append(row)
-        return dataset
\ No newline at end of file
+        data = []
+        for rows in self._blocks(schema, num_rows, offset, limit, fingerprint, locales):
+            data.extend(rows)
+        return data
+    
+    def iter_dataset(self, schema, num_rows, fingerprint=None, locales=None, offset=0, limit=None):
+        """
+        Same as generate_dataset, but yields the rows one at a time instead of 
+        building the whole list (used by the streaming export path).
+        """
+        for rows in self._blocks(schema, num_rows, offset, limit, fingerprint, locales):
+            yield from rows
+    
+    def _blocks(self, schema, num_rows, offset, limit, fingerprint, locales):
+        """
+        Yields the rows offset.. offset + limit of the dataset, block by block: 
+        the generators are seeded for each block, whose vectorized columns are 
+        drawn for all its rows. Rows of the first block before `offset` are 
+        generated and dropped (Faker values are drawn in sequence), rows of the 
+        last block after the range are not generated (the blocks of a locale 
+        mix are generated whole).
+        
+        Yields:
+            list: The rows of the range in each block.
+        """
+        if locales and len(locales) == 1:
+            generator = self.for_locale(single_locale(locales))
+            if generator is not self:
+                yield from generator._blocks(schema, num_rows, offset, limit, fingerprint, None)
+                return
+            locales = None
+        
+        end = num_rows if limit is None else min(offset + limit, num_rows)
+        if offset >= end:
+            return
+        fingerprint = fingerprint or plan_fingerprint(schema)
+        for block in range(offset // BATCH_ROWS, (end - 1) // BATCH_ROWS + 1):
+            start = block * BATCH_ROWS
+            if self._seed is not None:
+                self._reseed(block_seed(self._seed, block))
+            block_rows = min(BATCH_ROWS, num_rows - start)
+            if locales:
+                rows = self._mixed_block(schema, fingerprint, locales, block_rows, start)[:end - start]
+            else:
+                rows = self._block(schema, fingerprint, block_rows, start, min(end - start, block_rows))
+            yield rows[offset - start:] if offset > start else rows
+    
+    def _block(self, schema, fingerprint, block_rows, start, stop):
+        """
+        Generates the first `stop` rows of a block of `block_rows` rows, whose 
+        first row is the row `start` of the dataset.
+        """
+        batch_plan = [
+            (field_name, self._bind_batch(generator, block_rows, start))
+            if hasattr(generator, 'column') or isinstance(generator, InjectedField)
+            else (field_name, generator)
+            for field_name, generator in self.compile_schema(schema, fingerprint)
+        ]
+        # Loop for the rows of the block, generating every field of the plan
+        return [{field_name: generator() for field_name, generator in batch_plan} for _ in range(stop)]
+    
+    def _mixed_block(self, schema, fingerprint, locales, block_rows, start):
+        """
+        Generates a block of a locale mix: the locale of every row is drawn at 
+        once, the rows of each locale are generated in bulk by the generator of 
+        that locale (seeded with this block), then put back in order.
+        
+        Positional columns (counters) are then rendered again in row order, 
+        since each locale numbers its own rows.
+        """
+        indexes, counts = split_rows(self.rng, locales, block_rows)
+        rows = interleave(indexes, [
+            self.for_locale(locale)._block(schema, fingerprint, count, 0, count)
+            for locale, count in zip(locales, counts)
+        ])
+        for field_name, generator in self.compile_schema(schema, fingerprint):
+            if getattr(getattr(generator, 'generator', generator), 'positional', False):
+                next_value = self._bind_batch(generator, block_rows, start)
+                for row in rows:
+                    row[field_name] = next_value()
+        return rows
+    
+    def _bind_batch(self, generator, batch_rows, start):
+        """Returns the generator of one batch (first row `start`) of a vectorized or injected plan entry."""
+        if not isinstance(generator, InjectedField):
+            return iter(generator.column(batch_rows, start)).__next__
+        codes = draw_codes(self.rng, batch_rows, generator.spec)
+        if hasattr(generator.generator, 'column'):
+            values = inject_column(generator.generator.column(batch_rows, start), codes, generator.malform)
+            return iter(values).__next__
+        return inject_generator(generator.generator, codes, generator.malform)
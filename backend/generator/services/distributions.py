@@ -0,0 +1,111 @@
+import math
+import re
+
+import numpy as np
+
+
+# Distribution field types look like "<name>(<parameters>)", e.g. "normal(50,10)"
+DISTRIBUTION_RE = re.compile(r'^(normal|lognormal|zipf|poisson|weighted_choice)\((.*)\)$', re.DOTALL)
+
+# Parameter bounds, so that every drawn value is a finite number (valid JSON):
+# - normal: |mu| and sigma up to 1e15;
+# - lognormal: exp(mu + sigma * z) stays far below the float limit (e^709) for
+#   |mu| <= 100 and sigma <= 10, whatever the row count;
+# - poisson: NumPy rejects lam above ~1e10.
+MAX_NORMAL_PARAMETER = 1e15
+MAX_LOGNORMAL_MU = 100
+MAX_LOGNORMAL_SIGMA = 10
+MAX_POISSON_LAM = 1e9
+
+
+def _numbers(name, arguments, count):
+    try:
+        values = [float(value) for value in arguments.split(',')]
+    except ValueError:
+        values = []
+    if len(values) != count or not all(math.isfinite(value) for value in values):
+        raise ValueError(f"{name} : {count} paramètre(s) numérique(s) attendu(s), ex. {EXAMPLES[name]}.")
+    return values
+
+
+def _weights(arguments):
+    """Parses "{a:0.7,b:0.3}" (keys may be quoted) into (choices, probabilities)."""
+    arguments = arguments.strip()
+    if not (arguments.startswith('{') and arguments.endswith('}')):
+        raise ValueError(f"weighted_choice : objet {{valeur: poids}} attendu, ex. {EXAMPLES['weighted_choice']}.")
+    choices, weights = [], []
+    for item in arguments[1:-1].split(','):
+        key, separator, weight = item.rpartition(':')
+        try:
+            weight = float(weight)
+        except ValueError:
+            weight = -1
+        if not separator or weight < 0 or not math.isfinite(weight):
+            raise ValueError(f"weighted_choice : poids invalide dans '{item.strip()}'.")
+        choices.append(key.strip().strip('"\''))
+        weights.append(weight)
+    total = sum(weights)
+    if total <= 0:
+        raise ValueError("weighted_choice : la somme des poids doit être positive.")
+    return choices, np.array(weights) / total
+
+
+def parse_distribution(field_type):
+    """
+    Compiles a distribution field type into a column sampler.
+
+    Returns:
+        callable: sample(rng, n) -> list of n values, drawn in one NumPy call
+                  from the numpy.random.Generator `rng`; None if `field_type`
+                  is not a distribution type.
+
+    Raises:
+        ValueError: If the parameters of a distribution type are invalid.
+    """
+    match = DISTRIBUTION_RE.match(field_type)
+    if not match:
+        return None
+    name, arguments = match.groups()
+
+    if name == 'normal':
+        mu, sigma = _numbers(name, arguments, 2)
+        if sigma < 0:
+            raise ValueError("normal : sigma doit être positif.")
+        if abs(mu) > MAX_NORMAL_PARAMETER or sigma > MAX_NORMAL_PARAMETER:
+            raise ValueError(f"normal : mu et sigma doivent être compris entre -{MAX_NORMAL_PARAMETER:g} et {MAX_NORMAL_PARAMETER:g}.")
+        return lambda rng, n: rng.normal(mu, sigma, n).tolist()
+
+    if name == 'lognormal':
+        mu, sigma = _numbers(name, arguments, 2)
+        if sigma < 0:
+            raise ValueError("lognormal : sigma doit être positif.")
+        if abs(mu) > MAX_LOGNORMAL_MU or sigma > MAX_LOGNORMAL_SIGMA:
+            raise ValueError(
+                f"lognormal : |mu| doit valoir au plus {MAX_LOGNORMAL_MU} et sigma au plus {MAX_LOGNORMAL_SIGMA}."
+            )
+        return lambda rng, n: rng.lognormal(mu, sigma, n).tolist()
+
+    if name == 'zipf':
+        a, = _numbers(name, arguments, 1)
+        if a <= 1:
+            raise ValueError("zipf : a doit être strictement supérieur à 1.")
+        return lambda rng, n: rng.zipf(a, n).tolist()
+
+    if name == 'poisson':
+        lam, = _numbers(name, arguments, 1)
+        if not 0 <= lam <= MAX_POISSON_LAM:
+            raise ValueError(f"poisson : lam doit être compris entre 0 et {MAX_POISSON_LAM:g}.")
+        return lambda rng, n: rng.poisson(lam, n).tolist()
+
+    choices, probabilities = _weights(arguments)
+    choices = np.array(choices, dtype=object)
+    return lambda rng, n: choices[rng.choice(len(choices), n, p=probabilities)].tolist()
+
+
+EXAMPLES = {
+    'normal': 'normal(50,10)',
+    'lognormal': 'lognormal(3,0.5)',
+    'zipf': 'zipf(2)',
+    'poisson': 'poisson(4)',
+    'weighted_choice': 'weighted_choice({a:0.7,b:0.3})',
+}
@@ -0,0 +1,97 @@
+import re
+import unicodedata
+
+
+# Group field types look like "<group>.<part>", e.g. "person.email"
+GROUP_FIELD_RE = re.compile(r'^(\w+)\.(\w+)$')
+
+# Parts of each group. Fields of the same group in a row come from one draw:
+# the email and username match the name, the city, postcode and phone number
+# match the country.
+GROUP_PARTS = {
+    'person': ('first_name', 'last_name', 'name', 'email', 'username'),
+    'location': ('street', 'postcode', 'city', 'country', 'address', 'phone_number'),
+}
+
+GROUP_FIELD_TYPES = [f'{group}.{part}' for group, parts in GROUP_PARTS.items() for part in parts]
+
+
+def parse_group_field(field_type):
+    """
+    Splits a group field type into its group and part.
+
+    Returns:
+        tuple: (group, part), or None if `field_type` is not a known group field.
+    """
+    match = GROUP_FIELD_RE.match(field_type)
+    if match and match.group(2) in GROUP_PARTS.get(match.group(1), ()):
+        return match.group(1), match.group(2)
+    return None
+
+
+def _ascii_slug(value):
+    """'Éloïse-Marie' -> 'eloisemarie' (email and username parts)."""
+    value = unicodedata.normalize('NFKD', value).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]', '', value.lower())
+
+
+def person_drawer(fake, parts):
+    """
+    Returns a function drawing one person: the first and last names come from
+    Faker, the other parts are formatted from them.
+    """
+    parts = set(parts)
+    random = fake.random
+    domains = _internet_provider(fake).free_email_domains if 'email' in parts else ()
+
+    def draw():
+        first_name = fake.first_name()
+        last_name = fake.last_name()
+        values = {'first_name': first_name, 'last_name': last_name}
+        if 'name' in parts:
+            values['name'] = f'{first_name} {last_name}'
+        if 'email' in parts or 'username' in parts:
+            first, last = _ascii_slug(first_name), _ascii_slug(last_name)
+            if 'email' in parts:
+                values['email'] = f'{first}.{last}@{random.choice(domains)}'
+            if 'username' in parts:
+                values['username'] = f'{first[:1]}{last}{random.randint(1, 99)}'
+        return values
+
+    return draw
+
+
+def location_drawer(fake, parts):
+    """
+    Returns a function drawing one location in the country of the generator's
+    locale: the address is formatted from the street, postcode and city.
+    """
+    parts = set(parts)
+    country = fake.current_country()
+    need_street = bool(parts & {'street', 'address'})
+    need_city = bool(parts & {'postcode', 'city', 'address'})
+
+    def draw():
+        values = {'country': country}
+        if need_street:
+            values['street'] = fake.street_address()
+        if need_city:
+            values['postcode'] = fake.postcode()
+            values['city'] = fake.city()
+        if 'address' in parts:
+            values['address'] = f"{values['street']}, {values['postcode']} {values['city']}"
+        if 'phone_number' in parts:
+            values['phone_number'] = fake.phone_number()
+        return values
+
+    return draw
+
+
+GROUP_DRAWERS = {
+    'person': person_drawer,
+    'location': location_drawer,
+}
+
+
+def _internet_provider(fake):
+    return next(provider for provider in fake.providers if hasattr(provider, 'free_email_domains'))
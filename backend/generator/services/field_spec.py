@@ -0,0 +1,150 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from .column_models import LEARNED_TYPE
+from .field_groups import parse_group_field
+from .locales import parse_locales
+
+
+# A schema value is either a field type ("email") or an object giving the type,
+# the fraction of values replaced by null, by an empty string and by a
+# malformed value, and the locale(s) of the column:
+# {"type": "email", "null_rate": 0.1, "blank_rate": 0.05, "error_rate": 0.02, "locale": "de_DE"}
+# Learned fields (see sample_profiler) also carry the model of their values:
+# {"type": "learned", "model": {"kind": "category", ...}}
+FieldSpec = namedtuple(
+    'FieldSpec', ['type', 'null_rate', 'blank_rate', 'error_rate', 'locales', 'model'], defaults=[None, None]
+)
+
+INJECTION_RATES = ('null_rate', 'blank_rate', 'error_rate')
+
+# Injection code of each value, drawn per batch (see draw_codes)
+NULL, BLANK, ERROR, KEEP = 0, 1, 2, 3
+
+
+def parse_field_spec(value):
+    """
+    Normalizes a schema value into a FieldSpec.
+
+    Raises:
+        ValueError: If the value is neither a type string nor a valid field object.
+    """
+    if isinstance(value, str) and value != LEARNED_TYPE:
+        return FieldSpec(value, 0, 0, 0)
+    if not isinstance(value, dict) or not isinstance(value.get('type'), str):
+        raise ValueError("type attendu : une chaîne, ou un objet {\"type\": ..., \"null_rate\": ...}.")
+
+    unknown = set(value) - {'type', 'locale', 'model', *INJECTION_RATES}
+    if unknown:
+        raise ValueError(f"clé(s) inconnue(s) : {', '.join(sorted(unknown))}.")
+    rates = []
+    for name in INJECTION_RATES:
+        rate = value.get(name, 0)
+        if isinstance(rate, bool) or not isinstance(rate, (int, float)) or not 0 <= rate <= 1:
+            raise ValueError(f"{name} doit être un nombre entre 0 et 1.")
+        rates.append(rate)
+    if sum(rates) > 1:
+        raise ValueError("la somme de null_rate, blank_rate et error_rate ne peut pas dépasser 1.")
+
+    locales = None
+    if 'locale' in value:
+        locales = parse_locales(value['locale'])
+        if len(locales) > 1 and parse_group_field(value['type']):
+            # The parts of a group come from one draw, in one locale
+            raise ValueError("un champ de groupe n'accepte qu'une seule locale.")
+
+    model = value.get('model')
+    if (value['type'] == LEARNED_TYPE) != isinstance(model, dict):
+        raise ValueError(f"model : un objet est attendu pour le type {LEARNED_TYPE}, et pour lui seul.")
+    return FieldSpec(value['type'], *rates, locales, model)
+
+
+def field_type_of(value):
+    """The field type of a schema value, without validating it."""
+    if isinstance(value, dict):
+        return str(value.get('type', ''))
+    return str(value)
+
+
+def has_injection(spec):
+    return bool(spec.null_rate or spec.blank_rate or spec.error_rate)
+
+
+def draw_codes(rng, n, spec):
+    """
+    Draws the injection code (NULL, BLANK, ERROR or KEEP) of n values at once:
+    one uniform draw per value, compared to the cumulative rates.
+
+    Returns:
+        numpy.ndarray: The codes of the n values.
+    """
+    thresholds = np.cumsum([spec.null_rate, spec.blank_rate, spec.error_rate])
+    return np.searchsorted(thresholds, rng.random(n), side='right')
+
+
+def inject_column(values, codes, malform):
+    """Replaces, in place, the values of a column whose code is not KEEP."""
+    for index in np.flatnonzero(codes != KEEP).tolist():
+        code = codes[index]
+        values[index] = None if code == NULL else '' if code == BLANK else malform(values[index])
+    return values
+
+
+def inject_generator(generator, codes, malform):
+    """
+    Wraps a per-value generator for one batch: the values are always generated
+    (the other fields of the row stay the same whatever the rates), then
+    replaced according to their code.
+    """
+    next_code = iter(codes.tolist()).__next__
+
+    def generate():
+        value = generator()
+        code = next_code()
+        if code == KEEP:
+            return value
+        return None if code == NULL else '' if code == BLANK else malform(value)
+
+    return generate
+
+
+class InjectedField:
+    """A plan entry whose values are replaced by nulls, blanks and errors at the rates of its FieldSpec."""
+    __slots__ = ('generator', 'spec', 'malform')
+
+    def __init__(self, generator, spec):
+        self.generator = generator
+        self.spec = spec
+        self.malform = malformer(spec.type)
+
+
+# --- Malformed values ---
+
+def _bad_month(value):
+    # '2024-01-15' -> '2024-13-15'
+    return f'{value[:5]}13{value[7:]}' if len(value) >= 7 else value
+
+
+def _truncated(value):
+    # A value cut in half and ending with a replacement character (broken encoding)
+    if isinstance(value, (int, float)):
+        return 'N/A'
+    text = str(value)
+    return f'{text[:max(math.ceil(len(text) / 2), 1)]}�'
+
+
+MALFORMERS = {
+    'email': lambda value: value.replace('@', ''),
+    'person.email': lambda value: value.replace('@', ''),
+    'date': _bad_month,
+    'datetime': _bad_month,
+    'ipv4': lambda value: '999.' + value.partition('.')[2],
+    'url': lambda value: value.replace('://', ':/', 1),
+}
+
+
+def malformer(field_type):
+    """Returns the function turning a valid value of `field_type` into a malformed one."""
+    return MALFORMERS.get(field_type, _truncated)
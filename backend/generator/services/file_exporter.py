@@ -10,12 +10,78 @@ class FileExporter:
     A utility class containing static methods to convert a list of dictionaries 
     (the generated dataset) into various file formats (JSON, CSV, XLSX, SQL, XML).
     """
+    # Maps each supported format to its export method name and HTTP content type.
+    EXPORT_FORMATS = {
+        'json': ('to_json', 'application/json'),
+        'csv': ('to_csv', 'text/csv'),
+        'xlsx': ('to_excel', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+        'sql': ('to_sql', 'text/plain'),
+        'xml': ('to_xml', 'application/xml'),
+    }
+    
+    # Formats that can be written row by row, mapped to their streaming method.
+    # Each produces the same bytes as the matching to_* method.
+    STREAMING_FORMATS = {
+        'json': 'iter_json',
+        'csv': 'iter_csv',
+        'sql': 'iter_sql',
+        'xml': 'iter_xml',
+    }
+    
+    @classmethod
+    def export(cls, data, file_format):
+        """
+        Exports the dataset to the requested format.
+
+        Args:
+            data (list): The generated rows (list of dictionaries).
+            file_format (str): One of the keys of EXPORT_FORMATS (e.g., 'csv').
+
+        Returns:
+            tuple: (file_content, content_type)
+        """
+        method_name, content_type = cls.EXPORT_FORMATS[file_format]
+        return getattr(cls, method_name)(data), content_type
+    
+    @classmethod
+    def stream(cls, rows, file_format, chunk_rows=1000):
+        """
+        Exports rows produced lazily, without holding the dataset in memory.
+
+        Args:
+            rows (iterable): The generated rows (dictionaries), e.g. DataGenerator.iter_dataset().
+            file_format (str): One of the keys of STREAMING_FORMATS.
+            chunk_rows (int): Number of rows encoded together in one yielded chunk.
+
+        Yields:
+            bytes: Consecutive UTF-8 chunks of the file.
+        """
+        parts = []
+        count = 0
+        for part in getattr(cls, cls.STREAMING_FORMATS[file_format])(rows):
+            parts.append(part)
+            count += 1
+            if count >= chunk_rows:
+                yield ''.join(parts).encode('utf-8')
+                parts, count = [], 0
+        if parts:
+            yield ''.join(parts).encode('utf-8')
     
     @staticmethod
     def to_json(data):
         """Exporte en JSON"""
         return json.dumps(data, indent=2, ensure_ascii=False)
     
+    @staticmethod
+    def iter_json(rows):
+        """Same output as to_json, one row at a time"""
+        first = True
+        for row in rows:
+            item = json.dumps(row, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+            yield ('[\n  ' if first else ',\n  ') + item
+            first = False
+        yield '[]' if first else '\n]'
+    
     @staticmethod
     def to_csv(data):
         """Exporte en CSV"""
@@ -28,6 +94,20 @@ class FileExporter:
         writer.writerows(data)
         return output.getvalue()
     
+    @staticmethod
+    def iter_csv(rows):
+        """Same output as to_csv, one row at a time"""
+        output = StringIO()
+        writer = None
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(output, fieldnames=row.keys())
+                writer.writeheader()
+            writer.writerow(row)
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+    
     @staticmethod
     def to_excel(data):
         """Exporte en Excel (XLSX)"""
@@ -51,11 +131,30 @@ class FileExporter:
         sql_statements = []
         
         for row in data:
-            values = ', '.join([f"'{str(v).replace('\'', '\'\'')}'" for v in row.values()])
+            values = ', '.join([FileExporter._sql_value(v) for v in row.values()])
             sql_statements.append(f"INSERT INTO {table_name} ({columns}) VALUES ({values});")
         
         return '\n'.join(sql_statements)
     
+    @staticmethod
+    def iter_sql(rows, table_name='synthetic_data'):
+        """Same output as to_sql, one row at a time"""
+        columns = None
+        for row in rows:
+            if columns is None:
+                columns = ', '.join(row.keys())
+                separator = ''
+            values = ', '.join([FileExporter._sql_value(v) for v in row.values()])
+            yield f"{separator}INSERT INTO {table_name} ({columns}) VALUES ({values});"
+            separator = '\n'
+    
+    @staticmethod
+    def _sql_value(value):
+        """SQL literal of a value: NULL for null values, a quoted string otherwise"""
+        if value is None:
+            return 'NULL'
+        return f"'{str(value).replace('\'', '\'\'')}'"
+    
     @staticmethod
     def to_xml(data, root_name='dataset', item_name='item'):
         """Exporte en XML"""
@@ -67,9 +166,35 @@ class FileExporter:
         for row in data:
             item = ET.SubElement(root, item_name)
             for key, value in row.items():
+                # Null values are left out of the item
+                if value is None:
+                    continue
                 field = ET.SubElement(item, key)
                 field.text = str(value)
         
         # Pretty print
         xml_str = minidom.parseString(ET.tostring(root)).toprettyxml(indent="  ")
-        return xml_str
\ No newline at end of file
+        return xml_str
+    
+    @staticmethod
+    def iter_xml(rows, root_name='dataset', item_name='item'):
+        """Same output as to_xml (minidom pretty print), one row at a time"""
+        def escape(text):
+            # Text escaping of minidom's writer
+            return text.replace('&', '&amp;').replace('<', '&lt;').replace('"', '&quot;').replace('>', '&gt;')
+        
+        started = False
+        for row in rows:
+            if not started:
+                yield f'<?xml version="1.0" ?>\n<{root_name}>\n'
+                started = True
+            fields = [
+                f'    <{key}>{escape(str(value))}</{key}>\n' if str(value) != '' else f'    <{key}/>\n'
+                for key, value in row.items() if value is not None
+            ]
+            if not fields:
+                yield f'  <{item_name}/>\n'
+                continue
+            yield f'  <{item_name}>\n{"".join(fields)}  </{item_name}>\n'
+        if started:
+            yield f'</{root_name}>\n'
@@ -0,0 +1,32 @@
+import hashlib
+import json
+
+
+def canonical_json(schema):
+    """
+    Serializes a schema to its canonical JSON form: sorted keys, no whitespace.
+    Two schemas with the same content always give the same string.
+    """
+    return json.dumps(schema, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def schema_fingerprint(schema):
+    """
+    Returns the SHA-256 hex digest of the canonical JSON of a schema.
+
+    The fingerprint identifies a schema's content: it is the key of the 
+    SchemaDefinition table.
+    """
+    return hashlib.sha256(canonical_json(schema).encode('utf-8')).hexdigest()
+
+
+def plan_fingerprint(schema):
+    """
+    Returns the SHA-256 hex digest of a schema including the order of its 
+    fields, which sets the order of the generated columns (the canonical 
+    JSON sorts them away).
+
+    It is the key of the compiled generation plans and of the preview cache.
+    """
+    items = json.dumps(list(schema.items()), separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(items.encode('utf-8')).hexdigest()
@@ -0,0 +1,54 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from .data_generator import DataGenerator
+from .locales import DEFAULT_LOCALE
+
+
+class GeneratorPool:
+    """
+    A process-wide pool of DataGenerator instances, one list per locale.
+
+    Creating a Faker instance loads every provider of its locale (a few
+    milliseconds), which would dominate small requests such as previews.
+    Pooled generators are created once and reused, together with the plans
+    they have compiled and the generators of the other locales they use. A 
+    generator is only used by one request at a time: Faker instances are not 
+    safe to share between threads.
+
+    Generators are seeded on every acquisition (with a random seed if none is 
+    given), so a request never continues the random stream of the previous one: 
+    the same seed and reference date (`now`) give the same rows whichever 
+    generator of the pool is used.
+
+    Usage:
+        with GeneratorPool.acquire('fr_FR', seed=42) as generator:
+            rows = generator.generate_dataset(schema, 10)
+    """
+    _lock = threading.Lock()
+    _idle = {}
+
+    @classmethod
+    @contextmanager
+    def acquire(cls, locale=DEFAULT_LOCALE, seed=None, now=None):
+        with cls._lock:
+            idle = cls._idle.setdefault(locale, [])
+            generator = idle.pop() if idle else None
+        if generator is None:
+            generator = DataGenerator(locale=locale)
+        generator.seed(seed if seed is not None else random.getrandbits(32), now)
+        try:
+            yield generator
+        finally:
+            with cls._lock:
+                # Generators created under a burst of requests beyond the pool size are dropped
+                if len(idle) < getattr(settings, 'GENERATOR_POOL_SIZE', 4):
+                    idle.append(generator)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._idle.clear()
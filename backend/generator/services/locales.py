@@ -0,0 +1,69 @@
+import math
+import zlib
+
+import numpy as np
+from faker.config import AVAILABLE_LOCALES
+
+
+DEFAULT_LOCALE = 'fr_FR'
+
+
+def parse_locales(value):
+    """
+    Normalizes a locale option: a locale ("de_DE") or weighted locales
+    ({"fr_FR": 0.6, "de_DE": 0.3, "en_US": 0.1}, weights normalized to 1).
+
+    Returns:
+        dict: {locale: probability}, sorted by locale: the rows drawn for a seed 
+              do not depend on the order of the keys (PostgreSQL JSON columns 
+              do not keep it).
+
+    Raises:
+        ValueError: If a locale is not supported by Faker or a weight is invalid.
+    """
+    if isinstance(value, str):
+        value = {value: 1}
+    if not isinstance(value, dict) or not value:
+        raise ValueError("locale attendue : une locale (\"de_DE\") ou des poids {\"fr_FR\": 0.6, \"de_DE\": 0.4}.")
+    for locale, weight in value.items():
+        if locale not in AVAILABLE_LOCALES:
+            raise ValueError(f"locale inconnue : {locale}.")
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight < 0 or not math.isfinite(weight):
+            raise ValueError(f"poids invalide pour {locale}.")
+    total = sum(value.values())
+    if total <= 0:
+        raise ValueError("la somme des poids des locales doit être positive.")
+    return {locale: weight / total for locale, weight in sorted(value.items()) if weight > 0}
+
+
+def single_locale(locales):
+    """The locale of a locale option with only one locale, else None."""
+    return next(iter(locales)) if len(locales) == 1 else None
+
+
+def locale_seed(seed, locale):
+    """Seed of the generator of `locale` derived from a (64-bit) seed, stable across processes."""
+    return (seed + zlib.crc32(locale.encode('ascii'))) % 2**64
+
+
+def split_rows(rng, locales, n):
+    """
+    Draws the locale of n rows (or values) at once.
+
+    Returns:
+        tuple: (index of the locale of each row (numpy array), number of rows per locale)
+    """
+    indexes = rng.choice(len(locales), n, p=list(locales.values()))
+    return indexes, np.bincount(indexes, minlength=len(locales)).tolist()
+
+
+def interleave(indexes, groups):
+    """
+    Puts the values generated per locale back in row order.
+
+    Args:
+        indexes (numpy.ndarray): The locale index of each row (see split_rows).
+        groups (list): The values of each locale, in row order within the locale.
+    """
+    nexts = [iter(group).__next__ for group in groups]
+    return [nexts[index]() for index in indexes.tolist()]
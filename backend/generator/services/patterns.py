@@ -0,0 +1,145 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+
+
+# Pattern field types: "pattern(ORD-####-??)"
+# - '#' is a random digit, '?' a random upper-case letter, '\' escapes the next character;
+# - '{seq}' (or '{seq:N}', zero-padded to N digits) is the row number, starting at 1.
+PATTERN_RE = re.compile(r'^pattern\((.*)\)$', re.DOTALL)
+SEQ_RE = re.compile(r'\{seq(?::(\d{1,2}))?\}')
+
+MAX_PATTERN_LENGTH = 200
+
+
+class _Template:
+    """A template without counter, rendered for a whole column at once."""
+
+    def __init__(self, text):
+        chars, digits, letters = [], [], []
+        index = 0
+        while index < len(text):
+            char = text[index]
+            if char == '\\' and index + 1 < len(text):
+                chars.append(text[index + 1])
+                index += 2
+                continue
+            if char == '#':
+                digits.append(len(chars))
+            elif char == '?':
+                letters.append(len(chars))
+            chars.append(char)
+            index += 1
+
+        self.text = ''.join(chars)
+        self.length = len(chars)
+        self.codes = np.array([ord(char) for char in chars], dtype=np.uint32)
+        self.digits = np.array(digits, dtype=np.intp)
+        self.letters = np.array(letters, dtype=np.intp)
+
+    def draw(self, rng, n):
+        """Draws the digits and the letters of n values (as code points)."""
+        digits = rng.integers(48, 58, (n, len(self.digits)), dtype=np.uint32) if len(self.digits) else None
+        letters = rng.integers(65, 91, (n, len(self.letters)), dtype=np.uint32) if len(self.letters) else None
+        return digits, letters
+
+    def fill(self, codes, offset, draws):
+        """Writes the template and its drawn slots into columns offset.. of `codes`."""
+        digits, letters = draws
+        codes[:, offset:offset + self.length] = self.codes
+        if digits is not None:
+            codes[:, offset + self.digits] = digits
+        if letters is not None:
+            codes[:, offset + self.letters] = letters
+
+    def render(self, rng, n):
+        if not len(self.digits) and not len(self.letters):
+            return [self.text] * n
+        # One row of code points per value: the slots are filled column-wise,
+        # then each row is read back as a string
+        codes = np.empty((n, self.length), dtype=np.uint32)
+        self.fill(codes, 0, self.draw(rng, n))
+        return _strings(codes)
+
+
+def _strings(codes):
+    return codes.view(np.dtype(('U', codes.shape[1]))).ravel().tolist()
+
+
+class CompiledPattern:
+    """
+    A pattern template compiled once into a column generator: the digits and
+    letters of n values are drawn with one NumPy call each.
+
+    Calling it with (rng, n, start) returns the n values of the rows
+    start + 1 to start + n.
+    """
+
+    def __init__(self, template):
+        seqs = list(SEQ_RE.finditer(template))
+        if len(seqs) > 1:
+            raise ValueError("pattern : un seul compteur {seq} par motif.")
+        self.template = template
+        self.sequential = bool(seqs)
+        if seqs:
+            match = seqs[0]
+            self.width = int(match.group(1) or 0)
+            self.left = _Template(template[:match.start()])
+            self.right = _Template(template[match.end():])
+        else:
+            self.left = _Template(template)
+
+    def __call__(self, rng, n, start=0):
+        if not self.sequential:
+            return self.left.render(rng, n)
+        if self.width and len(str(start + n)) <= self.width:
+            return self._render_padded(rng, n, start)
+        # Counters without padding (or overflowing it) have values of varying length
+        left = self.left.render(rng, n)
+        right = self.right.render(rng, n)
+        width = self.width
+        return [
+            f'{prefix}{number:0{width}d}{suffix}'
+            for prefix, number, suffix in zip(left, range(start + 1, start + n + 1), right)
+        ]
+
+    def _render_padded(self, rng, n, start):
+        # Same draws as the unpadded path, the counter digits are computed column-wise
+        left, right, width = self.left, self.right, self.width
+        left_draws = left.draw(rng, n)
+        right_draws = right.draw(rng, n)
+        codes = np.empty((n, left.length + width + right.length), dtype=np.uint32)
+        left.fill(codes, 0, left_draws)
+        numbers = np.arange(start + 1, start + n + 1, dtype=np.uint64)[:, None]
+        powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.uint64)
+        codes[:, left.length:left.length + width] = 48 + (numbers // powers) % 10
+        right.fill(codes, left.length + width, right_draws)
+        return _strings(codes)
+
+    def value_length(self):
+        """Length of a value (with a 6-digit counter), used by the cost model."""
+        length = self.left.length
+        if self.sequential:
+            length += self.right.length + max(self.width, 6)
+        return length
+
+
+@lru_cache(maxsize=256)
+def parse_pattern(field_type):
+    """
+    Compiles a pattern field type (compiled patterns are cached).
+
+    Returns:
+        CompiledPattern: None if `field_type` is not a pattern type.
+
+    Raises:
+        ValueError: If the template is empty, too long or has several counters.
+    """
+    match = PATTERN_RE.match(field_type)
+    if not match:
+        return None
+    template = match.group(1)
+    if not template or len(template) > MAX_PATTERN_LENGTH:
+        raise ValueError(f"pattern : motif vide ou de plus de {MAX_PATTERN_LENGTH} caractères.")
+    return CompiledPattern(template)
@@ -0,0 +1,169 @@
+import cProfile
+import marshal
+import os
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profile is already running: cProfile allows one at a time per process."""
+
+
+# Held while a RequestProfiler is running
+_active = threading.Lock()
+
+
+class RequestProfiler:
+    """
+    Profiles the code run by the current thread, with two profilers at once:
+
+    - cProfile (deterministic), saved as a .pstats file for `python -m pstats`
+      or snakeviz;
+    - a sampling thread reading the thread's stack every
+      PROFILING_SAMPLE_INTERVAL seconds, saved as a collapsed-stack file
+      ("frame;frame;frame count" per line) for flamegraph.pl or speedscope.
+
+    Only one profiler runs at a time in a process: start() raises
+    ProfilerBusy while another one is running. A profile that is never
+    stopped (e.g. a stream nobody closes) stops itself after
+    PROFILING_MAX_SECONDS.
+
+    Usage:
+        with RequestProfiler() as profiler:
+            ...
+        pstats_path, stacks_path = profiler.save('profiles/dataset_42')
+    """
+    def __init__(self, interval=None):
+        self.interval = interval or getattr(settings, 'PROFILING_SAMPLE_INTERVAL', 0.005)
+        self.max_seconds = getattr(settings, 'PROFILING_MAX_SECONDS', 600)
+        self.profile = cProfile.Profile()
+        self.stacks = {}
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._sampler = None
+        self._running = False
+        self._finish_lock = threading.Lock()
+
+    def start(self):
+        if not _active.acquire(blocking=False):
+            raise ProfilerBusy()
+        try:
+            self.profile.enable()
+        except ValueError:
+            # Another profiling tool (e.g. coverage) is active
+            _active.release()
+            raise ProfilerBusy()
+        self._running = True
+        self._thread_id = threading.get_ident()
+        self._sampler = threading.Thread(target=self._sample, name='request-profiler', daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        if self._sampler is None:
+            return
+        self._stop.set()
+        if self._sampler is not threading.current_thread():
+            self._sampler.join()
+        self._finish()
+
+    def _finish(self):
+        # Called by stop(), or by the sampler when PROFILING_MAX_SECONDS is reached
+        with self._finish_lock:
+            if not self._running:
+                return
+            self._running = False
+            self.profile.disable()
+            _active.release()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+
+    def _sample(self):
+        # Since Python 3.12 cProfile sees every thread: the loop only uses
+        # builtins, and code objects are formatted once, after the request
+        stacks = self.stacks
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.is_set():
+            if time.monotonic() > deadline:
+                self._finish()
+                return
+            time.sleep(self.interval)
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if stack:
+                key = tuple(stack)
+                stacks[key] = stacks.get(key, 0) + 1
+
+    def pstats_bytes(self):
+        """The cProfile statistics, in the binary format read by pstats.Stats."""
+        self.profile.create_stats()
+        return marshal.dumps(self.profile.stats)
+
+    def collapsed_stacks(self):
+        lines = []
+        for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1]):
+            frames = [
+                f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+                for code in reversed(stack)
+            ]
+            lines.append(f"{';'.join(frames)} {count}\n")
+        return ''.join(lines)
+
+    def save(self, name):
+        """
+        Stores both profiles in the default storage.
+
+        Returns:
+            tuple: The storage paths of the .pstats and .collapsed files.
+        """
+        name = f'{name}_{time.strftime("%Y%m%d%H%M%S")}'
+        pstats_path = default_storage.save(f'{name}.pstats', ContentFile(self.pstats_bytes()))
+        stacks_path = default_storage.save(f'{name}.collapsed', ContentFile(self.collapsed_stacks().encode('utf-8')))
+        return pstats_path, stacks_path
+
+
+class ProfiledStream:
+    """
+    Streamed content whose rows are generated after the view returns: the
+    profiler runs until the response is closed (stream exhausted or client
+    gone), then `on_close` saves it.
+
+    StreamingHttpResponse calls close() on its content when it is closed.
+    """
+    def __init__(self, chunks, profiler, on_close):
+        self.chunks = chunks
+        self.profiler = profiler
+        self.on_close = on_close
+        self._closed = False
+
+    def __iter__(self):
+        try:
+            yield from self.chunks
+        finally:
+            # Exhausted, or dropped by a server that did not close the response
+            self.close()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            close = getattr(self.chunks, 'close', None)
+            if close is not None:
+                close()
+        finally:
+            self.profiler.stop()
+            self.on_close()
@@ -0,0 +1,386 @@
+import atexit
+import threading
+import time
+from collections import namedtuple
+from datetime import date
+
+from django.conf import settings
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Greatest
+
+from users.models import User
+
+
+# Unit of the daily quota, returned with every quota figure of the API: rows
+# weighted by the cost of their field types (see CostModel.quota_units)
+QUOTA_UNIT = 'quota_units'
+
+# Quota and rate limits of a plan (see subscriptions.models.PlanLimit)
+PlanLimits = namedtuple('PlanLimits', ['daily_units', 'requests_per_second', 'burst'])
+
+# Used when a plan has no PlanLimit row in the database
+DEFAULT_PLAN_LIMITS = {
+    'free': PlanLimits(500, 2, 10),
+    'pro': PlanLimits(50000, 10, 50),
+    'enterprise': PlanLimits(999999999, 50, 200),  # unlimited
+}
+
+
+class TokenBucket:
+    """
+    A classic token bucket: `rate` tokens are added per second, up to `capacity`.
+    """
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated_at')
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def consume(self, amount=1):
+        """
+        Takes `amount` tokens from the bucket.
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise the number of seconds
+                   to wait before enough tokens are available.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return 0
+        return (amount - self.tokens) / self.rate if self.rate else float('inf')
+
+
+class UserQuotaState:
+    """Process-local quota state of a single user."""
+    __slots__ = ('user_plan', 'plan', 'limits', 'day', 'used', 'pending', 'loaded_at', 'request_bucket')
+
+    def __init__(self, user_plan, plan, limits, day, used):
+        # User.plan when the state was loaded, and the plan whose limits apply
+        self.user_plan = user_plan
+        self.plan = plan
+        self.limits = limits
+        self.day = day
+        # Rows used today as last read from the database
+        self.used = used
+        # Rows reserved (or refunded) locally and not yet written back
+        self.pending = 0
+        self.loaded_at = time.monotonic()
+        self.request_bucket = TokenBucket(limits.requests_per_second, limits.burst)
+
+    @property
+    def total_used(self):
+        return self.used + self.pending
+
+
+class QuotaManager:
+    """
+    A service class handling the daily row quota and the request rate of users.
+
+    Plan limits are read from the PlanLimit table and each process keeps a
+    token bucket per user in memory.
+
+    Write-through is the default (QUOTA_WRITEBACK_INTERVAL = 0): every
+    reservation is a single conditional UPDATE, which is exact across
+    processes, and the only query of a reservation: the effective plan and its
+    limits are cached in the user's local state.
+
+    With a writeback interval, each process also keeps a quota counter per
+    user: reservations are counted locally and written back to the users table
+    in batches (one UPDATE for every dirty user), but only while the user's
+    usage stays under QUOTA_WRITEBACK_LOCAL_RATIO of the limit. Past it, the
+    pending usage is flushed and the conditional UPDATE decides again. The
+    per-user state is re-read from the database every QUOTA_STATE_TTL seconds,
+    and when the user or their subscription changes (see users.signals).
+    """
+    # Reentrant: flush() runs under the lock, and may be called while it is held
+    _lock = threading.RLock()
+    _states = {}
+    _last_flush = time.monotonic()
+
+    _plan_limits = {}
+    _plan_limits_loaded_at = None
+
+    # --- Plan limits ---
+
+    @classmethod
+    def get_plan_limits(cls, plan):
+        """Returns the PlanLimits of the given plan, cached for PLAN_LIMITS_CACHE_TTL seconds."""
+        ttl = getattr(settings, 'PLAN_LIMITS_CACHE_TTL', 60)
+        loaded_at = cls._plan_limits_loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > ttl:
+            from subscriptions.models import PlanLimit
+            cls._plan_limits = {
+                row.plan: PlanLimits(row.daily_units, row.requests_per_second, row.burst)
+                for row in PlanLimit.objects.all()
+            }
+            cls._plan_limits_loaded_at = time.monotonic()
+        return cls._plan_limits.get(plan) or DEFAULT_PLAN_LIMITS.get(plan) or DEFAULT_PLAN_LIMITS['free']
+
+    @classmethod
+    def get_limit(cls, plan):
+        """Returns the daily row limit of the given plan."""
+        return cls.get_plan_limits(plan).daily_units
+
+    @staticmethod
+    def get_effective_plan(user):
+        """
+        Returns the plan whose limits apply to the user: a paid plan only counts
+        while the user's subscription (if any) is active.
+        """
+        if user.plan == 'free':
+            return 'free'
+        from subscriptions.models import Subscription
+        status = Subscription.objects.filter(user_id=user.pk).values_list('status', flat=True).first()
+        if status is not None and status != 'active':
+            return 'free'
+        return user.plan
+
+    # --- Local state ---
+
+    @classmethod
+    def _load_state(cls, user):
+        plan = cls.get_effective_plan(user)
+        used, last_reset = User.objects.filter(pk=user.pk).values_list(
+            'daily_quota_used', 'last_quota_reset'
+        ).get()
+        today = date.today()
+        return UserQuotaState(user.plan, plan, cls.get_plan_limits(plan), today, used if last_reset == today else 0)
+
+    @classmethod
+    def _get_state(cls, user):
+        """Returns the user's local state, (re)loading it from the database when stale."""
+        ttl = getattr(settings, 'QUOTA_STATE_TTL', 30)
+        state = cls._states.get(user.pk)
+        if state is not None and state.day != date.today():
+            # Yesterday's pending usage no longer counts against the quota
+            state = None
+        elif state is not None and time.monotonic() - state.loaded_at > ttl:
+            if state.pending:
+                cls.flush()
+            state = None
+        elif state is not None and user.plan != state.user_plan:
+            # The plan changed (upgrade/downgrade) since the state was loaded
+            state = None
+
+        if state is None:
+            # Loaded under the lock: a flush cannot move usage out of the previous
+            # state's pending count between the read and the swap
+            with cls._lock:
+                fresh = cls._load_state(user)
+                previous = cls._states.get(user.pk)
+                if previous is not None and previous.day == fresh.day:
+                    # Keep the reservations made by other threads meanwhile
+                    fresh.pending = previous.pending
+                if previous is not None and previous.limits == fresh.limits:
+                    fresh.request_bucket = previous.request_bucket
+                cls._states[user.pk] = fresh
+                state = fresh
+        return state
+
+    @classmethod
+    def invalidate(cls, user_id):
+        """Marks the user's local state as stale: it is re-read (after a flush) on next use."""
+        with cls._lock:
+            state = cls._states.get(user_id)
+            if state is not None:
+                state.loaded_at = float('-inf')
+
+    # --- Throttling ---
+
+    @classmethod
+    def consume_request(cls, user):
+        """
+        Takes one token from the user's request bucket.
+
+        Returns:
+            float: 0 if the request is allowed, otherwise the seconds to wait.
+        """
+        state = cls._get_state(user)
+        with cls._lock:
+            return state.request_bucket.consume()
+
+    @classmethod
+    def get_user_limit(cls, user):
+        """Returns the daily quota of the user's effective plan, from the local state."""
+        return cls._get_state(user).limits.daily_units
+
+    @classmethod
+    def may_reserve(cls, user, rows):
+        """
+        Tells, without querying the database, whether reserving `rows` units can
+        succeed. In write-through mode only the plan limit is checked: the
+        conditional UPDATE of reserve() enforces the usage.
+        """
+        state = cls._get_state(user)
+        if not cls._writeback_enabled():
+            return rows <= state.limits.daily_units
+        return state.total_used + rows <= state.limits.daily_units
+
+    @classmethod
+    def get_remaining(cls, user):
+        """Returns the number of rows the user can still generate today."""
+        state = cls._get_state(user)
+        return max(state.limits.daily_units - cls.get_used(user), 0)
+
+    # --- Quota ---
+
+    @classmethod
+    def reserve(cls, user, rows):
+        """
+        Reserves `rows` units of the user's daily quota.
+
+        Args:
+            user (User): The user consuming the quota.
+            rows (int): The number of quota units to reserve (see CostModel.quota_units).
+
+        Returns:
+            bool: True if the quota was reserved, False if it would be exceeded.
+        """
+        if not cls._writeback_enabled():
+            return cls._reserve_in_db(user, rows)
+
+        state = cls._get_state(user)
+        limit = state.limits.daily_units
+        local_limit = limit * getattr(settings, 'QUOTA_WRITEBACK_LOCAL_RATIO', 0.5)
+        with cls._lock:
+            # The state may have been reloaded by another thread since
+            state = cls._states.get(user.pk, state)
+            if state.total_used + rows > limit:
+                return False
+            reserved = state.total_used + rows <= local_limit
+            if reserved:
+                state.pending += rows
+        if reserved:
+            cls._maybe_flush()
+            return True
+
+        # Near the limit, the other processes' usage may not be written back
+        # yet: the database is the authority again
+        cls.flush()
+        reserved = cls._reserve_in_db(user, rows, limit)
+        # Re-read on next use, with the usage of the other processes
+        cls.invalidate(user.pk)
+        return reserved
+
+    @classmethod
+    def refund(cls, user, rows):
+        """Gives back quota reserved by a generation that failed."""
+        if not cls._writeback_enabled():
+            return cls._refund_in_db(user, rows)
+
+        state = cls._get_state(user)
+        with cls._lock:
+            state = cls._states.get(user.pk, state)
+            state.pending -= min(rows, state.total_used)
+
+    @classmethod
+    def get_used(cls, user):
+        """Returns the quota used today by the user."""
+        if not cls._writeback_enabled():
+            used, last_reset = User.objects.filter(pk=user.pk).values_list(
+                'daily_quota_used', 'last_quota_reset'
+            ).get()
+            return used if last_reset == date.today() else 0
+        return cls._get_state(user).total_used
+
+    # --- Database writes ---
+
+    @staticmethod
+    def _writeback_enabled():
+        return getattr(settings, 'QUOTA_WRITEBACK_INTERVAL', 0) > 0
+
+    @classmethod
+    def _maybe_flush(cls):
+        interval = getattr(settings, 'QUOTA_WRITEBACK_INTERVAL', 0)
+        max_pending = getattr(settings, 'QUOTA_WRITEBACK_MAX_PENDING', 50000)
+        if time.monotonic() - cls._last_flush >= interval:
+            cls.flush()
+        elif sum(abs(state.pending) for state in list(cls._states.values())) >= max_pending:
+            cls.flush()
+
+    @classmethod
+    def flush(cls):
+        """
+        Writes the pending usage of every dirty user back to the database with
+        a single UPDATE statement. The daily reset is folded into the statement.
+        """
+        today = date.today()
+        # The UPDATE runs under the lock, so that a state loaded meanwhile sees
+        # the usage either as pending or in the database
+        with cls._lock:
+            cls._last_flush = time.monotonic()
+            deltas = {}
+            for pk, state in cls._states.items():
+                if state.pending and state.day == today:
+                    deltas[pk] = state.pending
+            if not deltas:
+                return
+
+            User.objects.filter(pk__in=deltas).update(
+                daily_quota_used=Case(
+                    *[
+                        When(pk=pk, last_quota_reset=today, then=Greatest(F('daily_quota_used') + delta, Value(0)))
+                        for pk, delta in deltas.items()
+                    ],
+                    *[When(pk=pk, then=Value(max(delta, 0))) for pk, delta in deltas.items()],
+                    default=F('daily_quota_used'),
+                ),
+                last_quota_reset=today,
+            )
+            # Moved to `used` once written: a failed UPDATE leaves them pending
+            for pk, delta in deltas.items():
+                state = cls._states[pk]
+                state.used += delta
+                state.pending -= delta
+
+    @classmethod
+    def _reserve_in_db(cls, user, rows, limit=None):
+        """
+        Atomically reserves the quota with a single conditional UPDATE:
+            UPDATE users_user
+               SET daily_quota_used = CASE WHEN last_quota_reset = today
+                                           THEN daily_quota_used + rows ELSE rows END,
+                   last_quota_reset = today
+             WHERE id = user.id
+               AND (   (last_quota_reset = today AND daily_quota_used + rows <= limit)
+                    OR (last_quota_reset <> today AND rows <= limit))
+        """
+        if limit is None:
+            limit = cls.get_user_limit(user)
+        if rows > limit:
+            return False
+
+        today = date.today()
+        updated = User.objects.filter(pk=user.pk).filter(
+            Q(last_quota_reset=today, daily_quota_used__lte=limit - rows) | ~Q(last_quota_reset=today)
+        ).update(
+            daily_quota_used=Case(
+                When(last_quota_reset=today, then=F('daily_quota_used') + rows),
+                default=Value(rows),
+            ),
+            last_quota_reset=today,
+        )
+        return updated == 1
+
+    @staticmethod
+    def _refund_in_db(user, rows):
+        # The refund is skipped if the quota has been reset since the reservation
+        User.objects.filter(pk=user.pk, last_quota_reset=date.today()).update(
+            daily_quota_used=Greatest(F('daily_quota_used') - rows, Value(0))
+        )
+
+
+def _flush_at_exit():
+    # Pending usage is written back when the worker process exits
+    try:
+        QuotaManager.flush()
+    except Exception:
+        pass
+
+
+atexit.register(_flush_at_exit)
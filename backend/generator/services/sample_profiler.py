@@ -0,0 +1,341 @@
+import codecs
+import csv
+import json
+import re
+from collections import Counter
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+from .column_models import LEARNED_TYPE, MAX_CATEGORIES, MAX_CHARS, MAX_STRING_LENGTH
+
+
+# Bounded state kept per column, whatever the size of the sample. The models
+# stay within the bounds of column_models: MAX_CATEGORIES distinct values
+# counted before a column stops being a category, longer strings counted at
+# MAX_STRING_LENGTH, MAX_CHARS characters kept in a string model
+RESERVOIR_SIZE = 10000  # numeric / temporal values kept for the histograms
+MAX_COLUMNS = 200
+MAX_LINE_LENGTH = 1024 * 1024
+HISTOGRAM_BINS = 20
+BATCH_ROWS = 5000  # rows profiled at once, column by column
+
+# Numbers with a leading zero ("007", zip codes) are kept as strings
+INT_RE = re.compile(r'^[+-]?(0|[1-9]\d*)$')
+FLOAT_RE = re.compile(r'^[+-]?((0|[1-9]\d*)(\.\d*)?|\.\d+)([eE][+-]?\d+)?$')
+DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+DATETIME_RE = re.compile(r'^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}')
+
+EPOCH = date(1970, 1, 1).toordinal()
+
+
+def _timestamp(text):
+    parsed = datetime.fromisoformat(text)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _decimals(texts, numbers):
+    """Decimals shown by the values of a float column (6 at most)."""
+    decimals = max((len(text) - text.index('.') - 1 for text in texts if '.' in text and 'e' not in text.lower()), default=0)
+    if decimals == 0 and not np.all(numbers == np.round(numbers)):
+        # Scientific notation
+        decimals = 6
+    return min(decimals, 6)
+
+
+class ColumnProfile:
+    """
+    Statistics of one column, updated batch by batch in bounded memory: the
+    candidate types still matching every value, a reservoir sample of the
+    numeric (or temporal) values, the value counts while there are few
+    distinct values, and the string lengths and characters.
+    """
+
+    def __init__(self, name, seed=0):
+        self.name = name
+        self.count = 0
+        self.nulls = 0
+        # Candidate types, dropped at the first batch with a value that does not match
+        self.kinds = {'int', 'float', 'date', 'datetime'}
+        self.decimals = 0
+        self.seen = 0
+        self.reservoir = np.empty(0)
+        self.categories = Counter()
+        self.lengths = Counter()
+        self.chars = Counter()
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """Adds a batch of values (None or '' for a missing value)."""
+        self.count += len(values)
+        present = [value for value in values if value is not None and value != '']
+        self.nulls += len(values) - len(present)
+        if not present:
+            return
+
+        if all(type(value) is str for value in present):
+            texts = present
+            keys = present
+        else:
+            # JSON values: typed category keys (True and 1 are distinct values),
+            # objects and arrays counted as their JSON text
+            present = [
+                json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value
+                for value in present
+            ]
+            texts = [value if type(value) is str else json.dumps(value) for value in present]
+            keys = [value if type(value) is str else (type(value).__name__, value) for value in present]
+
+        if self.categories is not None:
+            self.categories.update(keys)
+            if len(self.categories) > MAX_CATEGORIES:
+                self.categories = None
+        self.lengths.update(map(len, texts))
+        self.chars.update(''.join(texts))
+        if self.kinds:
+            self._update_typed(texts)
+
+    def _update_typed(self, texts):
+        kinds = self.kinds
+        try:
+            if 'int' in kinds and all(map(INT_RE.match, texts)):
+                kinds &= {'int', 'float'}
+                numbers = np.array(texts, dtype=float)
+            elif 'float' in kinds and all(map(FLOAT_RE.match, texts)):
+                kinds &= {'float'}
+                numbers = np.array(texts, dtype=float)
+                self.decimals = max(self.decimals, _decimals(texts, numbers))
+            elif 'date' in kinds and all(map(DATE_RE.match, texts)):
+                kinds &= {'date'}
+                numbers = np.array([date.fromisoformat(text).toordinal() - EPOCH for text in texts], dtype=float)
+            elif 'datetime' in kinds and all(map(DATETIME_RE.match, texts)):
+                kinds &= {'datetime'}
+                numbers = np.array([_timestamp(text) for text in texts], dtype=float)
+            else:
+                kinds.clear()
+        except ValueError:
+            # e.g. '2024-02-30'
+            kinds.clear()
+        if not kinds:
+            self.reservoir = np.empty(0)
+            return
+        self._sample(numbers)
+
+    def _sample(self, numbers):
+        # Reservoir sampling, one batch at a time: the i-th value seen replaces a
+        # random slot with probability RESERVOIR_SIZE / i
+        free = max(RESERVOIR_SIZE - len(self.reservoir), 0)
+        if free:
+            self.reservoir = np.concatenate([self.reservoir, numbers[:free]])
+        rest = numbers[free:]
+        if len(rest):
+            positions = self.seen + free + np.arange(1, len(rest) + 1)
+            slots = (self._rng.random(len(rest)) * positions).astype(np.int64)
+            kept = slots < RESERVOIR_SIZE
+            # Assignment keeps the last value written to a slot, as the sequential algorithm
+            self.reservoir[slots[kept]] = rest[kept]
+        self.seen += len(numbers)
+
+    @property
+    def kind(self):
+        for kind in ('int', 'float', 'date', 'datetime'):
+            if kind in self.kinds and len(self.reservoir):
+                return kind
+        return 'string'
+
+    def model(self):
+        """The column model (see column_models.compile_model), or None for a column without values."""
+        values = self.count - self.nulls
+        if not values:
+            return None
+        categories = self.categories
+        kind = self.kind
+        if categories is not None and (len(categories) <= 20 or len(categories) <= values / 2):
+            items = categories.most_common()
+            # Numbers read from a CSV file are strings, typed JSON values are (type, value) keys
+            cast = {'int': int, 'float': float}.get(kind)
+            return {
+                'kind': 'category',
+                'values': [
+                    key[1] if isinstance(key, tuple) else cast(key) if cast else key for key, _ in items
+                ],
+                'weights': [count for _, count in items],
+            }
+
+        if kind != 'string':
+            counts, edges = np.histogram(self.reservoir, bins=HISTOGRAM_BINS)
+            model = {
+                'kind': 'number' if kind in ('int', 'float') else kind,
+                'edges': edges.tolist(),
+                'counts': counts.tolist(),
+            }
+            if kind == 'int':
+                model['integer'] = True
+            elif kind == 'float':
+                model['decimals'] = self.decimals
+            return model
+
+        lengths = Counter()
+        for length, count in self.lengths.items():
+            lengths[min(length, MAX_STRING_LENGTH)] += count
+        lengths = sorted(lengths.items())
+        chars = self.chars.most_common(MAX_CHARS)
+        return {
+            'kind': 'string',
+            'lengths': [length for length, _ in lengths],
+            'weights': [count for _, count in lengths],
+            'chars': ''.join(char for char, _ in chars if char != '\0') or ' ',
+            'char_weights': [count for char, count in chars if char != '\0'] or [1],
+        }
+
+
+def _lines(chunks, encoding='utf-8-sig'):
+    """Decodes byte chunks into lines (with their line ending), one chunk at a time."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    pending = ''
+    for chunk in chunks:
+        lines = (pending + decoder.decode(chunk)).split('\n')
+        pending = lines.pop()
+        if len(pending) > MAX_LINE_LENGTH:
+            raise ValueError(f"Ligne de plus de {MAX_LINE_LENGTH} caractères.")
+        for line in lines:
+            yield line + '\n'
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
+def _csv_rows(lines):
+    reader = csv.reader(lines)
+    try:
+        header = next(reader, None)
+    except csv.Error as exc:
+        raise ValueError(f"CSV invalide : {exc}.")
+    if not header:
+        raise ValueError("Le fichier CSV est vide.")
+    names = []
+    for index, name in enumerate(header):
+        name = name.strip() or f'column_{index + 1}'
+        # Duplicated names get a suffix: one profile per column
+        names.append(name if name not in names else f'{name}_{index + 1}')
+    yield names
+    try:
+        for values in reader:
+            if values:
+                yield values
+    except csv.Error as exc:
+        raise ValueError(f"CSV invalide (ligne {reader.line_num}) : {exc}.")
+
+
+def _ndjson_rows(lines):
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            raise ValueError(f"Ligne {number} : JSON invalide.")
+        if not isinstance(row, dict):
+            raise ValueError(f"Ligne {number} : un objet JSON est attendu.")
+        yield row
+
+
+def _batches(rows, rows_left=None):
+    """Groups rows in lists of BATCH_ROWS rows, stopping after `rows_left` rows."""
+    batch = []
+    for row in rows:
+        if rows_left is not None:
+            if rows_left == 0:
+                break
+            rows_left -= 1
+        batch.append(row)
+        if len(batch) == BATCH_ROWS:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class SampleProfiler:
+    """
+    Learns a schema from a sample file (CSV with a header line, or NDJSON)
+    read chunk by chunk: memory depends on the number of columns, not on the
+    size of the file. Rows are profiled in batches, column by column, so that
+    counting, type checks and sampling run over whole lists of values.
+
+    Usage:
+        rows, profiles = SampleProfiler.profile(uploaded_file.chunks(), 'csv', max_rows=1_000_000)
+        schema = SampleProfiler.schema(profiles)
+    """
+
+    @classmethod
+    def profile(cls, chunks, file_format, max_rows=None):
+        """
+        Reads the sample and profiles its columns.
+
+        Args:
+            chunks (iterable): The bytes of the file, chunk by chunk.
+            file_format (str): 'csv' or 'ndjson'.
+            max_rows (int): Rows read at most (the rest of the file is ignored).
+
+        Returns:
+            tuple: (rows read, {column name: ColumnProfile} in column order)
+
+        Raises:
+            ValueError: If the file cannot be read as the given format.
+        """
+        lines = _lines(chunks)
+        profiles = {}
+        rows = 0
+
+        if file_format == 'csv':
+            reader = _csv_rows(lines)
+            header = next(reader)
+            if len(header) > MAX_COLUMNS:
+                raise ValueError(f"Le fichier a plus de {MAX_COLUMNS} colonnes.")
+            profiles = {name: ColumnProfile(name, seed=index) for index, name in enumerate(header)}
+            width = len(header)
+            for batch in _batches(reader, rows_left=max_rows):
+                rows += len(batch)
+                # Missing trailing values are nulls, extra values are ignored
+                batch = [values if len(values) == width else (values + [None] * width)[:width] for values in batch]
+                for profile, values in zip(profiles.values(), zip(*batch)):
+                    profile.update(values)
+            return rows, profiles
+
+        for batch in _batches(_ndjson_rows(lines), rows_left=max_rows):
+            for row in batch:
+                for name in row:
+                    if name not in profiles:
+                        if len(profiles) >= MAX_COLUMNS:
+                            raise ValueError(f"Le fichier a plus de {MAX_COLUMNS} colonnes.")
+                        profile = profiles[name] = ColumnProfile(name, seed=len(profiles))
+                        # The key was missing from the rows of the previous batches
+                        profile.count = profile.nulls = rows
+            rows += len(batch)
+            for name, profile in profiles.items():
+                profile.update([row.get(name) for row in batch])
+        return rows, profiles
+
+    @classmethod
+    def schema(cls, profiles):
+        """
+        Builds the schema of the profiled columns: one "learned" field per
+        column, with its null rate and model. Columns without any value are
+        skipped.
+
+        Returns:
+            dict: {column name: {"type": "learned", "null_rate": ..., "model": {...}}}
+        """
+        schema = {}
+        for name, profile in profiles.items():
+            model = profile.model()
+            if model is None:
+                continue
+            field = {'type': LEARNED_TYPE, 'model': model}
+            if profile.nulls:
+                field['null_rate'] = round(profile.nulls / profile.count, 6)
+            schema[name] = field
+        return schema
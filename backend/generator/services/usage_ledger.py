@@ -0,0 +1,51 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import DailyUsage
+
+
+class UsageLedger:
+    """
+    A service class keeping the DailyUsage rollup table up to date.
+    """
+
+    @staticmethod
+    def record(user, entries, day=None, datasets=True):
+        """
+        Adds generation events to the user's daily usage.
+
+        Args:
+            user (User): The user who generated the datasets.
+            entries (list): (file_format, rows) tuples, one per logged dataset.
+            day (date): The usage day. Defaults to today.
+            datasets (bool): Whether the entries are new datasets. Rows of ranges
+                and history downloads are counted without adding datasets.
+        """
+        day = day or timezone.localdate()
+
+        # Aggregates the entries first so each (user, day, format) row is written once
+        totals = defaultdict(lambda: [0, 0])
+        for file_format, rows in entries:
+            totals[file_format][0] += 1 if datasets else 0
+            totals[file_format][1] += rows
+
+        for file_format, (datasets_count, rows) in totals.items():
+            UsageLedger._increment(user.pk, day, file_format, datasets_count, rows)
+
+    @staticmethod
+    def _increment(user_id, day, file_format, datasets_count, rows):
+        """Upserts a ledger row: UPDATE ... SET x = x + n, or INSERT if it does not exist yet."""
+        lookup = {'user_id': user_id, 'day': day, 'file_format': file_format}
+        increments = {'datasets_count': F('datasets_count') + datasets_count, 'rows': F('rows') + rows}
+
+        if DailyUsage.objects.filter(**lookup).update(**increments):
+            return
+        try:
+            with transaction.atomic():
+                DailyUsage.objects.create(datasets_count=datasets_count, rows=rows, **lookup)
+        except IntegrityError:
+            # Created concurrently by another request
+            DailyUsage.objects.filter(**lookup).update(**increments)
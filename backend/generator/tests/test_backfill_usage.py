@@ -0,0 +1,50 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from users.models import User
+from generator.models import DailyUsage, GeneratedDataset, SchemaDefinition
+
+
+class BackfillUsageTests(TestCase):
+    """The ledger is raised to the history totals, day by day."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='backfill', email='backfill@example.com', password='p')
+        self.definition = SchemaDefinition.objects.intern({'name': 'name'})
+        self.now = timezone.now()
+
+    def log(self, days_ago, rows, file_format='csv'):
+        dataset = GeneratedDataset.objects.create(
+            user=self.user, definition=self.definition, nb_rows=rows, file_format=file_format
+        )
+        GeneratedDataset.objects.filter(pk=dataset.pk).update(created_at=self.now - timedelta(days=days_ago))
+
+    def usage(self):
+        return {
+            (row.day, row.file_format): (row.datasets_count, row.rows)
+            for row in DailyUsage.objects.filter(user=self.user)
+        }
+
+    def test_history_is_rolled_up_per_day(self):
+        self.log(2, 10)
+        self.log(2, 5)
+        self.log(1, 7, 'json')
+        self.log(0, 100)  # today is recorded by the views
+        # Usage without history (ranges) is never lowered
+        yesterday = timezone.localdate(self.now - timedelta(days=1))
+        DailyUsage.objects.create(user=self.user, day=yesterday, file_format='json', datasets_count=1, rows=50)
+
+        call_command('backfill_usage', batch_size=2, stdout=StringIO())
+        two_days_ago = timezone.localdate(self.now - timedelta(days=2))
+        self.assertEqual(self.usage(), {
+            (two_days_ago, 'csv'): (2, 15),
+            (yesterday, 'json'): (1, 50),
+        })
+
+        # Idempotent
+        call_command('backfill_usage', stdout=StringIO())
+        self.assertEqual(len(self.usage()), 2)
@@ -0,0 +1,39 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from users.models import User
+from generator.models import DailyUsage, GeneratedDataset
+from generator.services.quota_manager import QuotaManager
+from generator.services.usage_ledger import UsageLedger
+
+
+BATCH = {'datasets': [
+    {'schema': {'name': 'name', 'city': 'city'}, 'rows': 50, 'formats': ['csv', 'json']},
+    {'schema': {'email': 'email'}, 'rows': 20, 'formats': ['sql']},
+]}
+
+
+class BatchPersistenceTests(TestCase):
+    """The history and usage of a batch are written together, or not at all."""
+
+    def setUp(self):
+        QuotaManager._states.clear()
+        self.user = User.objects.create_user(username='batch', email='batch@example.com', password='p')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_batch_is_recorded(self):
+        response = self.client.post('/api/generate/batch/', BATCH, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(GeneratedDataset.objects.filter(user=self.user).count(), 3)
+        self.assertGreater(QuotaManager.get_used(self.user), 0)
+
+    def test_failed_persistence_is_rolled_back_and_refunded(self):
+        with mock.patch.object(UsageLedger, 'record', side_effect=RuntimeError('ledger down')):
+            response = self.client.post('/api/generate/batch/', BATCH, format='json')
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(GeneratedDataset.objects.filter(user=self.user).exists())
+        self.assertFalse(DailyUsage.objects.filter(user=self.user).exists())
+        self.assertEqual(QuotaManager.get_used(self.user), 0)
@@ -0,0 +1,39 @@
+from django.test import TestCase, override_settings
+
+from generator.services.cost_model import MIN_FIELD_WEIGHT, CostModel
+
+
+class QuotaUnitsTests(TestCase):
+    """Quota units charged for a schema (no FieldTypeCost rows: the default measurements apply)."""
+
+    def setUp(self):
+        CostModel._field_costs_loaded_at = None
+
+    def test_charge_scales_with_rows(self):
+        schema = {'name': 'name', 'email': 'email', 'bio': 'custom_text(500)'}
+        units = [CostModel.quota_units(schema, rows) for rows in (1000, 2000, 10000)]
+        self.assertGreater(units[0], 1)
+        self.assertAlmostEqual(units[1] / units[0], 2, delta=0.01)
+        self.assertAlmostEqual(units[2] / units[0], 10, delta=0.01)
+
+    def test_reference_row_is_one_unit(self):
+        # Five 'name' fields weigh QUOTA_WEIGHT_PER_UNIT
+        schema = {f'name_{index}': 'name' for index in range(5)}
+        self.assertEqual(CostModel.quota_units(schema, 1000), 1000)
+
+    def test_heavier_types_cost_more(self):
+        self.assertGreater(
+            CostModel.quota_units({'bio': 'custom_text(1000)'}, 1000),
+            CostModel.quota_units({'bio': 'custom_text(50)'}, 1000),
+        )
+
+    def test_every_field_weighs_something(self):
+        # Unknown or very cheap types are still charged per row
+        for field_type in ('not_a_type', 'normal(0,1)', 'pattern(A#)'):
+            with self.subTest(field_type=field_type):
+                units = CostModel.quota_units({'x': field_type}, 1000000)
+                self.assertGreaterEqual(units, 1000000 * MIN_FIELD_WEIGHT / 5)
+
+    @override_settings(QUOTA_COST_WEIGHTED=False)
+    def test_unweighted_quota_is_one_unit_per_row(self):
+        self.assertEqual(CostModel.quota_units({'bio': 'custom_text(1000)'}, 1234), 1234)
@@ -0,0 +1,41 @@
+import json
+import math
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from users.models import User
+from generator.services.distributions import parse_distribution
+
+
+class DistributionBoundsTests(SimpleTestCase):
+    """Distributions only accept parameters whose values are finite numbers."""
+
+    def test_values_at_the_bounds_are_finite(self):
+        rng = np.random.default_rng(0)
+        for field_type in ('normal(-1e15,1e15)', 'lognormal(100,10)', 'poisson(1e9)', 'zipf(1.01)'):
+            with self.subTest(field_type=field_type):
+                values = parse_distribution(field_type)(rng, 100000)
+                self.assertTrue(all(math.isfinite(value) for value in values))
+                json.dumps(values, allow_nan=False)
+
+    def test_parameters_out_of_bounds_are_rejected(self):
+        for field_type in ('normal(1e16,1)', 'lognormal(0,1000)', 'lognormal(800,1)', 'poisson(1e12)', 'poisson(-1)'):
+            with self.subTest(field_type=field_type):
+                with self.assertRaises(ValueError):
+                    parse_distribution(field_type)
+
+
+class DistributionValidationTests(TestCase):
+    """Invalid distributions are a 400 of the API, not a 500."""
+
+    def test_out_of_bounds_distribution_is_a_bad_request(self):
+        user = User.objects.create_user(username='dist', email='dist@example.com', password='p')
+        client = APIClient()
+        client.force_authenticate(user)
+        for field_type in ('lognormal(0,1000)', 'poisson(1e12)'):
+            with self.subTest(field_type=field_type):
+                response = client.post('/api/preview/', {'schema': {'valeur': field_type}}, format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('schema', response.json())
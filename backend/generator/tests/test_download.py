@@ -0,0 +1,47 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from subscriptions.models import PlanLimit
+from users.models import User
+from generator.models import DailyUsage, GeneratedDataset
+from generator.services.cost_model import CostModel
+from generator.services.quota_manager import QuotaManager
+
+
+SCHEMA = {'name': 'name', 'email': 'email', 'city': 'city'}
+
+
+class HistoryDownloadTests(TestCase):
+    """Downloading a dataset again costs the same as generating it."""
+
+    def setUp(self):
+        QuotaManager._states.clear()
+        QuotaManager._plan_limits_loaded_at = None
+        PlanLimit.objects.update_or_create(plan='free', defaults={'daily_units': 1000, 'requests_per_second': 100, 'burst': 100})
+        self.user = User.objects.create_user(username='download', email='download@example.com', password='p')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.units = CostModel.quota_units(SCHEMA, 100)
+
+    def generate(self, file_format):
+        response = self.client.post('/api/generate/', {'schema': SCHEMA, 'rows': 100, 'format': file_format}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return GeneratedDataset.objects.latest('id')
+
+    def test_download_is_charged_and_counted(self):
+        for file_format in ('csv', 'xlsx'):
+            with self.subTest(file_format=file_format):
+                dataset = self.generate(file_format)
+                used = QuotaManager.get_used(self.user)
+                response = self.client.get(f'/api/history/{dataset.id}/download/')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(QuotaManager.get_used(self.user), used + self.units)
+                usage = DailyUsage.objects.get(user=self.user, file_format=file_format)
+                # Rows of the download are counted, but no new dataset
+                self.assertEqual((usage.datasets_count, usage.rows), (1, 200))
+
+    def test_download_over_the_quota_is_refused(self):
+        dataset = self.generate('csv')
+        User.objects.filter(pk=self.user.pk).update(daily_quota_used=1000)
+        response = self.client.get(f'/api/history/{dataset.id}/download/')
+        self.assertEqual(response.status_code, 429)
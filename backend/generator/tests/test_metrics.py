@@ -0,0 +1,47 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from users.models import User
+from generator.metrics import GENERATIONS_IN_FLIGHT, REQUEST_DURATION
+from generator.services.quota_manager import QuotaManager
+
+
+class StreamingMetricsTests(TestCase):
+    """A streamed generation is in flight, and timed, until its stream ends."""
+
+    def setUp(self):
+        QuotaManager._states.clear()
+        self.user = User.objects.create_user(username='metrics', email='metrics@example.com', password='p')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def in_flight(self):
+        return GENERATIONS_IN_FLIGHT.values.get(('generate-range',), 0)
+
+    def observed(self):
+        value = REQUEST_DURATION.values.get(('generate-range', 'POST'))
+        return value[2] if value else 0
+
+    def test_stream_is_tracked_until_it_ends(self):
+        in_flight, observed = self.in_flight(), self.observed()
+        response = self.client.post('/api/generate/range/', {
+            'schema': {'name': 'name'}, 'rows': 1000, 'offset': 0, 'limit': 100, 'seed': 1, 'format': 'csv',
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(self.in_flight(), in_flight + 1)
+        self.assertEqual(self.observed(), observed)
+
+        b''.join(response.streaming_content)
+        self.assertEqual(self.in_flight(), in_flight)
+        self.assertEqual(self.observed(), observed + 1)
+
+    def test_closed_stream_is_no_longer_in_flight(self):
+        in_flight = self.in_flight()
+        response = self.client.post('/api/generate/range/', {
+            'schema': {'name': 'name'}, 'rows': 1000, 'offset': 0, 'limit': 100, 'seed': 1, 'format': 'csv',
+        }, format='json')
+        # The client goes away before the end of the stream
+        next(iter(response.streaming_content))
+        response.close()
+        self.assertEqual(self.in_flight(), in_flight)
@@ -0,0 +1,33 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from users.models import User
+
+
+class PreviewTests(TestCase):
+    """Previews are free, so they are cached and kept small."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='preview', email='preview@example.com', password='p')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def preview(self, schema, **data):
+        return self.client.post('/api/preview/', {'schema': schema, 'rows': 5, **data}, format='json')
+
+    def test_preview_without_seed_is_cached(self):
+        first = self.preview({'name': 'name', 'age': 'normal(40,10)'})
+        second = self.preview({'name': 'name', 'age': 'normal(40,10)'})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.content, second.content)
+        # The seed returned reproduces the same rows
+        seeded = self.preview({'name': 'name', 'age': 'normal(40,10)'}, seed=first.json()['seed'])
+        self.assertEqual(seeded.json()['rows'], first.json()['rows'])
+
+    def test_oversized_preview_is_rejected(self):
+        schema = {f'text_{i}': 'custom_text(10000)' for i in range(5)}
+        response = self.client.post('/api/preview/', {'schema': schema, 'rows': 50}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('estimate', response.json())
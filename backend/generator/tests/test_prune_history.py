@@ -0,0 +1,47 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from subscriptions.models import PlanLimit, Subscription
+from users.models import User
+from generator.models import GeneratedDataset, SchemaDefinition
+
+
+class PruneHistoryTests(TestCase):
+    """History is pruned with the retention of each user's effective plan."""
+
+    def setUp(self):
+        PlanLimit.objects.update_or_create(plan='free', defaults={'history_retention_days': 30})
+        PlanLimit.objects.update_or_create(plan='pro', defaults={'history_retention_days': 365})
+        self.definition = SchemaDefinition.objects.intern({'name': 'name'})
+
+    def user_with_history(self, username, plan, days_ago):
+        user = User.objects.create_user(username=username, email=f'{username}@example.com', password='p', plan=plan)
+        dataset = GeneratedDataset.objects.create(user=user, definition=self.definition, nb_rows=1, file_format='csv')
+        GeneratedDataset.objects.filter(pk=dataset.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+        return user
+
+    def test_lapsed_subscription_keeps_the_free_retention(self):
+        active = self.user_with_history('active', 'pro', 60)
+        Subscription.objects.create(user=active, status='active')
+        lapsed = self.user_with_history('lapsed', 'pro', 60)
+        Subscription.objects.create(user=lapsed, status='cancelled')
+        free = self.user_with_history('free', 'free', 60)
+        recent = self.user_with_history('recent', 'free', 5)
+
+        call_command('prune_history', stdout=StringIO())
+        remaining = set(GeneratedDataset.objects.values_list('user__username', flat=True))
+        self.assertEqual(remaining, {active.username, recent.username})
+        self.assertNotIn(lapsed.username, remaining)
+        self.assertNotIn(free.username, remaining)
+
+    def test_unreferenced_definitions_are_deleted(self):
+        self.user_with_history('old', 'free', 60)
+        orphan = SchemaDefinition.objects.intern({'email': 'email'})
+        SchemaDefinition.objects.update(created_at=timezone.now() - timedelta(days=2))
+
+        call_command('prune_history', stdout=StringIO())
+        self.assertFalse(SchemaDefinition.objects.filter(pk__in=[orphan.pk, self.definition.pk]).exists())
@@ -0,0 +1,129 @@
+import threading
+from datetime import date, timedelta
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from subscriptions.models import PlanLimit
+from users.models import User
+from generator.services.quota_manager import QuotaManager
+
+
+def reset_quota_manager():
+    QuotaManager._states.clear()
+    QuotaManager._plan_limits_loaded_at = None
+
+
+class QuotaReservationTests(TestCase):
+    """Write-through reservations (the default): one conditional UPDATE each."""
+
+    def setUp(self):
+        reset_quota_manager()
+        PlanLimit.objects.update_or_create(plan='free', defaults={'daily_units': 100})
+        self.user = User.objects.create_user(username='quota', email='quota@example.com', password='p')
+
+    def used_in_db(self):
+        return User.objects.values_list('daily_quota_used', flat=True).get(pk=self.user.pk)
+
+    def test_reserve_up_to_the_limit(self):
+        self.assertTrue(QuotaManager.reserve(self.user, 60))
+        self.assertTrue(QuotaManager.reserve(self.user, 40))
+        self.assertFalse(QuotaManager.reserve(self.user, 1))
+        self.assertEqual(self.used_in_db(), 100)
+        self.assertEqual(QuotaManager.get_used(self.user), 100)
+        self.assertEqual(QuotaManager.get_remaining(self.user), 0)
+
+    def test_request_larger_than_the_limit_is_rejected(self):
+        self.assertFalse(QuotaManager.reserve(self.user, 101))
+        self.assertEqual(self.used_in_db(), 0)
+
+    def test_refund_gives_units_back(self):
+        QuotaManager.reserve(self.user, 80)
+        QuotaManager.refund(self.user, 30)
+        self.assertEqual(self.used_in_db(), 50)
+        self.assertTrue(QuotaManager.reserve(self.user, 50))
+        # A refund never makes the usage negative
+        QuotaManager.refund(self.user, 500)
+        self.assertEqual(self.used_in_db(), 0)
+
+    def test_usage_of_a_previous_day_is_reset(self):
+        User.objects.filter(pk=self.user.pk).update(daily_quota_used=100, last_quota_reset=date.today() - timedelta(days=1))
+        self.assertEqual(QuotaManager.get_used(self.user), 0)
+        self.assertTrue(QuotaManager.reserve(self.user, 70))
+        self.assertEqual(self.used_in_db(), 70)
+
+    @override_settings(QUOTA_WRITEBACK_INTERVAL=3600, QUOTA_WRITEBACK_LOCAL_RATIO=0.5)
+    def test_writeback_checks_the_database_near_the_limit(self):
+        # Under half the limit, reservations are kept in memory
+        self.assertTrue(QuotaManager.reserve(self.user, 40))
+        self.assertEqual(self.used_in_db(), 0)
+        # Another process used 50 units meanwhile: past the local ratio, the
+        # pending units are written back and the database decides
+        User.objects.filter(pk=self.user.pk).update(daily_quota_used=50, last_quota_reset=date.today())
+        self.assertFalse(QuotaManager.reserve(self.user, 20))
+        self.assertEqual(self.used_in_db(), 90)
+        self.assertTrue(QuotaManager.reserve(self.user, 10))
+        self.assertEqual(self.used_in_db(), 100)
+
+
+class ConcurrentReservationTests(TransactionTestCase):
+    """Threads reserving at once never exceed the limit (each thread has its own connection)."""
+
+    def setUp(self):
+        reset_quota_manager()
+        PlanLimit.objects.update_or_create(plan='free', defaults={'daily_units': 100})
+        self.user = User.objects.create_user(username='race', email='race@example.com', password='p')
+
+    def reserve_concurrently(self, threads=8, attempts=10, units=3):
+        results = []
+        barrier = threading.Barrier(threads)
+
+        def run():
+            barrier.wait()
+            try:
+                for _ in range(attempts):
+                    results.append(QuotaManager.reserve(self.user, units))
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=run) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return results
+
+    def test_concurrent_reservations_stay_within_the_limit(self):
+        results = self.reserve_concurrently()
+        used = User.objects.values_list('daily_quota_used', flat=True).get(pk=self.user.pk)
+        self.assertEqual(used, results.count(True) * 3)
+        self.assertEqual(used, 99)
+
+    @override_settings(QUOTA_WRITEBACK_INTERVAL=3600)
+    def test_concurrent_writeback_reservations_stay_within_the_limit(self):
+        results = self.reserve_concurrently()
+        QuotaManager.flush()
+        used = User.objects.values_list('daily_quota_used', flat=True).get(pk=self.user.pk)
+        self.assertEqual(used, results.count(True) * 3)
+        self.assertLessEqual(used, 100)
+
+
+class WriteThroughQueryTests(TestCase):
+    """Once the quota state is loaded, a reservation costs a single query."""
+
+    def setUp(self):
+        reset_quota_manager()
+        self.user = User.objects.create_user(username='queries', email='queries@example.com', password='p', plan='pro')
+
+    def test_reservation_is_a_single_update(self):
+        QuotaManager.reserve(self.user, 1)
+        with self.assertNumQueries(0):
+            self.assertTrue(QuotaManager.may_reserve(self.user, 10))
+        with self.assertNumQueries(1):
+            self.assertTrue(QuotaManager.reserve(self.user, 10))
+
+    def test_request_larger_than_the_plan_is_refused_without_query(self):
+        QuotaManager.reserve(self.user, 1)
+        limit = QuotaManager.get_user_limit(self.user)
+        with self.assertNumQueries(0):
+            self.assertFalse(QuotaManager.may_reserve(self.user, limit + 1))
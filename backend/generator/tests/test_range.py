@@ -0,0 +1,36 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from subscriptions.models import PlanLimit
+from users.models import User
+from generator.models import DailyUsage
+from generator.services.cost_model import CostModel
+from generator.services.quota_manager import QuotaManager
+
+
+SCHEMA = {'name': 'name', 'city': 'city'}
+
+
+class RangeAccountingTests(TestCase):
+    """A range is charged for the rows it returns, and is not a dataset."""
+
+    def setUp(self):
+        QuotaManager._states.clear()
+        QuotaManager._plan_limits_loaded_at = None
+        self.units = CostModel.quota_units(SCHEMA, 100)
+        PlanLimit.objects.update_or_create(plan='free', defaults={'daily_units': self.units})
+        self.user = User.objects.create_user(username='range', email='range@example.com', password='p')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_last_range_is_charged_for_its_rows(self):
+        # 5000 rows asked for, but only the last 100 rows of the dataset exist
+        response = self.client.post('/api/generate/range/', {
+            'schema': SCHEMA, 'rows': 1000, 'offset': 900, 'limit': 5000, 'seed': 1, 'format': 'csv',
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Range'], 'rows 900-999/1000')
+        self.assertEqual(QuotaManager.get_used(self.user), self.units)
+
+        usage = DailyUsage.objects.get(user=self.user, file_format='csv')
+        self.assertEqual((usage.datasets_count, usage.rows), (0, 100))
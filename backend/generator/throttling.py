@@ -0,0 +1,67 @@
+from datetime import datetime, time, timedelta
+
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+from .services.quota_manager import QUOTA_UNIT, QuotaManager
+
+
+class QuotaThrottled(Throttled):
+    """429 of the daily quota, giving the units asked for and left (not rows)."""
+
+    def __init__(self, wait, requested, remaining):
+        super().__init__(wait)
+        self.detail = {
+            'error': "Quota journalier insuffisant pour cette requête.",
+            'requested': requested,
+            'remaining': remaining,
+            'unit': QUOTA_UNIT,
+        }
+
+
+class PlanRateThrottle(BaseThrottle):
+    """
+    Limits the number of API requests per second of an authenticated user, 
+    using the token bucket of their plan (PlanLimit.requests_per_second/burst).
+    """
+    def allow_request(self, request, view):
+        self.wait_time = 0
+        if not request.user or not request.user.is_authenticated:
+            return True
+        self.wait_time = QuotaManager.consume_request(request.user)
+        return self.wait_time == 0
+    
+    def wait(self):
+        return self.wait_time
+
+
+class PlanDailyQuotaThrottle(BaseThrottle):
+    """
+    Rejects a generation request up front when the quota units it asks for 
+    exceed what is left of the user's daily quota (PlanLimit.daily_units).
+    
+    The view must implement `get_requested_units(request)`. The quota itself is 
+    reserved by the view once the request is validated. The check runs on the 
+    cached quota state (see QuotaManager.may_reserve), so that an accepted 
+    request costs no extra query; the remaining units are only read for the 
+    429 response, which gives the units requested and remaining (see 
+    QuotaThrottled).
+    """
+    def allow_request(self, request, view):
+        self.wait_time = None
+        if not request.user or not request.user.is_authenticated:
+            return True
+        
+        units = view.get_requested_units(request)
+        if QuotaManager.may_reserve(request.user, units):
+            return True
+        remaining = QuotaManager.get_remaining(request.user)
+        
+        # The quota is reset at midnight
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), time.min)
+        self.wait_time = (midnight - now).total_seconds()
+        raise QuotaThrottled(self.wait_time, units, remaining)
+    
+    def wait(self):
+        return self.wait_time
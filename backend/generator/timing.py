@@ -0,0 +1,132 @@
+import json
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+
+from django.conf import settings
+from django.db import connection
+
+
+logger = logging.getLogger('generator.timing')
+
+
+class RequestTimer:
+    """
+    Collects the duration of the phases of one request (validate, quota,
+    generate, export, persist, send, ...) and a few descriptive fields
+    (rows, columns, format, bytes).
+
+    A phase entered several times accumulates its durations.
+    """
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases = {}
+        self.fields = {}
+
+    @contextmanager
+    def phase(self, name):
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started_at)
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0) + seconds
+
+    def annotate(self, **fields):
+        self.fields.update(fields)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started_at
+
+    def server_timing(self):
+        """Value of the Server-Timing header (durations in milliseconds)."""
+        metrics = [f'{name};dur={seconds * 1000:.1f}' for name, seconds in self.phases.items()]
+        metrics.append(f'total;dur={self.elapsed() * 1000:.1f}')
+        return ', '.join(metrics)
+
+
+class NullTimer:
+    """Stand-in used when timing is disabled: every call is a no-op."""
+    _context = nullcontext()
+
+    def phase(self, name):
+        return self._context
+
+    def add(self, name, seconds):
+        pass
+
+    def annotate(self, **fields):
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+
+def get_timer(request):
+    """Returns the timer of the request, or a no-op timer when timing is disabled."""
+    return getattr(request, 'timer', NULL_TIMER)
+
+
+class RequestTimingMiddleware:
+    """
+    Times every request when REQUEST_TIMING_ENABLED is set.
+
+    Views record their own phases through get_timer(request); the middleware
+    adds the time spent in database queries ('db'), returns the phases in a
+    Server-Timing header and, once the response has been sent to the client,
+    writes one JSON log line per request including the 'send' phase.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'REQUEST_TIMING_ENABLED', False)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        timer = request.timer = RequestTimer()
+        queries = [0]
+
+        def time_query(execute, sql, params, many, context):
+            queries[0] += 1
+            with timer.phase('db'):
+                return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(time_query):
+            response = self.get_response(request)
+
+        timer.annotate(queries=queries[0])
+        response['Server-Timing'] = timer.server_timing()
+        self._log_on_close(request, response, timer)
+        return response
+
+    @staticmethod
+    def _log_on_close(request, response, timer):
+        """Logs the request when the server closes the response, i.e. after sending it."""
+        sent_from = time.perf_counter()
+        close = response.close
+
+        def close_and_log():
+            close()
+            if 'send' in timer.phases:
+                # Already logged: close() may be called more than once
+                return
+            timer.add('send', time.perf_counter() - sent_from)
+            if not response.streaming:
+                timer.fields.setdefault('bytes', len(response.content))
+            match = request.resolver_match
+            logger.info(json.dumps({
+                'event': 'request_timing',
+                'method': request.method,
+                'path': request.path,
+                'view': match.view_name if match else None,
+                'status': response.status_code,
+                'user_id': getattr(request.user, 'pk', None) if hasattr(request, 'user') else None,
+                'total_ms': round(timer.elapsed() * 1000, 2),
+                'phases_ms': {name: round(seconds * 1000, 2) for name, seconds in timer.phases.items()},
+                **timer.fields,
+            }))
+
+        response.close = close_and_log
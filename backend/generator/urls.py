@@ -1,10 +1,18 @@
 from django.urls import path
+from .metrics import metrics_view  # Handles GET for the Prometheus metrics (staff or METRICS_TOKEN)
 from .views import (
     GenerateDataView,      # Handles POST request for synthetic data generation
+    BatchGenerateDataView, # Handles POST request for multi-dataset, multi-format generation
+    GenerateRangeView,     # Handles POST request for a range of rows of a seeded dataset
+    PreviewView,           # Handles POST request for a few preview rows of a schema
     SchemaListCreateView,  # Handles GET (list) and POST (create) for schemas
+    SchemaLearnView,       # Handles POST (upload) for a schema learned from a sample file
     SchemaDetailView,      # Handles GET, PUT, DELETE for a specific schema
     DatasetHistoryView,    # Handles GET for the user's generation history
-    DatasetDeleteView      # Handles DELETE for a specific history record
+    DatasetDeleteView,     # Handles DELETE for a specific history record
+    DatasetDownloadView,   # Handles GET for a history record regenerated from its seed
+    UsageView,             # Handles GET for the user's daily usage charts
+    PlanUsageView          # Handles GET for the per-plan usage totals (admin)
 )
 
 # Defines all API endpoints under the '/api/' root (assuming they are included 
@@ -16,12 +24,28 @@ urlpatterns = [
     # Main endpoint used to trigger the data generation process, performs validation and quota checks.
     path('generate/', GenerateDataView.as_view(), name='generate-data'),
     
+    # POST /api/generate/batch/
+    # Generates several datasets at once, each exported to one or more formats, returned as a zip archive.
+    path('generate/batch/', BatchGenerateDataView.as_view(), name='generate-batch'),
+    
+    # POST /api/generate/range/
+    # Streams the rows offset.. offset + limit of a seeded dataset (parallel loaders).
+    path('generate/range/', GenerateRangeView.as_view(), name='generate-range'),
+    
+    # POST /api/preview/
+    # Returns up to 50 rows of a schema as compact JSON, for the schema editor (no quota, no history).
+    path('preview/', PreviewView.as_view(), name='preview'),
+    
     # --- Schema Management Endpoints ---
     
     # GET /api/schemas/ -> List all saved schemas for the user
     # POST /api/schemas/ -> Create a new schema
     path('schemas/', SchemaListCreateView.as_view(), name='schema-list'),
     
+    # POST /api/schemas/learn/ (multipart: file, name, format)
+    # Learns a schema from a CSV or NDJSON sample file and saves it.
+    path('schemas/learn/', SchemaLearnView.as_view(), name='schema-learn'),
+    
     # GET/PUT/DELETE /api/schemas/42/
     # Retrieve, update, or delete a specific schema by its primary key (pk).
     path('schemas/<int:pk>/', SchemaDetailView.as_view(), name='schema-detail'),
@@ -35,4 +59,24 @@ urlpatterns = [
     # DELETE /api/history/99/
     # Deletes a specific historical dataset record by its primary key (pk).
     path('history/<int:pk>/', DatasetDeleteView.as_view(), name='dataset-delete'),
+    
+    # GET /api/history/99/download/
+    # Regenerates the file of a historical dataset from its recorded seed (same bytes, streamed).
+    path('history/<int:pk>/download/', DatasetDownloadView.as_view(), name='dataset-download'),
+    
+    # --- Usage Endpoints ---
+    
+    # GET /api/usage/?days=30
+    # Rows and datasets per day and per format for the user, from the DailyUsage rollup table.
+    path('usage/', UsageView.as_view(), name='usage'),
+    
+    # GET /api/usage/plans/?days=30
+    # Usage totals per subscription plan (admin only).
+    path('usage/plans/', PlanUsageView.as_view(), name='usage-plans'),
+    
+    # --- Monitoring Endpoint ---
+    
+    # GET /api/metrics/
+    # Request latency, rows/bytes generated, quota rejections, in-flight generations (Prometheus text format).
+    path('metrics/', metrics_view, name='metrics'),
 ]
\ No newline at end of file
@@ -1,36 +1,164 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.views import APIView
-from django.http import HttpResponse, FileResponse
+from rest_framework.parsers import MultiPartParser
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.http import HttpResponse, FileResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
-from datetime import date
+from datetime import timedelta
+from io import BytesIO
+import hashlib
+import json
 import os
+import random
+import re
+import time
+import zipfile
 
-from .models import Schema, GeneratedDataset
-from .serializers import SchemaSerializer, GenerateDataSerializer, GeneratedDatasetSerializer
-from .services.data_generator import DataGenerator
+from .models import Schema, SchemaDefinition, GeneratedDataset, DailyUsage
+from .serializers import (
+    SchemaSerializer, SchemaListSerializer, GenerateDataSerializer, GeneratedDatasetSerializer,
+    GeneratedDatasetListSerializer, BatchGenerateSerializer, PreviewSerializer, SchemaLearnSerializer,
+    GenerateRangeSerializer
+)
+from .pagination import HistoryCursorPagination, SchemaCursorPagination
+from .conditional import (
+    conditional_get, schema_list_etag, schema_detail_etag, schema_detail_last_modified, history_etag
+)
+from .services.data_generator import GENERATOR_VERSION
+from .services.generator_pool import GeneratorPool
+from .services.locales import DEFAULT_LOCALE
+from .services.fingerprint import plan_fingerprint
 from .services.file_exporter import FileExporter
+from .services.quota_manager import QUOTA_UNIT, QuotaManager
+from .services.usage_ledger import UsageLedger
+from .services.profiler import ProfiledStream, ProfilerBusy, RequestProfiler
+from .services.sample_profiler import SampleProfiler
+from .services.cost_model import Admission, CostModel, REJECT, STREAM
+from .throttling import PlanRateThrottle, PlanDailyQuotaThrottle
+from .timing import get_timer
+from .metrics import GENERATION_DURATION, record_export, track_in_flight
+
+
+def seeded_rows(schema, rows, locales, seed, now, offset=0, limit=None):
+    """
+    Yields the rows (or the range offset.. offset + limit) of a seeded generation 
+    from a pooled generator, held until the stream ends (or the client disconnects).
+    """
+    with GeneratorPool.acquire(seed=seed, now=now) as generator:
+        yield from generator.iter_dataset(schema, rows, locales=locales, offset=offset, limit=limit)
+
+
+def reproduction_fields(schema, seed, locales, now):
+    """The GeneratedDataset fields needed to regenerate a dataset identically."""
+    return {
+        'seed': seed,
+        'locale': locales,
+        'field_order': list(schema),
+        'generator_version': GENERATOR_VERSION,
+        'generated_at': now,
+    }
+
+
+class TimedThrottlesMixin:
+    """Accounts the throttle checks to the 'quota' phase of the request timer."""
+    
+    def check_throttles(self, request):
+        with get_timer(request).phase('quota'):
+            super().check_throttles(request)
 
 
 # --- DATA GENERATION ENDPOINT ---
-class GenerateDataView(APIView):
+class GenerateDataView(TimedThrottlesMixin, APIView):
     """
     Main view for generating synthetic data.
     Endpoint: POST /api/generate/
     
     This view handles input validation, quota checks, data generation, 
-    file export, schema saving, and history logging.
+    file export, schema saving, and history logging. Each step is recorded 
+    as a phase of the request timer (see generator.timing).
+    
+    The cost of the request is estimated before any work starts (see 
+    CostModel): requests too large to be built in memory are streamed, or 
+    rejected when they cannot be.
+    
+    Staff users can profile a request with `?profile=1` (or `X-Profile: 1`): 
+    the profiles are saved and linked from the GeneratedDataset admin page.
     """
     # Requires the user to be authenticated via JWT (or session)
     permission_classes = [IsAuthenticated]
+    # Limits both the request rate and the quota units per day of the user's plan
+    throttle_classes = [PlanRateThrottle, PlanDailyQuotaThrottle]
     
+    def get_requested_units(self, request):
+        """Quota units asked for, read before validation by PlanDailyQuotaThrottle."""
+        try:
+            rows = max(int(request.data.get('rows', 0)), 0)
+            schema = request.data.get('schema')
+            return CostModel.quota_units(schema, rows) if isinstance(schema, dict) and rows else rows
+        except (TypeError, ValueError, AttributeError):
+            return 0
+    
+    @track_in_flight('generate-data')
     def post(self, request):
+        if not self.profiling_requested(request):
+            return self.generate(request)
+        
+        profiler = RequestProfiler()
+        try:
+            profiler.start()
+        except ProfilerBusy:
+            return Response(
+                {'error': "Un profil est déjà en cours dans ce processus, réessayez plus tard."},
+                status=status.HTTP_409_CONFLICT
+            )
+        try:
+            response = self.generate(request)
+        except BaseException:
+            profiler.stop()
+            raise
+        
+        dataset = getattr(self, 'dataset', None)
+        if response.streaming:
+            # The rows are generated while the response is sent: the profile is
+            # saved once the stream is closed
+            response.streaming_content = ProfiledStream(
+                response.streaming_content, profiler, lambda: self.save_profile(profiler, dataset)
+            )
+        else:
+            profiler.stop()
+            self.save_profile(profiler, dataset)
+        if dataset is not None:
+            # Admin page linking both profile files
+            response['X-Profile'] = reverse('admin:generator_generateddataset_change', args=[dataset.id])
+        return response
+    
+    @staticmethod
+    def save_profile(profiler, dataset):
+        if dataset is not None:
+            dataset.profile_path, dataset.profile_stacks_path = profiler.save(f'profiles/dataset_{dataset.id}')
+            dataset.save(update_fields=['profile_path', 'profile_stacks_path'])
+    
+    def profiling_requested(self, request):
+        flag = request.query_params.get('profile') or request.headers.get('X-Profile', '')
+        return request.user.is_staff and flag.lower() in ('1', 'true', 'yes')
+    
+    def generate(self, request):
+        timer = get_timer(request)
+        
         # Initialize serializer with request data for validation
         serializer = GenerateDataSerializer(data=request.data)
         
         # Validate the incoming data against defined constraints (e.g., max rows, format choices)
-        if not serializer.is_valid():
+        with timer.phase('validate'):
+            valid = serializer.is_valid()
+        if not valid:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
         # Extract validated data
@@ -39,68 +167,84 @@ class GenerateDataView(APIView):
         file_format = serializer.validated_data['format']
         save_schema = serializer.validated_data.get('save_schema', False)
         schema_name = serializer.validated_data.get('schema_name', '')
+        locales = serializer.validated_data['locale']
+        # Recorded in the history: the same seed and reference date regenerate the same file
+        seed = serializer.validated_data.get('seed')
+        if seed is None:
+            seed = random.getrandbits(32)
+        now = timezone.now()
+        generation = reproduction_fields(schema, seed, locales, now)
         
         user = request.user
+        timer.annotate(rows=rows, columns=len(schema), format=file_format)
         
-        # Define quota limits based on the user's subscription plan
-        quota_limits = {
-            'free': 500,
-            'pro': 50000,
-            'enterprise': 999999999  # unlimited
-        }
+        # Estimate the output size, memory and CPU time before doing any work
+        estimate = CostModel.estimate(schema, rows, file_format)
+        admission = CostModel.admit(estimate, file_format)
+        timer.annotate(estimated_bytes=estimate.output_bytes, admission=admission.action)
+        if admission.action == REJECT:
+            return self.too_expensive_response(admission, estimate)
         
-        # Reset the daily quota if the last reset date is before today
-        if user.last_quota_reset != date.today():
-            user.daily_quota_used = 0
-            user.last_quota_reset = date.today()
-            user.save()
+        # Reserve the cost of the request (weighted by field type) on the user's daily quota
+        units = CostModel.quota_units(schema, rows)
+        timer.annotate(quota_units=units)
+        with timer.phase('quota'):
+            reserved = QuotaManager.reserve(user, units)
+        if not reserved:
+            return self.quota_exceeded_response(user)
         
-        # Check if the requested number of rows exceeds the user's available quota
-        max_quota = quota_limits.get(user.plan, 500)
-        if user.daily_quota_used + rows > max_quota:
-            return Response({
-                'error': f'Quota journalier dépassé. Plan {user.plan}: {max_quota} lignes/jour. Utilisé: {user.daily_quota_used}'
-            }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        if admission.action == STREAM:
+            return self.streaming_response(user, schema, rows, file_format, save_schema, schema_name, generation)
         
         
         # --- DATA GENERATION ---
+        started_at = time.perf_counter()
         try:
-            # Instantiate the generator service (using 'fr_FR' locale as chosen)
-            generator = DataGenerator(locale='fr_FR')
-            data = generator.generate_dataset(schema, rows)
+            # Borrow a pooled generator service (its Faker instances are reused across requests)
+            with timer.phase('generate'), GeneratorPool.acquire(seed=seed, now=now) as generator:
+                data = generator.generate_dataset(schema, rows, locales=locales)
         except Exception as e:
+            QuotaManager.refund(user, units)
             return Response({'error': f'Erreur lors de la génération: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
         
         # --- DATA EXPORT ---
-        exporter = FileExporter()
-        file_content = None
-        content_type = 'application/json'
         file_extension = file_format
         
         try:
             # Calls the appropriate export method based on the requested format
-            if file_format == 'json':
-                file_content = exporter.to_json(data)
-                content_type = 'application/json'
-            elif file_format == 'csv':
-                file_content = exporter.to_csv(data)
-                content_type = 'text/csv'
-            elif file_format == 'xlsx':
-                file_content = exporter.to_excel(data)
-                content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            elif file_format == 'sql':
-                file_content = exporter.to_sql(data)
-                content_type = 'text/plain'
-            elif file_format == 'xml':
-                file_content = exporter.to_xml(data)
-                content_type = 'application/xml'
+            export_started_at = time.perf_counter()
+            with timer.phase('export'):
+                file_content, content_type = FileExporter.export(data, file_format)
         except Exception as e:
+            QuotaManager.refund(user, units)
             return Response({'error': f'Erreur lors de l\'export: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
+        finished_at = time.perf_counter()
+        record_export(file_format, rows, len(file_content), finished_at - export_started_at)
+        GENERATION_DURATION.labels(format=file_format).observe(finished_at - started_at)
+        
         
         # --- SAVE & HISTORY LOGGING ---
         
+        with timer.phase('persist'):
+            dataset = self.save_history(user, schema, rows, file_format, save_schema, schema_name, generation)
+        
+        
+        # --- RETURN RESPONSE (FILE DOWNLOAD) ---
+        
+        # Create an HTTP response with the generated file content
+        response = HttpResponse(file_content, content_type=content_type)
+        # Set the Content-Disposition header to prompt a file download
+        response['Content-Disposition'] = f'attachment; filename="synthetic_data_{dataset.id}.{file_extension}"'
+        
+        return response
+    
+    def save_history(self, user, schema, rows, file_format, save_schema, schema_name, generation):
+        """
+        Saves the schema if asked, and records the generation in the user's 
+        history with its seed, locales and field order (see reproduction_fields).
+        """
         # Save the schema if the 'save_schema' flag is true and a name is provided
         if save_schema and schema_name:
             Schema.objects.create(
@@ -112,49 +256,457 @@ class GenerateDataView(APIView):
         # Record the generation event in the user's history
         dataset = GeneratedDataset.objects.create(
             user=user,
-            schema_json=schema,
+            definition=SchemaDefinition.objects.intern(schema),
             nb_rows=rows,
             file_format=file_format,
-            file_path=''  # Placeholder: actual file storage logic would go here
+            file_path='',  # Placeholder: actual file storage logic would go here
+            **generation
         )
+        UsageLedger.record(user, [(file_format, rows)])
+        self.dataset = dataset
+        return dataset
+    
+    def streaming_response(self, user, schema, rows, file_format, save_schema, schema_name, generation):
+        """
+        Streams the file: rows are generated and exported chunk by chunk while 
+        the response is sent, so memory stays flat whatever the row count.
         
-        # Update the user's daily quota usage
-        user.daily_quota_used += rows
-        user.save()
+        The history is recorded before streaming starts; the quota of a stream 
+        interrupted by an error is not refunded.
+        """
+        with get_timer(self.request).phase('persist'):
+            dataset = self.save_history(user, schema, rows, file_format, save_schema, schema_name, generation)
         
+        rows_iterator = seeded_rows(schema, rows, generation['locale'], generation['seed'], generation['generated_at'])
+        chunks = FileExporter.stream(rows_iterator, file_format)
+        response = StreamingHttpResponse(
+            self._record_stream(chunks, file_format, rows),
+            content_type=FileExporter.EXPORT_FORMATS[file_format][1]
+        )
+        response['Content-Disposition'] = f'attachment; filename="synthetic_data_{dataset.id}.{file_format}"'
+        return response
+    
+    @staticmethod
+    def _record_stream(chunks, file_format, rows):
+        """Passes the chunks through and records the export metrics once the stream is complete."""
+        started_at = time.perf_counter()
+        size = 0
+        for chunk in chunks:
+            size += len(chunk)
+            yield chunk
+        seconds = time.perf_counter() - started_at
+        record_export(file_format, rows, size, seconds)
+        GENERATION_DURATION.labels(format=file_format).observe(seconds)
+    
+    @staticmethod
+    def too_expensive_response(admission, estimate):
+        """Builds the 400 response returned when the estimated cost exceeds the budgets."""
+        return Response({
+            'error': admission.reason,
+            'estimate': {
+                'output_bytes': estimate.output_bytes,
+                'memory_bytes': estimate.memory_bytes,
+                'cpu_seconds': round(estimate.cpu_seconds, 1),
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    @staticmethod
+    def quota_exceeded_response(user):
+        """Builds the 429 response returned when the daily quota would be exceeded."""
+        max_quota = QuotaManager.get_user_limit(user)
+        used = QuotaManager.get_used(user)
+        return Response({
+            'error': f'Quota journalier dépassé. Plan {user.plan}: {max_quota} unités/jour. Utilisé: {used}',
+            'detail': (
+                f"Le coût d'une ligne dépend de ses types de champs : "
+                f"{getattr(settings, 'QUOTA_WEIGHT_PER_UNIT', 5)} champs 'name' valent 1 unité."
+            ),
+            'limit': max_quota,
+            'used': used,
+            'unit': QUOTA_UNIT,
+        }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+class BatchGenerateDataView(TimedThrottlesMixin, APIView):
+    """
+    Generates several datasets, each exported to one or more formats, in one call.
+    Endpoint: POST /api/generate/batch/
+    
+    Each dataset is generated once and every requested format is exported from 
+    the same in-memory rows. The files are returned together as a zip archive. 
+    The quota of the whole batch is reserved at once (and refunded if generation 
+    or persistence fails), and the history rows are written in one bulk insert, 
+    in the same transaction as the usage ledger.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [PlanRateThrottle, PlanDailyQuotaThrottle]
+    
+    def get_requested_units(self, request):
+        """Total quota units asked for, read before validation by PlanDailyQuotaThrottle."""
+        try:
+            units = 0
+            for item in request.data.get('datasets', []):
+                rows = max(int(item.get('rows', 0)), 0)
+                schema = item.get('schema')
+                units += CostModel.quota_units(schema, rows) if isinstance(schema, dict) and rows else rows
+            return units
+        except (TypeError, ValueError, AttributeError):
+            return 0
+    
+    @track_in_flight('generate-batch')
+    def post(self, request):
+        timer = get_timer(request)
+        serializer = BatchGenerateSerializer(data=request.data)
+        with timer.phase('validate'):
+            valid = serializer.is_valid()
+        if not valid:
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        # --- RETURN RESPONSE (FILE DOWNLOAD) ---
+        datasets = serializer.validated_data['datasets']
+        total_rows = sum(item['rows'] for item in datasets)
+        user = request.user
+        timer.annotate(
+            rows=total_rows,
+            columns=sum(len(item['schema']) for item in datasets),
+            format='zip',
+            datasets=len(datasets),
+        )
         
-        # Create an HTTP response with the generated file content
-        response = HttpResponse(file_content, content_type=content_type)
-        # Set the Content-Disposition header to prompt a file download
-        response['Content-Disposition'] = f'attachment; filename="synthetic_data_{dataset.id}.{file_extension}"'
+        # The archive is built in memory: batches over the memory budget are rejected
+        estimate = CostModel.estimate_batch(datasets)
+        admission = CostModel.admit(estimate, 'zip', streamable=False)
+        timer.annotate(estimated_bytes=estimate.output_bytes, admission=admission.action)
+        if admission.action == REJECT:
+            return GenerateDataView.too_expensive_response(admission, estimate)
+        
+        # Reserve the cost of every dataset at once
+        units = sum(CostModel.quota_units(item['schema'], item['rows']) for item in datasets)
+        timer.annotate(quota_units=units)
+        with timer.phase('quota'):
+            reserved = QuotaManager.reserve(user, units)
+        if not reserved:
+            return GenerateDataView.quota_exceeded_response(user)
+        
+        
+        # --- DATA GENERATION & EXPORT ---
+        archive = BytesIO()
+        used_names = set()
+        # Each dataset has its own seed (recorded in the history), so that it can 
+        # be regenerated without the other datasets of the batch
+        now = timezone.now()
+        for item in datasets:
+            if item.get('seed') is None:
+                item['seed'] = random.getrandbits(32)
+        
+        try:
+            with GeneratorPool.acquire() as generator, \
+                    zipfile.ZipFile(archive, 'w', compression=zipfile.ZIP_DEFLATED) as zip_file:
+                for index, item in enumerate(datasets, start=1):
+                    # Generated once, exported to every requested format
+                    started_at = time.perf_counter()
+                    with timer.phase('generate'):
+                        generator.seed(item['seed'], now)
+                        data = generator.generate_dataset(item['schema'], item['rows'], locales=item['locale'])
+                    generated_at = time.perf_counter()
+                    base_name = self._unique_name(item.get('name') or f'dataset_{index}', used_names)
+                    
+                    for file_format in item['formats']:
+                        export_started_at = time.perf_counter()
+                        with timer.phase('export'):
+                            file_content, _ = FileExporter.export(data, file_format)
+                            zip_file.writestr(f'{base_name}.{file_format}', file_content)
+                        finished_at = time.perf_counter()
+                        record_export(file_format, item['rows'], len(file_content), finished_at - export_started_at)
+                        GENERATION_DURATION.labels(format=file_format).observe(
+                            generated_at - started_at + finished_at - export_started_at
+                        )
+        except Exception as e:
+            QuotaManager.refund(user, units)
+            return Response({'error': f'Erreur lors de la génération: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        
+        # --- HISTORY LOGGING ---
+        # All or nothing: a batch without its history rows is not charged
+        try:
+            with timer.phase('persist'), transaction.atomic():
+                logged = [(item, file_format) for item in datasets for file_format in item['formats']]
+                for item in datasets:
+                    item['definition'] = SchemaDefinition.objects.intern(item['schema'])
+                GeneratedDataset.objects.bulk_create([
+                    GeneratedDataset(
+                        user=user,
+                        definition=item['definition'],
+                        nb_rows=item['rows'],
+                        file_format=file_format,
+                        file_path='',
+                        **reproduction_fields(item['schema'], item['seed'], item['locale'], now)
+                    )
+                    for item, file_format in logged
+                ])
+                UsageLedger.record(user, [(file_format, item['rows']) for item, file_format in logged])
+        except Exception as e:
+            QuotaManager.refund(user, units)
+            return Response({'error': f"Erreur lors de l'enregistrement: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        
+        # --- RETURN RESPONSE (ZIP DOWNLOAD) ---
+        response = HttpResponse(archive.getvalue(), content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename="synthetic_data_batch.zip"'
+        
+        return response
+    
+    @staticmethod
+    def _unique_name(name, used_names):
+        """Sanitizes a dataset name for use inside the archive and makes it unique."""
+        base_name = re.sub(r'[^\w\-]+', '_', name).strip('_') or 'dataset'
+        candidate, counter = base_name, 2
+        while candidate in used_names:
+            candidate = f'{base_name}_{counter}'
+            counter += 1
+        used_names.add(candidate)
+        return candidate
+
+
+# --- RANGE ENDPOINT ---
+class GenerateRangeView(TimedThrottlesMixin, APIView):
+    """
+    Generates one range of rows of a seeded dataset.
+    Endpoint: POST /api/generate/range/
+    
+    The dataset of `rows` rows drawn from `seed` is generated in blocks with 
+    their own seeds (see DataGenerator.generate_dataset): a range costs its own 
+    rows whatever its offset, and the ranges fetched in parallel by several 
+    clients put together give the same rows as the whole dataset (with the same 
+    schema, locale and reference_time).
+    
+    The range is streamed; its quota units are charged, its rows are counted in 
+    the usage charts (not as a dataset) but it is not recorded in the history.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [PlanRateThrottle, PlanDailyQuotaThrottle]
+    
+    def get_requested_units(self, request):
+        """Quota units asked for (rows of the range), read before validation by PlanDailyQuotaThrottle."""
+        try:
+            # The last range of a dataset may be shorter than `limit`
+            limit, offset = int(request.data.get('limit', 0)), int(request.data.get('offset', 0))
+            total = int(request.data.get('rows', limit + offset))
+            rows = max(min(limit, total - offset), 0)
+            schema = request.data.get('schema')
+            return CostModel.quota_units(schema, rows) if isinstance(schema, dict) and rows else rows
+        except (TypeError, ValueError, AttributeError):
+            return 0
+    
+    @track_in_flight('generate-range')
+    def post(self, request):
+        timer = get_timer(request)
+        serializer = GenerateRangeSerializer(data=request.data)
+        with timer.phase('validate'):
+            valid = serializer.is_valid()
+        if not valid:
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        schema, file_format, offset = data['schema'], data['format'], data['offset']
+        limit = min(data['limit'], data['rows'] - offset)
+        now = data.get('reference_time') or timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        user = request.user
+        timer.annotate(rows=limit, columns=len(schema), format=file_format)
         
+        estimate = CostModel.estimate(schema, limit, file_format)
+        admission = CostModel.admit(estimate, file_format)
+        timer.annotate(estimated_bytes=estimate.output_bytes, admission=admission.action)
+        if admission.action == REJECT:
+            return GenerateDataView.too_expensive_response(admission, estimate)
+        
+        units = CostModel.quota_units(schema, limit)
+        timer.annotate(quota_units=units)
+        with timer.phase('quota'):
+            reserved = QuotaManager.reserve(user, units)
+        if not reserved:
+            return GenerateDataView.quota_exceeded_response(user)
+        UsageLedger.record(user, [(file_format, limit)], datasets=False)
+        
+        rows_iterator = seeded_rows(schema, data['rows'], data['locale'], data['seed'], now, offset, limit)
+        response = StreamingHttpResponse(
+            GenerateDataView._record_stream(FileExporter.stream(rows_iterator, file_format), file_format, limit),
+            content_type=FileExporter.EXPORT_FORMATS[file_format][1]
+        )
+        last = offset + limit - 1
+        response['Content-Range'] = f"rows {offset}-{last}/{data['rows']}"
+        response['X-Reference-Time'] = now.isoformat()
+        response['Content-Disposition'] = (
+            f"attachment; filename=\"synthetic_data_{data['seed']}_{offset}-{last}.{file_format}\""
+        )
         return response
 
 
+# --- PREVIEW ENDPOINT ---
+class PreviewView(TimedThrottlesMixin, APIView):
+    """
+    Returns the first rows of a schema while it is being edited.
+    Endpoint: POST /api/preview/
+    
+    Previews are meant to be called on every edit: they are not charged on 
+    the daily quota and write nothing to the database. Rows come from a pooled 
+    generator (no Faker instance created per request) seeded with the request 
+    seed, and the encoded response is cached for PREVIEW_CACHE_TTL seconds per 
+    schema, locale, seed and row count. Without a seed, the cached preview of 
+    the schema (and the seed it was drawn with) is returned.
+    
+    Being free, a preview must stay small: its estimated output is limited to 
+    PREVIEW_MAX_BYTES (see CostModel.estimate).
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [PlanRateThrottle]
+    
+    def post(self, request):
+        timer = get_timer(request)
+        serializer = PreviewSerializer(data=request.data)
+        with timer.phase('validate'):
+            valid = serializer.is_valid()
+        if not valid:
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        schema = serializer.validated_data['schema']
+        rows = serializer.validated_data['rows']
+        locales = serializer.validated_data['locale']
+        seed = serializer.validated_data.get('seed')
+        timer.annotate(rows=rows, columns=len(schema), format='preview')
+        
+        estimate = CostModel.estimate(schema, rows, 'json')
+        max_bytes = getattr(settings, 'PREVIEW_MAX_BYTES', 1024 * 1024)
+        if estimate.output_bytes > max_bytes:
+            admission = Admission(REJECT, f"Aperçu trop volumineux (limite : {max_bytes // 1024} Ko), réduisez les lignes ou la taille des champs.")
+            return GenerateDataView.too_expensive_response(admission, estimate)
+        
+        fingerprint = plan_fingerprint(schema)
+        locales_key = hashlib.sha256(json.dumps(list(locales.items())).encode('utf-8')).hexdigest()[:16]
+        # Without a seed any seed will do: the cached preview is reused
+        cache_key = f'preview:{fingerprint}:{locales_key}:{"any" if seed is None else seed}:{rows}'
+        content = cache.get(cache_key)
+        timer.annotate(cache='hit' if content is not None else 'miss')
+        if content is None:
+            if seed is None:
+                seed = random.getrandbits(32)
+            with timer.phase('generate'), GeneratorPool.acquire(seed=seed) as generator:
+                data = generator.generate_dataset(schema, rows, fingerprint, locales)
+            with timer.phase('export'):
+                content = json.dumps(
+                    {'seed': seed, 'rows': data}, ensure_ascii=False, separators=(',', ':')
+                ).encode('utf-8')
+            cache.set(cache_key, content, getattr(settings, 'PREVIEW_CACHE_TTL', 30))
+        
+        return HttpResponse(content, content_type='application/json')
+
+
+class IncludeSchemaMixin:
+    """
+    Lets list views return a lightweight representation (without the schema 
+    JSON blob) unless the client asks for it with `?include_schema=true`.
+    """
+    def include_schema(self):
+        value = self.request.query_params.get('include_schema', '')
+        return value.lower() in ('1', 'true', 'yes')
+
+
 # --- SCHEMA MANAGEMENT ENDPOINTS ---
-class SchemaListCreateView(generics.ListCreateAPIView):
+class SchemaListCreateView(IncludeSchemaMixin, generics.ListCreateAPIView):
     """
     View to list all saved schemas for the authenticated user and create new ones.
     Endpoint: GET/POST /api/schemas/
+    
+    The list is cursor-paginated (newest first) and omits the schema JSON 
+    unless `?include_schema=true` is given. GET supports conditional requests 
+    (ETag).
     """
     permission_classes = [IsAuthenticated]
     serializer_class = SchemaSerializer
+    pagination_class = SchemaCursorPagination
     
     def get_queryset(self):
         # Ensures only schemas owned by the currently logged-in user are returned
-        return Schema.objects.filter(user=self.request.user)
+        queryset = Schema.objects.filter(user=self.request.user)
+        if self.request.method == 'GET' and not self.include_schema():
+            queryset = queryset.only('id', 'name', 'date_created')
+        return queryset
+    
+    def get_serializer_class(self):
+        if self.request.method == 'GET' and not self.include_schema():
+            return SchemaListSerializer
+        return SchemaSerializer
+    
+    @conditional_get(etag_func=schema_list_etag)
+    def get(self, request, *args, **kwargs):
+        # Returns 304 when the user's schemas did not change (If-None-Match)
+        return super().get(request, *args, **kwargs)
     
     def perform_create(self, serializer):
         # Automatically associates the newly created schema with the current user
         serializer.save(user=self.request.user)
 
 
+class SchemaLearnView(TimedThrottlesMixin, APIView):
+    """
+    Learns a schema from a sample file and saves it for the authenticated user.
+    Endpoint: POST /api/schemas/learn/ (multipart, field `file`)
+    
+    The file (CSV with a header line, or NDJSON) is read chunk by chunk, and 
+    each column is profiled in bounded memory: type, null rate, value 
+    frequencies, histogram or string lengths. Each column becomes a "learned" 
+    field whose values are sampled from its model, so the saved schema 
+    generates data shaped like the sample without copying its rows.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [PlanRateThrottle]
+    parser_classes = [MultiPartParser]
+    
+    def post(self, request):
+        timer = get_timer(request)
+        serializer = SchemaLearnSerializer(data=request.data)
+        with timer.phase('validate'):
+            valid = serializer.is_valid()
+        if not valid:
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        upload = serializer.validated_data['file']
+        max_bytes = getattr(settings, 'LEARN_MAX_UPLOAD_BYTES', 100 * 1024 * 1024)
+        if upload.size > max_bytes:
+            return Response(
+                {"error": f"Le fichier dépasse la taille maximale de {max_bytes // (1024 * 1024)} Mo."},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+        
+        with timer.phase('profile'):
+            try:
+                rows, profiles = SampleProfiler.profile(
+                    upload.chunks(), serializer.validated_data['format'],
+                    max_rows=getattr(settings, 'LEARN_MAX_ROWS', 1000000)
+                )
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        schema_json = SampleProfiler.schema(profiles)
+        timer.annotate(rows=rows, columns=len(schema_json), format='learn')
+        if not schema_json:
+            return Response({"error": "Aucune colonne avec des valeurs dans le fichier."}, status=status.HTTP_400_BAD_REQUEST)
+        
+        schema = Schema.objects.create(
+            user=request.user, name=serializer.validated_data['name'], schema_json=schema_json
+        )
+        data = SchemaSerializer(schema).data
+        data['profile'] = {
+            'rows': rows,
+            'columns': {name: field['model']['kind'] for name, field in schema_json.items()},
+        }
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
 class SchemaDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     View to retrieve, update, or delete a specific user schema by ID.
     Endpoint: GET/PUT/DELETE /api/schemas/<id>/
+    
+    GET supports conditional requests (ETag and Last-Modified).
     """
     permission_classes = [IsAuthenticated]
     serializer_class = SchemaSerializer
@@ -162,20 +714,43 @@ class SchemaDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         # Ensures users can only access their own schemas
         return Schema.objects.filter(user=self.request.user)
+    
+    @conditional_get(etag_func=schema_detail_etag, last_modified_func=schema_detail_last_modified)
+    def get(self, request, *args, **kwargs):
+        # Returns 304 when the schema did not change (If-None-Match / If-Modified-Since)
+        return super().get(request, *args, **kwargs)
 
 
 # --- DATASET HISTORY ENDPOINTS ---
-class DatasetHistoryView(generics.ListAPIView):
+class DatasetHistoryView(IncludeSchemaMixin, generics.ListAPIView):
     """
     View to retrieve the history of all generated datasets for the user.
     Endpoint: GET /api/history/
+    
+    The list is cursor-paginated (newest first) and omits the schema JSON 
+    unless `?include_schema=true` is given. GET supports conditional requests 
+    (ETag).
     """
     permission_classes = [IsAuthenticated]
     serializer_class = GeneratedDatasetSerializer
+    pagination_class = HistoryCursorPagination
     
     def get_queryset(self):
         # Returns all generated datasets records belonging to the current user
-        return GeneratedDataset.objects.filter(user=self.request.user)
+        queryset = GeneratedDataset.objects.filter(user=self.request.user).select_related('user')
+        if self.include_schema():
+            queryset = queryset.select_related('definition')
+        return queryset
+    
+    def get_serializer_class(self):
+        if self.include_schema():
+            return GeneratedDatasetSerializer
+        return GeneratedDatasetListSerializer
+    
+    @conditional_get(etag_func=history_etag)
+    def get(self, request, *args, **kwargs):
+        # Returns 304 when no dataset was generated or deleted (If-None-Match)
+        return super().get(request, *args, **kwargs)
 
 
 class DatasetDeleteView(generics.DestroyAPIView):
@@ -188,4 +763,147 @@ class DatasetDeleteView(generics.DestroyAPIView):
     
     def get_queryset(self):
         # Ensures users can only delete their own dataset history records
-        return GeneratedDataset.objects.filter(user=self.request.user)
\ No newline at end of file
+        return GeneratedDataset.objects.filter(user=self.request.user)
+
+
+class DatasetDownloadView(TimedThrottlesMixin, APIView):
+    """
+    Downloads a dataset of the history again.
+    Endpoint: GET /api/history/<id>/download/
+    
+    Generated files are not stored: the file is regenerated from the seed, 
+    locales, field order and reference date recorded with the dataset, and 
+    streamed (xlsx files are built in memory). The bytes are the same as the 
+    first download for every format but xlsx, whose archive records the time 
+    it was written (the cells are the same).
+    
+    Datasets generated before seeds were recorded, or by another generator 
+    version (see GENERATOR_VERSION), cannot be regenerated identically (409). 
+    A download costs the same as the generation: it is admitted by the cost 
+    model, its quota units are charged again and its rows are counted in the 
+    usage charts (not as a new dataset).
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [PlanRateThrottle]
+    
+    def get(self, request, pk):
+        timer = get_timer(request)
+        dataset = get_object_or_404(
+            GeneratedDataset.objects.select_related('definition'), pk=pk, user=request.user
+        )
+        if dataset.seed is None:
+            return Response(
+                {'error': "Ce dataset a été généré avant l'enregistrement des graines : il ne peut pas être régénéré."},
+                status=status.HTTP_409_CONFLICT
+            )
+        if dataset.generator_version != GENERATOR_VERSION:
+            return Response({
+                'error': "Ce dataset a été généré par une autre version du générateur : il ne peut pas être régénéré à l'identique.",
+                'generator_version': dataset.generator_version,
+            }, status=status.HTTP_409_CONFLICT)
+        
+        schema = dataset.ordered_schema()
+        rows, file_format = dataset.nb_rows, dataset.file_format
+        locales = dataset.locale or {DEFAULT_LOCALE: 1}
+        timer.annotate(rows=rows, columns=len(schema), format=file_format)
+        
+        streamable = file_format in FileExporter.STREAMING_FORMATS
+        estimate = CostModel.estimate(schema, rows, file_format)
+        admission = CostModel.admit(estimate, file_format, streamable=streamable)
+        timer.annotate(estimated_bytes=estimate.output_bytes, admission=admission.action)
+        if admission.action == REJECT:
+            return GenerateDataView.too_expensive_response(admission, estimate)
+        
+        units = CostModel.quota_units(schema, rows)
+        timer.annotate(quota_units=units)
+        with timer.phase('quota'):
+            reserved = QuotaManager.reserve(request.user, units)
+        if not reserved:
+            return GenerateDataView.quota_exceeded_response(request.user)
+        
+        if streamable:
+            rows_iterator = seeded_rows(schema, rows, locales, dataset.seed, dataset.generated_at)
+            response = StreamingHttpResponse(
+                GenerateDataView._record_stream(FileExporter.stream(rows_iterator, file_format), file_format, rows),
+                content_type=FileExporter.EXPORT_FORMATS[file_format][1]
+            )
+        else:
+            try:
+                with timer.phase('generate'), GeneratorPool.acquire(seed=dataset.seed, now=dataset.generated_at) as generator:
+                    data = generator.generate_dataset(schema, rows, locales=locales)
+                with timer.phase('export'):
+                    file_content, content_type = FileExporter.export(data, file_format)
+            except Exception as e:
+                QuotaManager.refund(request.user, units)
+                return Response({'error': f'Erreur lors de la génération: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            response = HttpResponse(file_content, content_type=content_type)
+        UsageLedger.record(request.user, [(file_format, rows)], datasets=False)
+        
+        response['Content-Disposition'] = f'attachment; filename="synthetic_data_{dataset.id}.{file_format}"'
+        return response
+
+
+# --- USAGE ENDPOINTS ---
+class UsageRangeMixin:
+    """Reads the `?days=N` reporting window (default 30, max 366 days)."""
+    
+    def get_start_day(self, request):
+        try:
+            days = min(max(int(request.query_params.get('days', 30)), 1), 366)
+        except ValueError:
+            days = 30
+        return timezone.localdate() - timedelta(days=days - 1)
+
+
+class UsageView(UsageRangeMixin, APIView):
+    """
+    View returning the usage charts of the authenticated user, served from the 
+    DailyUsage rollup table.
+    Endpoint: GET /api/usage/?days=30
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        start_day = self.get_start_day(request)
+        usage = DailyUsage.objects.filter(user=request.user, day__gte=start_day)
+        
+        per_day = usage.values('day').annotate(
+            rows=Sum('rows'), datasets=Sum('datasets_count')
+        ).order_by('day')
+        per_format = usage.values('file_format').annotate(
+            rows=Sum('rows'), datasets=Sum('datasets_count')
+        ).order_by('file_format')
+        
+        return Response({
+            'start_day': start_day,
+            'days': list(per_day),
+            'formats': list(per_format),
+            'total_rows': sum(entry['rows'] for entry in per_day),
+            # Exported rows, not quota units (see the profile's daily_quota_used)
+            'unit': 'rows',
+        })
+
+
+class PlanUsageView(UsageRangeMixin, APIView):
+    """
+    Admin view returning usage totals per plan, for analytics and billing.
+    Endpoint: GET /api/usage/plans/?days=30
+    """
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        start_day = self.get_start_day(request)
+        per_plan = DailyUsage.objects.filter(day__gte=start_day).values('user__plan').annotate(
+            rows=Sum('rows'),
+            datasets=Sum('datasets_count'),
+            users=Count('user', distinct=True),
+        ).order_by('user__plan')
+        
+        return Response({
+            'start_day': start_day,
+            'plans': [
+                {'plan': entry.pop('user__plan'), **entry}
+                for entry in per_plan
+            ],
+            'unit': 'rows',
+        })
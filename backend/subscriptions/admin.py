@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Subscription
+from .models import Subscription, PlanLimit
 
 @admin.register(Subscription)
 class SubscriptionAdmin(admin.ModelAdmin):
@@ -31,4 +31,13 @@ class SubscriptionAdmin(admin.ModelAdmin):
     readonly_fields = ['start_date']
     
     # Ordre par défaut
-    ordering = ['-start_date']
\ No newline at end of file
+    ordering = ['-start_date']
+
+
+@admin.register(PlanLimit)
+class PlanLimitAdmin(admin.ModelAdmin):
+    """Configuration de l'admin pour les limites des plans"""
+    
+    list_display = ['plan', 'daily_units', 'requests_per_second', 'burst', 'history_retention_days']
+    
+    ordering = ['daily_units']
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:58
+
+from django.db import migrations, models
+
+
+# Limits previously hard-coded in GenerateDataView
+DEFAULT_PLAN_LIMITS = [
+    ('free', 500, 2, 10),
+    ('pro', 50000, 10, 50),
+    ('enterprise', 999999999, 50, 200),
+]
+
+
+def create_default_plan_limits(apps, schema_editor):
+    PlanLimit = apps.get_model('subscriptions', 'PlanLimit')
+    for plan, daily_rows, requests_per_second, burst in DEFAULT_PLAN_LIMITS:
+        PlanLimit.objects.get_or_create(plan=plan, defaults={
+            'daily_rows': daily_rows,
+            'requests_per_second': requests_per_second,
+            'burst': burst,
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlanLimit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('plan', models.CharField(choices=[('free', 'Free'), ('pro', 'Pro'), ('enterprise', 'Enterprise')], max_length=20, unique=True)),
+                ('daily_rows', models.PositiveIntegerField()),
+                ('requests_per_second', models.FloatField(default=5)),
+                ('burst', models.PositiveIntegerField(default=20)),
+            ],
+        ),
+        migrations.RunPython(create_default_plan_limits, migrations.RunPython.noop),
+    ]
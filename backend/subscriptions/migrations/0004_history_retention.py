@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:05
+
+from django.db import migrations, models
+
+
+DEFAULT_RETENTION_DAYS = {
+    'free': 30,
+    'pro': 365,
+    'enterprise': None,  # kept forever
+}
+
+
+def set_default_retention(apps, schema_editor):
+    PlanLimit = apps.get_model('subscriptions', 'PlanLimit')
+    for plan, days in DEFAULT_RETENTION_DAYS.items():
+        PlanLimit.objects.filter(plan=plan).update(history_retention_days=days)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0003_planlimit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='planlimit',
+            name='history_retention_days',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(set_default_retention, migrations.RunPython.noop),
+    ]
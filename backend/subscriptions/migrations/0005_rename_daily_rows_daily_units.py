@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0004_history_retention'),
+    ]
+
+    operations = [
+        # The daily limit is counted in quota units (rows weighted by field cost), not rows
+        migrations.RenameField(
+            model_name='planlimit',
+            old_name='daily_rows',
+            new_name='daily_units',
+        ),
+    ]
@@ -16,4 +16,25 @@ class Subscription(models.Model):
     end_date = models.DateTimeField(blank=True, null=True)
     
     def __str__(self):
-        return f"{self.user.email} - {self.status}"
\ No newline at end of file
+        return f"{self.user.email} - {self.status}"
+
+class PlanLimit(models.Model):
+    """
+    Quota and rate limits of a subscription plan, stored as data so they can be 
+    changed from the admin without a deployment.
+    """
+    plan = models.CharField(max_length=20, choices=User.PLAN_CHOICES, unique=True)
+
+    # Maximum number of quota units (rows weighted by the cost of their field
+    # types, see generator.services.cost_model) a user of this plan can use per day.
+    daily_units = models.PositiveIntegerField()
+
+    # Sustained API request rate and the burst allowed above it (token bucket).
+    requests_per_second = models.FloatField(default=5)
+    burst = models.PositiveIntegerField(default=20)
+
+    # Days the generation history is kept (prune_history command). Empty = kept forever.
+    history_retention_days = models.PositiveIntegerField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.plan} - {self.daily_units} unités/jour"
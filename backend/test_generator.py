@@ -1,5 +1,5 @@
-from services.data_generator import DataGenerator
-from services.file_exporter import FileExporter
+from generator.services.data_generator import DataGenerator
+from generator.services.file_exporter import FileExporter
 
 # Test de génération
 generator = DataGenerator(locale='pt_BR')
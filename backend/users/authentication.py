@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+    """
+    Process-local LRU cache of resolved users, with a short TTL.
+
+    Only the field values are cached: every request gets its own User instance,
+    so a view modifying request.user cannot affect other requests. Keys are 
+    stringified ids, as stored in the JWT user_id claim.
+    """
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_model, user_id):
+        ttl = getattr(settings, 'USER_CACHE_TTL', 30)
+        user_id = str(user_id)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            cached_at, field_names, values = entry
+            if time.monotonic() - cached_at > ttl:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        return user_model.from_db('default', field_names, values)
+
+    def set(self, user):
+        field_names = [field.attname for field in user._meta.concrete_fields]
+        values = [getattr(user, name) for name in field_names]
+        user_id = str(user.pk)
+        with self._lock:
+            self._entries[user_id] = (time.monotonic(), field_names, values)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication resolving the token's user from a local process cache 
+    (USER_CACHE_TTL seconds) instead of loading the users row on every request.
+
+    Entries are invalidated in this process whenever the user or their 
+    subscription is saved or deleted (see users.signals); other processes pick 
+    up the change when their entry expires.
+    """
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or api_settings.USER_ID_FIELD != 'id':
+            return super().get_user(validated_token)
+
+        user = user_cache.get(self.user_model, user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user)
+            return user
+
+        # Same checks as JWTAuthentication.get_user, on the cached values
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
@@ -30,7 +30,7 @@ class User(AbstractUser):
     daily_quota_used = models.IntegerField(default=0)
 
     # Stores the date when the daily quota was last reset. Used to check for new days.
-    # auto_now_add=True sets the date on creation. It's updated programmatically in views.py.
+    # auto_now_add=True sets the date on creation. It's updated by generator.services.quota_manager.
     last_quota_reset = models.DateField(auto_now_add=True)
     
     # Tells Django to use the 'email' field as the unique identifier for login.
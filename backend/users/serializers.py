@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from generator.services.quota_manager import QUOTA_UNIT, QuotaManager
 
 # Retrieves the custom User model defined in your app (users.models.User)
 User = get_user_model()
@@ -10,11 +11,31 @@ class UserSerializer(serializers.ModelSerializer):
     Serializer used to expose user profile information via API endpoints 
     (e.g., /api/user/profile/). Excludes sensitive data like password hash.
     """
+    # Read from the quota manager: the column is updated without saving the user
+    # (no signal), so the instance resolved by the authentication cache may be stale
+    daily_quota_used = serializers.SerializerMethodField()
+    # Unit of daily_quota_used: rows weighted by the cost of their field types
+    quota_unit = serializers.SerializerMethodField()
+
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'plan', 'role', 'daily_quota_used', 'date_joined']
+        fields = ['id', 'username', 'email', 'plan', 'role', 'daily_quota_used', 'quota_unit', 'date_joined']
         read_only_fields = ['id', 'date_joined']
 
+    def get_daily_quota_used(self, obj):
+        return QuotaManager.get_used(obj)
+
+    def get_quota_unit(self, obj):
+        return QUOTA_UNIT
+
+    def update(self, instance, validated_data):
+        # Only the edited columns are written: saving the whole (possibly cached)
+        # instance would overwrite the quota columns with stale values
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
+
 
 class RegisterSerializer(serializers.ModelSerializer):
     """
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from generator.services.quota_manager import QuotaManager
+
+from .authentication import user_cache
+from .models import User
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Drops the cached authentication entry and quota state when the user's profile or plan changes."""
+    user_cache.invalidate(instance.pk)
+    QuotaManager.invalidate(instance.pk)
+
+
+@receiver([post_save, post_delete], sender='subscriptions.Subscription')
+def invalidate_cached_subscriber(sender, instance, **kwargs):
+    """Drops the cached authentication entry and quota state when the user's subscription changes."""
+    user_cache.invalidate(instance.user_id)
+    QuotaManager.invalidate(instance.user_id)
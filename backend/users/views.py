@@ -4,9 +4,21 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
 from .serializers import RegisterSerializer, UserSerializer
+from generator.conditional import conditional_get, make_etag
+from generator.services.quota_manager import QuotaManager
 
 User = get_user_model()
 
+
+def profile_etag(request, *args, **kwargs):
+    """
+    Validator of the profile endpoint, computed from the user already loaded 
+    by the authentication, and the quota used today as read by the quota 
+    manager (the cached daily_quota_used lags behind the generations).
+    """
+    user = request.user
+    return make_etag(request, user.pk, user.username, user.email, user.plan, user.role, QuotaManager.get_used(user))
+
 class RegisterView(generics.CreateAPIView):
     """
     View for registering a new user.
@@ -50,4 +62,9 @@ class ProfileView(generics.RetrieveUpdateAPIView):
         Ensures that the user can only retrieve/update their own profile data.
         """
         # Return the user object associated with the current request
-        return self.request.user
\ No newline at end of file
+        return self.request.user
+    
+    @conditional_get(etag_func=profile_etag)
+    def get(self, request, *args, **kwargs):
+        # Returns 304 when the profile did not change (If-None-Match)
+        return super().get(request, *args, **kwargs)
\ No newline at end of file
@@ -16,9 +16,50 @@ const dataService = {
     return response;
   },
 
-  // Récupère la liste des schémas sauvegardés
-  getSchemas: async () => {
-    const response = await api.get('/schemas/');
+  // Aperçu de quelques lignes d'un schéma (1 à 50), sans quota ni historique
+  // Renvoie { seed, rows } ; la même graine redonne les mêmes lignes
+  previewData: async (schema, rows = 10, seed = null) => {
+    const response = await api.post('/preview/', {
+      schema,
+      rows,
+      ...(seed !== null && { seed }),
+    });
+    return response.data;
+  },
+
+  // Génère plusieurs datasets (chacun dans un ou plusieurs formats) dans une archive zip
+  // datasets: [{ schema, rows, formats: ['csv', 'json'], name }]
+  generateBatch: async (datasets) => {
+    const response = await api.post('/generate/batch/', { datasets }, {
+      responseType: 'blob',
+    });
+    
+    return response;
+  },
+
+  // Génère les lignes offset..offset+limit d'un dataset de `rows` lignes tiré de `seed`
+  // Les plages d'un même dataset (même schéma, graine et referenceTime) se recollent à l'identique
+  generateRange: async (schema, rows, seed, offset, limit, format = 'json', referenceTime = null) => {
+    const response = await api.post('/generate/range/', {
+      schema,
+      rows,
+      seed,
+      offset,
+      limit,
+      format,
+      ...(referenceTime !== null && { reference_time: referenceTime }),
+    }, {
+      responseType: 'text',
+    });
+    return response;
+  },
+
+  // Récupère une page de schémas sauvegardés ({ next, previous, results })
+  // Passer l'URL `next` de la page précédente pour obtenir la suivante
+  getSchemas: async (cursorUrl = null, includeSchema = true) => {
+    const response = cursorUrl
+      ? await api.get(cursorUrl)
+      : await api.get('/schemas/', { params: { include_schema: includeSchema } });
     return response.data;
   },
 
@@ -31,18 +72,47 @@ const dataService = {
     return response.data;
   },
 
+  // Apprend un schéma à partir d'un fichier d'exemple (CSV avec en-tête ou NDJSON)
+  // Renvoie le schéma enregistré et son profil { rows, columns }
+  learnSchema: async (file, name = '') => {
+    const formData = new FormData();
+    formData.append('file', file);
+    if (name) formData.append('name', name);
+    const response = await api.post('/schemas/learn/', formData, {
+      headers: { 'Content-Type': 'multipart/form-data' },
+    });
+    return response.data;
+  },
+
   // Supprime un schéma
   deleteSchema: async (id) => {
     const response = await api.delete(`/schemas/${id}/`);
     return response.data;
   },
 
-  // Récupère l'historique des datasets
-  getHistory: async () => {
-    const response = await api.get('/history/');
+  // Récupère une page de l'historique des datasets ({ next, previous, results })
+  // Le schéma JSON n'est inclus que si includeSchema est vrai
+  getHistory: async (cursorUrl = null, includeSchema = false) => {
+    const response = cursorUrl
+      ? await api.get(cursorUrl)
+      : await api.get('/history/', { params: { include_schema: includeSchema } });
     return response.data;
   },
 
+  // Récupère l'utilisation (lignes par jour et par format) sur les N derniers jours
+  getUsage: async (days = 30) => {
+    const response = await api.get('/usage/', { params: { days } });
+    return response.data;
+  },
+
+  // Retélécharge un dataset de l'historique (régénéré à l'identique depuis sa graine)
+  downloadDataset: async (id) => {
+    const response = await api.get(`/history/${id}/download/`, {
+      responseType: 'blob',
+    });
+    return response;
+  },
+
   // Supprime un dataset de l'historique
   deleteDataset: async (id) => {
     const response = await api.delete(`/history/${id}/`);